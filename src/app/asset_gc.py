@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path, PurePosixPath
+from typing import Any, Iterator
+from urllib.parse import urlparse
+
+from .config import REPO_ROOT
+from .output import remove_file, write_if_changed
+from .post_index import ARCHIVE_FILE, HEAD_FILE
+
+LOG = logging.getLogger(__name__)
+
+CACHE_FILE = "asset_refs.json"
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
+# Page references come as "assets/x.jpg", "../assets/x.jpg" or "{base}/assets/x.jpg".
+_DOCS_ASSET_RE = re.compile(r"""assets/[^'"\s()<>?#]+""")
+_PIN_IMAGE_RE = re.compile(r"""[^'"\s()<>?#]*pinterest/[^'"\s()<>?#]+""")
+
+# A reference is (asset path relative to the repo, page it depends on). An empty page means the
+# reference always counts; otherwise it only counts while that page exists in docs (draft packs
+# keep logging pins for posts that were deleted since).
+Ref = tuple[str, str]
+
+
+@dataclass
+class AssetIndex:
+    """Live reference counts for every file under ``docs/assets`` and ``generated/pinterest``.
+
+    References come from the post archive and ``posts.json``, every rendered page and card feed
+    chunk, the draft logs and packs (including campaigns), pending pins in the publish queue, and
+    in-progress slot checkpoints. Each source's references are cached by content digest in
+    ``generated/asset_refs.json`` (mtimes do not survive a checkout), so a rerun only parses
+    sources that changed since.
+    """
+
+    repo_root: Path
+    docs_dir: Path
+    generated_dir: Path
+    counts: Counter[str] = field(default_factory=Counter)
+    scanned: int = 0
+    cached: int = 0
+
+    @property
+    def cache_path(self) -> Path:
+        return self.generated_dir / CACHE_FILE
+
+    def build(self) -> AssetIndex:
+        cache = self._load_cache()
+        fresh: dict[str, dict[str, Any]] = {}
+        refs: list[Ref] = []
+        for source in self._sources():
+            key = self.rel(source)
+            data = source.read_bytes()
+            digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+            entry = cache.get(key)
+            if entry and entry.get("digest") == digest:
+                self.cached += 1
+            else:
+                entry = {"digest": digest, "refs": sorted(set(self._scan(source, data.decode("utf-8", "ignore"))))}
+                self.scanned += 1
+            fresh[key] = entry
+            refs.extend((asset, page) for asset, page in entry["refs"])
+        pages = {path.name for path in self.docs_dir.glob("*.html")}
+        self.counts = Counter(asset for asset, page in refs if not page or page in pages)
+        write_if_changed(self.cache_path, json.dumps({"sources": fresh}, indent=2, sort_keys=True))
+        return self
+
+    def candidates(self) -> Iterator[Path]:
+        """Images only, so stylesheets or scripts ever added under ``assets`` are never collected."""
+        for root in (self.docs_dir / "assets", self.generated_dir / "pinterest"):
+            yield from sorted(
+                path for path in root.rglob("*") if path.is_file() and path.suffix.lower() in IMAGE_SUFFIXES
+            )
+
+    def orphans(self) -> list[Path]:
+        return [path for path in self.candidates() if not self.counts[self.rel(path)]]
+
+    def _sources(self) -> Iterator[Path]:
+        pinterest = self.generated_dir / "pinterest"
+        records = [self.docs_dir / ARCHIVE_FILE, self.docs_dir / HEAD_FILE]
+        yield from (path for path in [*records, pinterest / "queue.json"] if path.is_file())
+        yield from sorted(self.docs_dir.rglob("*.html"))
+        yield from sorted((self.docs_dir / "feeds").rglob("*.json"))
+        yield from sorted(pinterest.rglob("drafts.jsonl"))
+        yield from sorted(pinterest.rglob("*_pins.json"))
+        yield from sorted((self.generated_dir / "checkpoints").rglob("*.json"))
+
+    def _scan(self, source: Path, text: str) -> Iterator[Ref]:
+        if source.suffix == ".html" or source.is_relative_to(self.docs_dir / "feeds"):
+            yield from ((self._docs_rel(match), "") for match in _DOCS_ASSET_RE.findall(text))
+        elif source.name == "drafts.jsonl":
+            for line in text.splitlines():
+                yield from self._draft_refs(_loads(line))
+        elif source.name.endswith("_pins.json"):
+            for item in _loads(text) or []:
+                yield from self._draft_refs(item)
+        elif source.name in {ARCHIVE_FILE, HEAD_FILE}:
+            posts = _loads(text)
+            for post in posts if isinstance(posts, list) else []:
+                if isinstance(post, dict) and post.get("hero"):
+                    yield self._docs_rel(str(post["hero"])), ""
+        elif source.name == "queue.json":
+            entries = (_loads(text) or {}).get("entries", {})
+            for entry in entries.values():
+                if entry.get("status") == "pending":
+                    yield from ((self._docs_rel(match), "") for match in _DOCS_ASSET_RE.findall(json.dumps(entry)))
+        else:
+            # Checkpoints hold the hero (docs-relative) and pin (repo-relative) of unfinished slots.
+            yield from ((self._docs_rel(match), "") for match in _DOCS_ASSET_RE.findall(text))
+            yield from ((match, "") for match in _PIN_IMAGE_RE.findall(text))
+
+    def _draft_refs(self, item: Any) -> Iterator[Ref]:
+        if isinstance(item, dict) and item.get("image_path"):
+            page = PurePosixPath(urlparse(str(item.get("link", ""))).path).name or "index.html"
+            yield str(item["image_path"]), page
+
+    def _docs_rel(self, match: str) -> str:
+        return self.rel(self.docs_dir / match[match.index("assets/") :])
+
+    def rel(self, path: Path) -> str:
+        return path.resolve().relative_to(self.repo_root.resolve()).as_posix()
+
+    def _load_cache(self) -> dict[str, dict[str, Any]]:
+        if not self.cache_path.exists():
+            return {}
+        try:
+            return json.loads(self.cache_path.read_text(encoding="utf-8")).get("sources", {})
+        except json.JSONDecodeError:
+            LOG.warning("%s is unreadable; rescanning every source.", self.cache_path)
+            return {}
+
+
+def _loads(text: str) -> Any:
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return None
+
+
+def _mb(size: int) -> str:
+    return f"{size / 1_000_000:.1f} MB"
+
+
+def size_report(index: AssetIndex) -> list[str]:
+    """One line per asset area: files and bytes in total and orphaned."""
+    areas: dict[str, list[int]] = {}
+    for path in index.candidates():
+        rel = index.rel(path)
+        area = "docs/assets" if path.is_relative_to(index.docs_dir) else "generated/pinterest"
+        totals = areas.setdefault(area, [0, 0, 0, 0])
+        size = path.stat().st_size
+        totals[0] += 1
+        totals[1] += size
+        if not index.counts[rel]:
+            totals[2] += 1
+            totals[3] += size
+    return [
+        f"{area}: {files} files, {_mb(size)}; {orphaned} orphaned, {_mb(orphaned_size)}"
+        for area, (files, size, orphaned, orphaned_size) in areas.items()
+    ]
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Find and remove images no page, draft or checkpoint refers to")
+    parser.add_argument("command", choices=["report", "collect"])
+    parser.add_argument("--dry-run", action="store_true", help="with collect: list what would be removed")
+    parser.add_argument("--docs-dir", type=Path, default=REPO_ROOT / "docs")
+    parser.add_argument("--generated-dir", type=Path, default=REPO_ROOT / "generated")
+    args = parser.parse_args()
+
+    index = AssetIndex(REPO_ROOT, args.docs_dir, args.generated_dir).build()
+    print(f"asset_gc: scanned {index.scanned} sources, {index.cached} unchanged since the last run")
+    for line in size_report(index):
+        print(f"asset_gc: {line}")
+    orphans = index.orphans()
+    if args.command == "report" or args.dry_run:
+        for path in orphans:
+            print(f"asset_gc: orphaned {index.rel(path)} ({_mb(path.stat().st_size)})")
+        return
+    freed = 0
+    for path in orphans:
+        freed += path.stat().st_size
+        remove_file(path)
+    print(f"asset_gc: removed {len(orphans)} files, {_mb(freed)}")
+
+
+if __name__ == "__main__":
+    main()
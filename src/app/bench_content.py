@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import sys
+import timeit
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+from .config import REPO_ROOT
+from .content import (
+    ALLOWED_TAGS,
+    _build_pin_description,
+    _build_pin_title,
+    _clean_slug,
+    _cleanup_pin_description,
+    _normalize_recipe,
+    normalize_tag,
+)
+from .gemini_client import parse_json_from_text
+from .output import write_if_changed
+
+BASELINE_PATH = REPO_ROOT / "generated" / "bench_content.json"
+DEFAULT_TOLERANCE = 0.5
+# Large inputs are about 1 MB, an order of magnitude past anything Gemini returns.
+LARGE = 1_000_000
+
+_WORDS = (
+    "sleep gut health fiber walk protein routine stress morning habit meal prep simple easy daily "
+    "week plan energy recipe salad soup oats berries yogurt beans greens water breath stretch"
+).split()
+
+
+@dataclass(frozen=True)
+class Case:
+    """One benchmark: ``op`` applied to every item of ``inputs`` counts as ``len(inputs)`` ops.
+
+    ``target`` is the ops/sec floor that must hold on any machine the workflows run on; the
+    baseline comparison catches smaller regressions on the machine that recorded it.
+    """
+
+    name: str
+    op: Callable[[Any], object]
+    inputs: list[Any]
+    target: float
+
+    def run_once(self) -> None:
+        op = self.op
+        for item in self.inputs:
+            op(item)
+
+
+def _rng_text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words))
+
+
+def _post_fields(rng: random.Random, count: int) -> list[tuple[str, str, str, str, int]]:
+    tags = sorted(ALLOWED_TAGS)
+    fields = []
+    for idx in range(count):
+        title = _rng_text(rng, rng.randint(4, 16)).title()
+        fields.append((title, _clean_slug(title), _rng_text(rng, rng.randint(12, 30)), rng.choice(tags), idx % 3))
+    return fields
+
+
+def _recipe(rng: random.Random, items: int, text_words: int = 6) -> dict[str, Any]:
+    return {
+        "prep_time_minutes": rng.randint(1, 60),
+        "cook_time_minutes": str(rng.randint(1, 90)),
+        "total_time_minutes": rng.randint(1, 120),
+        "servings": "4",
+        "calories_per_serving": "320",
+        "ingredients": [_rng_text(rng, text_words) for _ in range(items)],
+        "instructions": [_rng_text(rng, text_words * 2) for _ in range(items)],
+        "tips": [_rng_text(rng, text_words) for _ in range(items // 2)],
+        "storage": _rng_text(rng, 10),
+    }
+
+
+def _article_json(rng: random.Random, paragraphs: int) -> str:
+    html = "".join(f"<h2>{_rng_text(rng, 4)}</h2><p>{_rng_text(rng, 60)}</p>" for _ in range(paragraphs))
+    payload = {"title": _rng_text(rng, 8), "slug": "s", "html": html, "faq": [{"question": "q", "answer": "a"}]}
+    text = json.dumps(payload)
+    # Mix the shapes Gemini actually returns: bare JSON, fenced JSON, and JSON after prose.
+    return rng.choice([text, f"```json\n{text}\n```", f"Here is the article:\n{text}\nHope this helps."])
+
+
+def _tolerant(op: Callable[[Any], object]) -> Callable[[Any], object]:
+    """Rejecting bad input with ``ValueError`` is the expected outcome for adversarial cases."""
+
+    def call(item: Any) -> object:
+        try:
+            return op(item)
+        except ValueError:
+            return None
+
+    return call
+
+
+def build_cases() -> list[Case]:
+    rng = random.Random(1234)
+    posts = _post_fields(rng, 2_000)
+    words = _rng_text(rng, LARGE // 6)[:LARGE]
+    separators = "-!_ ." * (LARGE // 5)
+    repeated = "this " * (LARGE // 5)
+    no_spaces = "a" * LARGE
+    tags = sorted(ALLOWED_TAGS)
+    raw_tags = [rng.choice(tags).replace("-", rng.choice([" ", "_", " - "])).title() for _ in range(2_000)]
+    return [
+        Case("normalize_tag", normalize_tag, raw_tags, 50_000),
+        Case("normalize_tag/large", normalize_tag, [words, separators, "-" * LARGE, "é" * LARGE], 1),
+        Case("clean_slug", _clean_slug, [title for title, *_ in posts], 20_000),
+        Case("clean_slug/large", _clean_slug, [words, separators, "-" * LARGE, "é" * LARGE], 1),
+        Case(
+            "pin_title",
+            lambda post: _build_pin_title(post[0], post[1], post[2], post[3], variant=post[4]),
+            posts,
+            5_000,
+        ),
+        Case(
+            "pin_title/large",
+            lambda text: _build_pin_title(text, "", text, "health", variant=1),
+            [words, repeated, no_spaces],
+            1,
+        ),
+        Case(
+            "pin_description",
+            lambda post: _build_pin_description(post[0], post[1], post[3], post[2], "", variant=post[4]),
+            posts,
+            1_000,
+        ),
+        Case(
+            "pin_description/large",
+            lambda text: _build_pin_description(text, text[:80], "health", text, text),
+            [words, repeated, no_spaces],
+            2,
+        ),
+        # The fixpoint loop and trailing-CTA regexes, fed directly with unbounded text.
+        Case(
+            "cleanup_pin_description/large",
+            lambda text: _cleanup_pin_description(text, "Save this"),
+            [words, repeated, no_spaces, "Save this. " * (LARGE // 11), "?." * (LARGE // 2)],
+            0.5,
+        ),
+        Case(
+            "normalize_recipe",
+            lambda recipe: _normalize_recipe(recipe, "recipes"),
+            [_recipe(rng, 12) for _ in range(500)],
+            10_000,
+        ),
+        Case(
+            "normalize_recipe/large",
+            _tolerant(lambda recipe: _normalize_recipe(recipe, "recipes")),
+            [_recipe(rng, 20_000), _recipe(rng, 30, text_words=20_000), {**_recipe(rng, 5), "servings": " " * LARGE}],
+            500,
+        ),
+        Case("parse_json", parse_json_from_text, [_article_json(rng, 12) for _ in range(200)], 500),
+        Case(
+            "parse_json/large",
+            _tolerant(parse_json_from_text),
+            [
+                f"Sure! {_article_json(rng, 1_500)}",
+                '{"html": "' + "x" * LARGE,
+                "{" * LARGE,
+                '{"a": "' + "\\" * LARGE + '"}',
+                words,
+                "[" * 50 + "{" + '"a": 1,' * (LARGE // 7) + '"b": 2}',
+            ],
+            2,
+        ),
+    ]
+
+
+def measure(case: Case, min_time: float) -> float:
+    """Best of three ``min_time`` rounds, in ops/sec."""
+    timer = timeit.Timer(case.run_once)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    best = min(timer.repeat(repeat=3, number=number)) / number
+    return len(case.inputs) / best
+
+
+def load_baseline(path: Path) -> dict[str, float]:
+    if not path.exists():
+        return {}
+    return {str(name): float(ops) for name, ops in json.loads(path.read_text(encoding="utf-8")).get("cases", {}).items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the content.py text builders against a baseline")
+    parser.add_argument("--filter", default="", help="only cases whose name contains this text")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per timing round")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed slowdown vs baseline")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="record these results as the new baseline")
+    parser.add_argument(
+        "--targets-only",
+        action="store_true",
+        help="gate on the fixed floors only; the baseline is specific to the machine that recorded it (CI runners)",
+    )
+    args = parser.parse_args()
+
+    baseline = {} if args.targets_only and not args.update_baseline else load_baseline(args.baseline)
+    results: dict[str, float] = {}
+    failures: list[str] = []
+    print(f"{'case':32} {'ops/sec':>12} {'baseline':>12} {'ratio':>7} {'target':>10}")
+    for case in build_cases():
+        if args.filter not in case.name:
+            continue
+        ops = results[case.name] = measure(case, args.min_time)
+        base = baseline.get(case.name)
+        ratio = ops / base if base else None
+        print(
+            f"{case.name:32} {ops:12,.0f} {f'{base:,.0f}' if base else '-':>12} "
+            f"{f'{ratio:.2f}' if ratio else '-':>7} {case.target:10,g}"
+        )
+        if ops < case.target:
+            failures.append(f"{case.name} is below its target ({ops:,.0f} < {case.target:,g} ops/sec)")
+        elif ratio is not None and ratio < 1 - args.tolerance:
+            failures.append(f"{case.name} regressed to {ratio:.0%} of baseline")
+
+    if args.update_baseline:
+        payload = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cases": {**baseline, **{name: round(ops, 1) for name, ops in results.items()}},
+        }
+        write_if_changed(args.baseline, json.dumps(payload, indent=2))
+        print(f"bench_content: baseline written to {args.baseline}")
+    if failures:
+        print("\n".join(f"bench_content: {failure}" for failure in failures))
+        sys.exit(1)
+    print("bench_content: all cases within target")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import secrets
+import shutil
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+from .config import Settings, load_settings
+from .content import normalize_tag
+from .dedupe import NearDuplicateIndex
+from .gemini_client import GeminiClient
+from .images import create_pinterest_image, fetch_hero_image
+from .pipeline import (
+    build_client,
+    build_scheduler,
+    choose_mode,
+    generate_unique_article,
+    hero_prefetcher,
+    pick_offer,
+    record_client_stats,
+)
+from .ratelimit import LIMITER, configure_from_settings
+from .state import load_state, save_state
+from .titles import generate_titles
+from .topics import Topic, load_topics
+
+LOG = logging.getLogger(__name__)
+
+
+@dataclass
+class BufferedPost:
+    id: str
+    created_at: str
+    topic: str
+    mode: str
+    offer: dict[str, Any] | None
+    titles: list[str]
+    post: dict[str, Any]
+
+
+@dataclass
+class ContentBuffer:
+    """Validated, image-ready posts waiting to be published (``generated/buffer/``).
+
+    Each entry is ``{id}.json`` plus ``{id}.jpg`` (hero) and ``{id}.png`` (pin). The JSON is written
+    last, so an entry only exists once both images are on disk; slugs are allocated at publish time.
+    """
+
+    root: Path
+    max_age_days: int = 21
+    _entries: dict[str, BufferedPost] | None = field(default=None, init=False)
+
+    def hero_path(self, entry_id: str) -> Path:
+        return self.root / f"{entry_id}.jpg"
+
+    def pin_path(self, entry_id: str) -> Path:
+        return self.root / f"{entry_id}.png"
+
+    def entries(self) -> list[BufferedPost]:
+        if self._entries is None:
+            self._entries = {}
+            for path in sorted(self.root.glob("*.json")):
+                try:
+                    entry = BufferedPost(**json.loads(path.read_text(encoding="utf-8")))
+                except (json.JSONDecodeError, TypeError):
+                    LOG.warning("Ignoring unreadable buffer entry %s.", path.name)
+                    continue
+                self._entries[entry.id] = entry
+        return sorted(self._entries.values(), key=lambda entry: (entry.created_at, entry.id))
+
+    def __len__(self) -> int:
+        return len(self.entries())
+
+    def get(self, entry_id: str) -> BufferedPost | None:
+        self.entries()
+        assert self._entries is not None
+        return self._entries.get(entry_id)
+
+    def new_id(self) -> str:
+        return f"{datetime.now(timezone.utc):%Y%m%d%H%M%S}-{secrets.token_hex(3)}"
+
+    def add(self, entry: BufferedPost) -> None:
+        if not (self.hero_path(entry.id).is_file() and self.pin_path(entry.id).is_file()):
+            raise ValueError(f"Buffer entry {entry.id} is missing its images")
+        self.entries()
+        assert self._entries is not None
+        tmp_path = self.root / f"{entry.id}.tmp"
+        tmp_path.write_text(json.dumps(asdict(entry), indent=2), encoding="utf-8")
+        os.replace(tmp_path, self.root / f"{entry.id}.json")
+        self._entries[entry.id] = entry
+
+    def take(
+        self, excluded_topics: set[str], dup_index: NearDuplicateIndex, topics: list[Topic]
+    ) -> BufferedPost | None:
+        """Oldest usable entry whose topic is not excluded; stale, broken or duplicate entries are dropped."""
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=self.max_age_days)).isoformat()
+        known_topics = {topic.slug for topic in topics}
+        for entry in self.entries():
+            reason = ""
+            if entry.created_at < cutoff:
+                reason = "older than the buffer age limit"
+            elif entry.topic not in known_topics:
+                reason = "topic no longer in the catalog"
+            elif not (self.hero_path(entry.id).is_file() and self.pin_path(entry.id).is_file()):
+                reason = "images missing"
+            else:
+                match = dup_index.find_title(entry.post["title"]) or dup_index.find_text(entry.post["html"])
+                if match is not None:
+                    reason = f"near-duplicate of {match.slug} ({match.similarity:.2f})"
+            if reason:
+                LOG.info("Dropping buffered post %s: %s.", entry.id, reason)
+                self.remove(entry.id)
+                continue
+            if entry.topic not in excluded_topics:
+                return entry
+        return None
+
+    def remove(self, entry_id: str) -> None:
+        for path in (self.root / f"{entry_id}.json", self.hero_path(entry_id), self.pin_path(entry_id)):
+            path.unlink(missing_ok=True)
+        if self._entries is not None:
+            self._entries.pop(entry_id, None)
+
+    def prune_orphans(self) -> int:
+        """Delete images left behind by fills that died before writing their entry."""
+        ids = {entry.id for entry in self.entries()}
+        removed = 0
+        for path in list(self.root.glob("*.jpg")) + list(self.root.glob("*.png")) + list(self.root.glob("*.tmp")):
+            if path.stem not in ids:
+                path.unlink()
+                removed += 1
+        return removed
+
+
+def fill_buffer(settings: Settings, state: dict, client: GeminiClient, buffer: ContentBuffer, target: int) -> int:
+    """Generate posts until ``buffer`` holds ``target`` entries (at most ``2 * target`` attempts)."""
+    buffer.root.mkdir(parents=True, exist_ok=True)
+    buffer.prune_orphans()
+    # A private index copy: buffered posts must not collide with each other, but are not published yet.
+    dup_index = NearDuplicateIndex.load(settings.generated_dir / "near_duplicates.json", settings.docs_dir)
+    topics = load_topics(settings.topics_path)
+    scheduler = build_scheduler(state, topics)
+    topics_by_slug = {topic.slug: topic for topic in topics}
+    buffered_topics: set[str] = set()
+    for entry in buffer.entries():
+        dup_index.add(f"buffer:{entry.id}", entry.post["title"], entry.post["html"])
+        buffered_topics.add(entry.topic)
+        if entry.topic in topics_by_slug:
+            scheduler.record(topics_by_slug[entry.topic], entry.post["tag"])
+
+    added = 0
+    for _ in range(max(0, target - len(buffer)) * 2):
+        if len(buffer) >= target:
+            break
+        topic = scheduler.pick(excluded_slugs=buffered_topics)
+        mode = choose_mode(state)
+        offer = pick_offer(settings.offers_path, topic.tag) if mode == "offer" else None
+        entry_id = buffer.new_id()
+        try:
+            titles = generate_titles(client, topic)
+            post = generate_unique_article(
+                client, topic, titles, mode, offer, dup_index, on_field=hero_prefetcher(settings.pexels_api_key)
+            )
+            post["tag"] = normalize_tag(post.get("tag", "")) or normalize_tag(topic.tag) or "health"
+            fetch_hero_image(settings.pexels_api_key, post["image_query"], buffer.hero_path(entry_id))
+            create_pinterest_image(
+                settings.pexels_api_key,
+                post["image_query"],
+                post["pin_title"],
+                buffer.pin_path(entry_id),
+                source_image_path=buffer.hero_path(entry_id),
+            )
+            buffer.add(
+                BufferedPost(
+                    id=entry_id,
+                    created_at=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                    topic=topic.slug,
+                    mode=mode,
+                    offer=offer,
+                    titles=titles,
+                    post=post,
+                )
+            )
+        except Exception:  # noqa: BLE001
+            LOG.exception("Failed to buffer a post for %s; trying another topic.", topic.slug)
+            buffer.remove(entry_id)
+            continue
+        dup_index.add(f"buffer:{entry_id}", post["title"], post["html"])
+        buffered_topics.add(topic.slug)
+        scheduler.record(topic, post["tag"])
+        added += 1
+        LOG.info("Buffered %r (%s, %s) as %s.", post["title"], topic.slug, mode, entry_id)
+    return added
+
+
+def claim_images(buffer: ContentBuffer, entry_id: str, hero_out: Path, pin_out: Path) -> None:
+    """Move a buffered entry's images to their published locations."""
+    for source, target in ((buffer.hero_path(entry_id), hero_out), (buffer.pin_path(entry_id), pin_out)):
+        if source.is_file():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(str(source), target)
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Fill or inspect the pre-generated post buffer")
+    parser.add_argument("command", choices=["fill", "status"])
+    parser.add_argument("--target", type=int, default=None, help="entries to keep buffered (default BUFFER_TARGET)")
+    args = parser.parse_args()
+
+    settings = load_settings()
+    buffer = ContentBuffer(settings.generated_dir / "buffer", max_age_days=settings.buffer_max_age_days)
+    if args.command == "fill":
+        configure_from_settings(settings)
+        state_path = settings.generated_dir / "state.json"
+        state = load_state(state_path)
+        client = build_client(settings, state)
+        added = fill_buffer(settings, state, client, buffer, args.target or settings.buffer_target)
+        record_client_stats(state, client)
+        save_state(state_path, state)
+        LIMITER.save()
+        print(f"buffer: added {added} posts")
+    for entry in buffer.entries():
+        print(f"buffer: {entry.id} {entry.topic} {entry.mode} {entry.post.get('title', '')!r}")
+    print(f"buffer: {len(buffer)} posts ready")
+
+
+if __name__ == "__main__":
+    main()
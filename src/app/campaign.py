@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import re
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import date, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterator
+from urllib.parse import urlencode
+
+from PIL import Image, ImageDraw, ImageFont, ImageOps
+
+from .config import REPO_ROOT
+from .content import _build_pin_description, _build_pin_title
+from .output import write_if_changed
+from .pinterest_drafts import DraftStore
+from .post_index import PostIndex, PostRecord, load_archive
+from .site import public_base_url
+
+LOG = logging.getLogger(__name__)
+
+PIN_SIZE = (1000, 1500)
+PIN_QUALITY = 85
+MAX_VARIANTS = 6
+SAVE_EVERY = 50
+# (band colour, text colour) per variant, cycled.
+_PALETTES = [((15, 26, 42), (255, 255, 255)), ((246, 241, 232), (24, 32, 40)), ((33, 87, 73), (255, 255, 255))]
+_NAME_RE = re.compile(r"[a-z0-9][a-z0-9-]*")
+
+
+@dataclass
+class Campaign:
+    """A re-pinning pass over the archive, frozen when first created so reruns resume it.
+
+    Jobs are ``variants`` passes over ``slugs`` (every post's variant 0, then every variant 1, ...),
+    scheduled ``per_day`` pins per day from ``start``. ``done`` counts the leading jobs that are
+    finished, so a rerun starts there; drafts are deduplicated by link in case it lags behind.
+    """
+
+    name: str
+    start: str
+    per_day: int
+    variants: int
+    slugs: list[str]
+    done: int = 0
+    root: Path = field(default=Path(), repr=False)
+
+    @classmethod
+    def load(cls, root: Path) -> Campaign | None:
+        path = root / "campaign.json"
+        if not path.exists():
+            return None
+        return cls(**json.loads(path.read_text(encoding="utf-8")), root=root)
+
+    def save(self) -> None:
+        payload = {key: value for key, value in asdict(self).items() if key != "root"}
+        write_if_changed(self.root / "campaign.json", json.dumps(payload, indent=2))
+
+    @property
+    def total(self) -> int:
+        return len(self.slugs) * self.variants
+
+    def pin_date(self, position: int) -> date:
+        return date.fromisoformat(self.start) + timedelta(days=position // self.per_day)
+
+
+@dataclass(frozen=True)
+class PinJob:
+    position: int
+    pin_date: date
+    title: str
+    description: str
+    link: str
+    alt_text: str
+    hero_path: Path
+    image_path: Path
+    variant: int
+
+
+def campaign_link(public_base: str, post: PostRecord, name: str, variant: int) -> str:
+    """Each variant gets its own UTM-tagged link, so drafts dedupe per variant and clicks are attributable."""
+    query = urlencode(
+        {"utm_source": "pinterest", "utm_medium": "social", "utm_campaign": name, "utm_content": f"v{variant}"}
+    )
+    return f"{public_base}/{post.url}?{query}"
+
+
+def iter_jobs(campaign: Campaign, index: PostIndex, docs_dir: Path, public_base: str) -> Iterator[PinJob]:
+    """Jobs from ``campaign.done`` on, built lazily so only the in-flight window is held in memory."""
+    images_dir = campaign.root / "images"
+    for position in range(campaign.done, campaign.total):
+        variant, slot = divmod(position, len(campaign.slugs))
+        post = index.get(campaign.slugs[slot])
+        if post is None or not post.hero:
+            LOG.warning("Skipping %s: post or hero no longer exists.", campaign.slugs[slot])
+            continue
+        yield PinJob(
+            position=position,
+            pin_date=campaign.pin_date(position),
+            title=_build_pin_title(post.title, post.slug, post.description, post.tag, variant=variant),
+            description=_build_pin_description(post.title, post.slug, post.tag, post.description, "", variant=variant),
+            link=campaign_link(public_base, post, campaign.name, variant),
+            alt_text=post.title,
+            hero_path=docs_dir / post.hero,
+            image_path=images_dir / f"{post.slug}-v{variant}.jpg",
+            variant=variant,
+        )
+
+
+def render_pin(hero_path: Path, title: str, out_path: Path, variant: int) -> None:
+    """Crop the hero to a 2:3 pin and set the title on a band; runs in a worker process."""
+    band, ink = _PALETTES[variant % len(_PALETTES)]
+    with Image.open(hero_path) as hero:
+        canvas = ImageOps.fit(hero.convert("RGB"), PIN_SIZE, Image.Resampling.LANCZOS, centering=(0.5, 0.4))
+    draw = ImageDraw.Draw(canvas, "RGBA")
+    width, height = PIN_SIZE
+    font, lines = _fit_title(draw, title, width - 160)
+    line_height = int(font.size * 1.25)
+    band_height = line_height * len(lines) + 120
+    # Alternate the band between the bottom, top and middle so variants look different in the feed.
+    top = [height - band_height - 90, 90, (height - band_height) // 2][variant % 3]
+    draw.rectangle((40, top, width - 40, top + band_height), fill=(*band, 225))
+    for row, line in enumerate(lines):
+        draw.text((80, top + 60 + row * line_height), line, font=font, fill=ink)
+    # Write then rename, so an interrupted run never leaves a truncated image that looks finished.
+    partial = out_path.with_suffix(".part")
+    canvas.save(partial, format="JPEG", quality=PIN_QUALITY, optimize=True)
+    os.replace(partial, out_path)
+
+
+def _fit_title(draw: ImageDraw.ImageDraw, title: str, max_width: int) -> tuple[ImageFont.FreeTypeFont, list[str]]:
+    for size in (76, 68, 60, 52):
+        font = _font(size)
+        lines = _wrap(draw, title, font, max_width)
+        if len(lines) <= 4:
+            return font, lines
+    return font, lines[:4]
+
+
+def _wrap(draw: ImageDraw.ImageDraw, text: str, font: ImageFont.FreeTypeFont, max_width: int) -> list[str]:
+    lines: list[str] = []
+    for word in text.split():
+        if lines and draw.textlength(f"{lines[-1]} {word}", font=font) <= max_width:
+            lines[-1] = f"{lines[-1]} {word}"
+        else:
+            lines.append(word)
+    return lines
+
+
+@lru_cache(maxsize=None)
+def _font(size: int) -> ImageFont.FreeTypeFont:
+    try:
+        return ImageFont.truetype("DejaVuSans-Bold.ttf", size)
+    except OSError:
+        return ImageFont.load_default(size=size)
+
+
+@dataclass
+class CampaignResult:
+    drafted: int = 0
+    skipped: int = 0
+    failed: int = 0
+
+
+def run_campaign(
+    campaign: Campaign,
+    docs_dir: Path,
+    public_base: str,
+    workers: int,
+    limit: int | None = None,
+) -> CampaignResult:
+    """Render and draft pending jobs in a bounded, ordered window over a process pool.
+
+    Results are consumed in job order, so ``done`` only advances past a contiguous run of finished
+    jobs; a failed render keeps it in place and the next run retries from there.
+    """
+    index = PostIndex.from_dicts(load_archive(docs_dir))
+    store = DraftStore(campaign.root)
+    result = CampaignResult()
+    jobs = iter_jobs(campaign, index, docs_dir, public_base)
+    window: deque[tuple[PinJob, Future[None] | None]] = deque()
+    advancing = True
+    (campaign.root / "images").mkdir(parents=True, exist_ok=True)
+
+    def settle(job: PinJob, future: Future[None] | None) -> None:
+        nonlocal advancing
+        try:
+            if future is not None:
+                future.result()
+        except Exception as exc:  # noqa: BLE001
+            LOG.warning("Pin for %s failed: %s", job.link, exc)
+            result.failed += 1
+            advancing = False
+            return
+        item = {
+            "title": job.title,
+            "description": job.description,
+            "link": job.link,
+            "image_path": _draft_image_path(job.image_path),
+            "alt_text": job.alt_text,
+        }
+        if store.append(job.pin_date, item):
+            result.drafted += 1
+        else:
+            result.skipped += 1
+        if advancing:
+            campaign.done = job.position + 1
+            if campaign.done % SAVE_EVERY == 0:
+                campaign.save()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for taken, job in enumerate(jobs):
+            if limit is not None and taken >= limit:
+                break
+            future = None
+            if not job.image_path.is_file():
+                future = pool.submit(render_pin, job.hero_path, job.title, job.image_path, job.variant)
+            window.append((job, future))
+            if len(window) >= workers * 4:
+                settle(*window.popleft())
+        while window:
+            settle(*window.popleft())
+    if advancing and limit is None:
+        campaign.done = campaign.total
+    campaign.save()
+    return result
+
+
+def _draft_image_path(path: Path) -> str:
+    """Repo-relative like every other draft (as ``AssetIndex.rel`` counts it), or absolute outside the repo."""
+    resolved = path.resolve()
+    try:
+        return resolved.relative_to(REPO_ROOT.resolve()).as_posix()
+    except ValueError:
+        return resolved.as_posix()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Draft fresh pin variants for every archived post")
+    parser.add_argument("name", help="campaign name, also used as utm_campaign (lowercase letters, digits, dashes)")
+    parser.add_argument("--variants", type=int, default=3, help=f"pin variants per post (1-{MAX_VARIANTS})")
+    parser.add_argument("--per-day", type=int, default=25, help="pins scheduled per draft-pack day")
+    parser.add_argument("--start", type=date.fromisoformat, default=None, help="first pack date (default tomorrow)")
+    parser.add_argument("--tag", default=None, help="only posts with this tag")
+    parser.add_argument("--limit", type=int, default=None, help="stop after this many pins; rerun to continue")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--docs-dir", type=Path, default=REPO_ROOT / "docs")
+    parser.add_argument("--generated-dir", type=Path, default=REPO_ROOT / "generated")
+    parser.add_argument("--base-url", default=os.getenv("BASE_URL", ""))
+    args = parser.parse_args()
+    if not _NAME_RE.fullmatch(args.name):
+        parser.error("campaign name must be lowercase letters, digits and dashes")
+    if not 1 <= args.variants <= MAX_VARIANTS or args.per_day < 1:
+        parser.error(f"--variants must be 1-{MAX_VARIANTS} and --per-day at least 1")
+
+    root = args.generated_dir / "pinterest" / "campaigns" / args.name
+    campaign = Campaign.load(root)
+    if campaign is None:
+        index = PostIndex.from_dicts(load_archive(args.docs_dir))
+        posts = index.in_tag(args.tag) if args.tag else list(index)
+        campaign = Campaign(
+            name=args.name,
+            start=(args.start or date.today() + timedelta(days=1)).isoformat(),
+            per_day=args.per_day,
+            variants=args.variants,
+            slugs=[post.slug for post in reversed(posts)],
+            root=root,
+        )
+        LOG.info("Created campaign %s: %s posts x %s variants.", campaign.name, len(campaign.slugs), campaign.variants)
+    else:
+        LOG.info("Resuming campaign %s at %s/%s (its original options apply).", campaign.name, campaign.done, campaign.total)
+
+    result = run_campaign(campaign, args.docs_dir, public_base_url(args.base_url), args.workers, args.limit)
+    packs = DraftStore(root).export(root)
+    print(
+        f"campaign: {campaign.name} drafted {result.drafted}, already drafted {result.skipped}, "
+        f"failed {result.failed}; {campaign.done}/{campaign.total} done, {len(packs) // 2} packs in {root}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable, TypeVar
+
+from .profiling import span
+
+LOG = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+MAX_SLOT_ATTEMPTS = 3
+DONE = "done"
+
+
+@dataclass
+class SlotCheckpoint:
+    """Stage outputs of one daily slot, saved after every stage so a rerun resumes where it failed.
+
+    Lives at ``generated/checkpoints/{run_date}/slot-{n}.json`` as
+    ``{"attempts": int, "stages": {stage: output}}``; stage outputs must be JSON-serializable.
+    """
+
+    path: Path
+    attempts: int = 0
+    stages: dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, root: Path, run_date: date, slot: int) -> SlotCheckpoint:
+        path = root / run_date.isoformat() / f"slot-{slot + 1}.json"
+        if not path.exists():
+            return cls(path=path)
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            LOG.warning("Checkpoint %s is unreadable; the slot starts over.", path)
+            return cls(path=path)
+        return cls(path=path, attempts=int(raw.get("attempts", 0)), stages=dict(raw.get("stages", {})))
+
+    @property
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    @property
+    def finished(self) -> bool:
+        return DONE in self.stages
+
+    def begin_attempt(self) -> None:
+        self.attempts += 1
+        self._write()
+
+    def get(self, stage: str) -> Any | None:
+        return self.stages.get(stage)
+
+    def record(self, stage: str, output: Any) -> None:
+        self.stages[stage] = output
+        self._write()
+
+    def stage(self, name: str, run: Callable[[], T], valid: Callable[[T], bool] | None = None) -> T:
+        """Return the saved output of ``name`` when still valid; otherwise run it and save the result."""
+        if name in self.stages and (valid is None or valid(self.stages[name])):
+            LOG.info("Resuming %s: reusing checkpointed %s.", self.path.stem, name)
+            return self.stages[name]
+        with span(name):
+            output = run()
+        self.record(name, output)
+        return output
+
+    def _write(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps({"attempts": self.attempts, "stages": self.stages}, indent=2), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+
+def purge_checkpoints(root: Path, keep: date, docs_dir: Path, repo_root: Path) -> int:
+    """Drop checkpoint runs other than ``keep``, deleting images of slots that never got published.
+
+    Hero paths are relative to ``docs_dir``, pin paths to ``repo_root``.
+    """
+    if not root.exists():
+        return 0
+    removed = 0
+    for run_dir in sorted(path for path in root.iterdir() if path.is_dir()):
+        if run_dir.name == keep.isoformat():
+            continue
+        for slot_file in run_dir.glob("slot-*.json"):
+            try:
+                stages = json.loads(slot_file.read_text(encoding="utf-8")).get("stages", {})
+            except json.JSONDecodeError:
+                continue
+            if "published" in stages:
+                continue
+            for rel, base in ((stages.get("hero"), docs_dir), (stages.get("pin"), repo_root)):
+                if isinstance(rel, str) and (base / rel).is_file():
+                    (base / rel).unlink()
+        shutil.rmtree(run_dir)
+        removed += 1
+    return removed
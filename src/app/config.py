@@ -1,14 +1,34 @@
 from __future__ import annotations
 
+import json
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 from pathlib import Path
+from typing import Any
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SITES_CONFIG_PATH = REPO_ROOT / "sites.json"
+# Per-site keys a sites.json entry may set on top of the shared environment settings.
+SITE_OVERRIDES = {
+    "site_title",
+    "posts_per_week",
+    "buffer_target",
+    "buffer_max_age_days",
+    "pinterest_board_id",
+    "pinterest_enable_publish",
+}
 
 
 @dataclass(frozen=True)
 class Settings:
     gemini_api_keys: list[str]
     gemini_model: str
+    gemini_stream: bool
+    gemini_hedge_percentile: float
+    gemini_hedge_budget: float
+    gemini_rpm_per_key: float
+    gemini_tpm_per_key: float
+    pexels_requests_per_hour: float
     pexels_api_key: str
     base_url: str
     site_title: str
@@ -16,8 +36,19 @@ class Settings:
     pinterest_access_token: str
     pinterest_board_id: str
     pinterest_enable_publish: bool
+    pinterest_pins_per_minute: float
+    pinterest_queue_workers: int
     posts_per_week: int
+    buffer_target: int
+    buffer_max_age_days: int
+    rate_limit_persist: bool
     repo_root: Path
+    docs_dir: Path
+    generated_dir: Path
+    topics_path: Path
+    offers_path: Path
+    # Empty for the single site configured by BASE_URL; the sites.json id otherwise.
+    site_id: str = ""
 
 
 def _required(name: str) -> str:
@@ -40,16 +71,114 @@ def _load_gemini_keys() -> list[str]:
 
 
 def load_settings() -> Settings:
+    return _env_settings(_required("BASE_URL"))
+
+
+def _env_settings(base_url: str) -> Settings:
     return Settings(
         gemini_api_keys=_load_gemini_keys(),
         gemini_model="gemini-2.5-flash-lite",
+        gemini_stream=_bool_flag("GEMINI_STREAM", "1"),
+        gemini_hedge_percentile=float(os.getenv("GEMINI_HEDGE_PERCENTILE", "0").strip()),
+        gemini_hedge_budget=float(os.getenv("GEMINI_HEDGE_BUDGET", "0.2").strip()),
+        gemini_rpm_per_key=float(os.getenv("GEMINI_RPM_PER_KEY", "15").strip()),
+        gemini_tpm_per_key=float(os.getenv("GEMINI_TPM_PER_KEY", "250000").strip()),
+        pexels_requests_per_hour=float(os.getenv("PEXELS_REQUESTS_PER_HOUR", "200").strip()),
         pexels_api_key=_required("PEXELS_API_KEY"),
-        base_url=_required("BASE_URL").rstrip("/"),
+        base_url=base_url.rstrip("/"),
         site_title=os.getenv("SITE_TITLE", "Practical US Health Notes").strip(),
         timezone=os.getenv("TZ", "UTC").strip(),
         pinterest_access_token=os.getenv("PINTEREST_ACCESS_TOKEN", "").strip(),
         pinterest_board_id=os.getenv("PINTEREST_BOARD_ID", "").strip(),
         pinterest_enable_publish=_bool_flag("PINTEREST_ENABLE_PUBLISH"),
+        pinterest_pins_per_minute=float(os.getenv("PINTEREST_PINS_PER_MINUTE", "10").strip()),
+        pinterest_queue_workers=int(os.getenv("PINTEREST_QUEUE_WORKERS", "4").strip()),
         posts_per_week=int(os.getenv("POSTS_PER_WEEK", "5").strip()),
-        repo_root=Path(__file__).resolve().parents[2],
+        buffer_target=int(os.getenv("BUFFER_TARGET", "4").strip()),
+        buffer_max_age_days=int(os.getenv("BUFFER_MAX_AGE_DAYS", "21").strip()),
+        rate_limit_persist=_bool_flag("RATE_LIMIT_PERSIST"),
+        repo_root=REPO_ROOT,
+        docs_dir=REPO_ROOT / "docs",
+        generated_dir=REPO_ROOT / "generated",
+        topics_path=REPO_ROOT / "topics.json",
+        offers_path=REPO_ROOT / "offers.json",
     )
+
+
+@dataclass(frozen=True)
+class SiteConfig:
+    """One entry of ``sites.json``: where a site lives in the repo and what it overrides."""
+
+    id: str
+    base_url: str
+    docs_dir: Path
+    generated_dir: Path
+    topics_path: Path
+    offers_path: Path
+    pinterest_token_env: str = "PINTEREST_ACCESS_TOKEN"
+    overrides: dict[str, Any] = field(default_factory=dict)
+
+
+def load_site_configs(path: Path = SITES_CONFIG_PATH) -> list[SiteConfig]:
+    """Parse ``sites.json`` (a list of site objects); paths are relative to the repo root.
+
+    Only ``id`` and ``base_url`` are required. Roots default to ``sites/{id}/docs`` and
+    ``sites/{id}/generated`` and must stay inside the repo, since the workflows commit them.
+    """
+    raw = json.loads(path.read_text(encoding="utf-8"))
+    if not isinstance(raw, list) or not raw:
+        raise ValueError(f"{path.name} must be a non-empty list of sites")
+    sites: list[SiteConfig] = []
+    for entry in raw:
+        site_id = str(entry.get("id", "")).strip()
+        base_url = str(entry.get("base_url", "")).strip().rstrip("/")
+        if not site_id or not base_url:
+            raise ValueError(f"{path.name}: every site needs an id and a base_url")
+        unknown = set(entry) - SITE_OVERRIDES - {
+            "id", "base_url", "docs_dir", "generated_dir", "topics", "offers", "pinterest_token_env"
+        }
+        if unknown:
+            raise ValueError(f"{path.name}: site {site_id} has unknown keys {sorted(unknown)}")
+        sites.append(
+            SiteConfig(
+                id=site_id,
+                base_url=base_url,
+                docs_dir=_repo_path(entry.get("docs_dir", f"sites/{site_id}/docs")),
+                generated_dir=_repo_path(entry.get("generated_dir", f"sites/{site_id}/generated")),
+                topics_path=_repo_path(entry.get("topics", "topics.json")),
+                offers_path=_repo_path(entry.get("offers", "offers.json")),
+                pinterest_token_env=str(entry.get("pinterest_token_env", "PINTEREST_ACCESS_TOKEN")),
+                overrides={key: entry[key] for key in SITE_OVERRIDES if key in entry},
+            )
+        )
+    for attr in ("id", "docs_dir", "generated_dir"):
+        values = [getattr(site, attr) for site in sites]
+        if len(set(values)) != len(values):
+            raise ValueError(f"{path.name}: sites must not share a {attr}")
+    return sites
+
+
+def load_site_settings(path: Path = SITES_CONFIG_PATH) -> list[Settings]:
+    """Settings for every site in ``sites.json``; API keys and limits come from the environment."""
+    shared = _env_settings(base_url="")
+    return [
+        replace(
+            shared,
+            site_id=site.id,
+            base_url=site.base_url,
+            docs_dir=site.docs_dir,
+            generated_dir=site.generated_dir,
+            topics_path=site.topics_path,
+            offers_path=site.offers_path,
+            pinterest_access_token=os.getenv(site.pinterest_token_env, "").strip(),
+            **site.overrides,
+        )
+        for site in load_site_configs(path)
+    ]
+
+
+def _repo_path(value: str) -> Path:
+    path = (REPO_ROOT / value).resolve()
+    if REPO_ROOT not in [path, *path.parents]:
+        raise ValueError(f"Site path {value!r} is outside the repository")
+    return path
@@ -1,11 +1,23 @@
 from __future__ import annotations
 
 import hashlib
+import json
+import logging
 import re
 from typing import Any
 
-from .gemini_client import GeminiClient
+from .gemini_client import FieldCallback, GeminiClient
 from .topics import Topic
+from .validation import (
+    REPAIRABLE_FIELDS,
+    ArticleValidationError,
+    Defect,
+    apply_local_fixes,
+    stream_defect,
+    validate_article,
+)
+
+LOG = logging.getLogger(__name__)
 
 ALLOWED_TAGS = {
     "sleep",
@@ -22,8 +34,8 @@ ALLOWED_TAGS = {
 }
 
 CONTENT_PROMPT = """Write a US-focused health article.
-Return strict JSON object only (no markdown) with keys exactly:
-title,slug,meta_description,html,image_query,pin_title,pin_description,alt_text,tag,faq
+Return strict JSON object only (no markdown) with keys exactly, in this order:
+title,slug,meta_description,image_query,alt_text,tag,html,faq
 Input:
 - topic_name: {topic_name}
 - angle: {angle}
@@ -68,6 +80,23 @@ Rules:
 """
 
 
+REPAIR_PROMPT = """You are fixing specific fields of a US-focused health article that failed validation.
+Return strict JSON object only (no markdown) with exactly these keys: {fields}
+Problems found:
+{problems}
+Article context:
+- topic_name: {topic_name}
+- title: {title}
+- tag: {tag}
+- meta_description: {meta_description}
+- section headings: {headings}
+{recipe_context}Field formats:
+- faq: array of 3-5 objects [{{"question":"...","answer":"..."}}] answered from the article; concise answers.
+- recipe: object with prep_time_minutes, cook_time_minutes, total_time_minutes (positive integers), servings, calories_per_serving, ingredients (array), instructions (array), tips (array), storage.
+- every other key: a plain, non-empty string that fits the article.
+"""
+
+
 def normalize_tag(raw: str) -> str:
     cleaned = "".join(ch.lower() if ch.isalnum() else "-" for ch in (raw or ""))
     while "--" in cleaned:
@@ -82,6 +111,7 @@ def generate_article(
     title: str,
     mode: str,
     offer: dict[str, Any] | None,
+    on_field: FieldCallback | None = None,
 ) -> dict[str, Any]:
     payload = client.generate_json(
         CONTENT_PROMPT.format(
@@ -94,24 +124,23 @@ def generate_article(
             allowed_tags=", ".join(sorted(ALLOWED_TAGS)),
         ),
         max_output_tokens=3200,
+        on_field=on_field,
+        check_field=lambda key, value: stream_defect(key, value, mode),
     )
 
-    required = [
-        "title",
-        "slug",
-        "meta_description",
-        "html",
-        "image_query",
-        "pin_title",
-        "pin_description",
-        "alt_text",
-    ]
-    for key in required:
-        if key not in payload or not isinstance(payload[key], str) or not payload[key].strip():
-            raise ValueError(f"Missing or invalid article field: {key}")
+    final_tag = normalize_tag(str(payload.get("tag", ""))) or normalize_tag(topic.tag) or "health"
+    defects = apply_local_fixes(payload, validate_article(payload, mode, final_tag), mode)
+    repairable = [defect for defect in defects if defect.field in REPAIRABLE_FIELDS]
+    if repairable:
+        payload.update(_repair_fields(client, payload, repairable, topic, final_tag))
+        defects = apply_local_fixes(payload, validate_article(payload, mode, final_tag), mode)
+    fatal = [defect for defect in defects if defect.fatal]
+    if fatal:
+        raise ArticleValidationError(fatal)
+    for defect in defects:
+        LOG.warning("Article defect kept after repair: %s", defect)
 
     cleaned_slug = _clean_slug(payload["slug"])
-    final_tag = normalize_tag(str(payload.get("tag", ""))) or normalize_tag(topic.tag) or "health"
     payload["slug"] = cleaned_slug
     payload["tag"] = final_tag
     payload["pin_title"] = _build_pin_title(payload["title"], cleaned_slug, payload.get("meta_description", ""), final_tag)
@@ -132,6 +161,38 @@ def generate_article(
     return payload
 
 
+def _repair_fields(
+    client: GeminiClient,
+    payload: dict[str, Any],
+    defects: list[Defect],
+    topic: Topic,
+    tag: str,
+) -> dict[str, Any]:
+    fields = sorted({defect.field for defect in defects})
+    html = str(payload.get("html", ""))
+    headings = [re.sub(r"<[^>]+>", "", item).strip() for item in re.findall(r"<h2[^>]*>(.*?)</h2>", html, re.I | re.S)]
+    recipe_context = ""
+    if "recipe" in fields:
+        recipe_section = html[html.find('id="recipe"') :] if 'id="recipe"' in html else html
+        recipe_context = f"- recipe section text: {_normalize_whitespace(re.sub(r'<[^>]+>', ' ', recipe_section))[:1500]}\n"
+    LOG.info("Requesting targeted repair for fields: %s", ", ".join(fields))
+    client.count("repairs")
+    repaired = client.generate_json(
+        REPAIR_PROMPT.format(
+            fields=", ".join(fields),
+            problems="\n".join(f"- {defect}" for defect in defects),
+            topic_name=topic.name,
+            title=payload.get("title", "") or topic.name,
+            tag=tag,
+            meta_description=payload.get("meta_description", ""),
+            headings=json.dumps(headings[:12]),
+            recipe_context=recipe_context,
+        ),
+        max_output_tokens=1200,
+    )
+    return {key: value for key, value in repaired.items() if key in fields}
+
+
 def _normalize_faq(raw: Any) -> list[dict[str, str]]:
     if not isinstance(raw, list):
         return []
@@ -181,9 +242,10 @@ def _extract_first_sentence(html: str) -> str:
     return _trim_at_word_boundary(first, 100)
 
 
-def _build_pin_title(title: str, slug: str, meta_description: str, tag: str) -> str:
+def _build_pin_title(title: str, slug: str, meta_description: str, tag: str, variant: int = 0) -> str:
+    """Variant 0 is the post's own pin title; higher variants pick other templates deterministically."""
     normalized_title = _normalize_whitespace(title)
-    if 40 <= len(normalized_title) <= 70:
+    if not variant and 40 <= len(normalized_title) <= 70:
         return normalized_title
 
     keyword = _trim_at_word_boundary(normalized_title, 38)
@@ -196,7 +258,7 @@ def _build_pin_title(title: str, slug: str, meta_description: str, tag: str) ->
         "Small Changes, Real Results: {keyword}",
         "Your Practical Plan for {keyword}",
     ]
-    idx = _stable_template_index(slug or normalized_title, len(templates))
+    idx = (_stable_template_index(slug or normalized_title, len(templates)) + variant) % len(templates)
     candidate = templates[idx].format(keyword=keyword.lower())
     if len(candidate) < 40:
         candidate = _normalize_whitespace(f"{candidate}: {benefit_hint}")
@@ -251,7 +313,9 @@ def _cleanup_pin_description(text: str, cta: str) -> str:
     return _normalize_whitespace(text)
 
 
-def _build_pin_description(title: str, slug: str, tag: str, meta_description: str, html: str) -> str:
+def _build_pin_description(
+    title: str, slug: str, tag: str, meta_description: str, html: str, variant: int = 0
+) -> str:
     del title
     tag_phrase = tag.replace("-", " ")
     base_topic = _trim_at_word_boundary(_normalize_whitespace(meta_description).lower(), 54)
@@ -275,8 +339,9 @@ def _build_pin_description(title: str, slug: str, tag: str, meta_description: st
         "Looking for a practical reset? This {specific} strategy helps you improve {tag} habits with clear, manageable steps.",
     ]
 
-    idx = _stable_template_index(seed, len(templates))
-    specific = specificity[_stable_template_index(f"{seed}-specific", len(specificity))]
+    # Shifting by the variant keeps every variant below len(templates) on a different template.
+    idx = (_stable_template_index(seed, len(templates)) + variant) % len(templates)
+    specific = specificity[(_stable_template_index(f"{seed}-specific", len(specificity)) + variant) % len(specificity)]
     cta = ctas[_stable_template_index(f"{seed}-cta", len(ctas))]
 
     template_text = templates[idx].format(topic=base_topic, tag=tag_phrase, specific=specific, cta=cta)
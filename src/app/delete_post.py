@@ -1,48 +1,189 @@
 from __future__ import annotations
 
 import argparse
-import json
+import re
+from dataclasses import dataclass, field
+from datetime import date
+from fnmatch import fnmatchcase
 from pathlib import Path
+from typing import Any
 
-from .config import load_settings
+from .asset_gc import AssetIndex
+from .config import Settings, load_settings
+from .dedupe import NearDuplicateIndex
+from .indexnow import queue_changes
+from .locking import file_lock
+from .output import build_manifest, remove_file, write_if_changed
+from .pin_queue import PinQueue
+from .post_index import load_archive
 from .site import write_site_state
+from .slug_index import SlugIndex
 
+# Cards rendered by site._render_post_card; one that links to a removed post is dropped whole.
+_CARD_RE = re.compile(r"<article class='post-card'[^>]*>.*?</article>", re.DOTALL)
 
-def delete_post(slug: str, delete_hero: bool = False) -> None:
-    settings = load_settings()
-    docs_dir = settings.repo_root / "docs"
-    post_path = docs_dir / f"{slug}.html"
+
+@dataclass
+class DeleteResult:
+    removed: list[str] = field(default_factory=list)
+    pages_rewritten: int = 0
+    assets_removed: int = 0
+    pins_dropped: int = 0
+
+
+def select_posts(
+    posts: list[dict[str, Any]],
+    patterns: list[str],
+    since: date | None = None,
+    until: date | None = None,
+) -> list[dict[str, Any]]:
+    """Posts whose slug matches any of ``patterns`` (exact or glob) and whose date is in range.
+
+    With no patterns, the date range alone selects; at least one filter is required.
+    """
+    if not patterns and since is None and until is None:
+        raise ValueError("Select posts by slug, glob or date range")
+    low = since.isoformat() if since else ""
+    high = until.isoformat() if until else "9999-12-31"
+    return [
+        post
+        for post in posts
+        if (not patterns or any(fnmatchcase(str(post.get("slug", "")), pattern) for pattern in patterns))
+        and low <= str(post.get("date", "")) <= high
+    ]
+
+
+def delete_posts(
+    settings: Settings,
+    patterns: list[str],
+    since: date | None = None,
+    until: date | None = None,
+    keep_assets: bool = False,
+    dry_run: bool = False,
+) -> DeleteResult:
+    """Delete every selected post with one site rebuild.
+
+    Pages that linked to a removed post lose its cards and have remaining links pointed at
+    its tag hub. Its hero and pin images are removed once nothing else refers to them, and its
+    pending pins are dropped from the publish queue.
+    """
+    docs_dir = settings.docs_dir
     posts_path = docs_dir / "posts.json"
+    result = DeleteResult()
+    # Held from read to rebuild, so a publish finishing meanwhile merges into the result instead of losing it.
+    with file_lock(posts_path):
+        posts = load_archive(docs_dir)
+        removed = select_posts(posts, patterns, since, until)
+        result.removed = [str(post["slug"]) for post in removed]
+        if dry_run or not removed:
+            return result
+        removed_slugs = set(result.removed)
+        kept = [post for post in posts if post.get("slug") not in removed_slugs]
+
+        slug_index = SlugIndex.load(settings.generated_dir / "slug_index.json", docs_dir)
+        dup_index = NearDuplicateIndex.load(settings.generated_dir / "near_duplicates.json", docs_dir)
+        for slug in removed_slugs:
+            slug_index.discard(slug)
+            dup_index.discard(slug)
+        slug_index.save()
+        dup_index.save()
+
+        # Deleted pages are submitted too, so crawlers see their 404 instead of waiting to stumble on them.
+        with build_manifest(docs_dir) as manifest:
+            for post in removed:
+                remove_file(docs_dir / _page(post))
+            write_site_state(docs_dir, settings.base_url, settings.site_title, kept)
+            live_tags = {str(post.get("tag", "")) for post in kept}
+            result.pages_rewritten = rewrite_inbound_links(docs_dir, removed, live_tags)
+            if not keep_assets:
+                result.assets_removed = _remove_assets(settings, removed)
+        queue_changes(settings.generated_dir, manifest)
+
+    queue = PinQueue.load(settings.generated_dir / "pinterest" / "queue.json")
+    result.pins_dropped = queue.discard_pending({_page(post) for post in removed})
+    if result.pins_dropped:
+        queue.save()
+    return result
+
+
+def delete_post(slug: str, delete_hero: bool = False) -> None:
+    delete_posts(load_settings(), [slug], keep_assets=not delete_hero)
+
+
+def rewrite_inbound_links(docs_dir: Path, removed: list[dict[str, Any]], live_tags: set[str]) -> int:
+    """Clean up links to ``removed`` posts in every page that has one; returns pages changed."""
+    targets = {_page(post): str(post.get("tag", "")) for post in removed}
+    heroes = [str(post["hero"]) for post in removed if post.get("hero")]
+    page_alternatives = "|".join(re.escape(page) for page in targets)
+    link_re = re.compile(r"""href=(['"])((?:\.\./)?)(""" + page_alternatives + r""")(?:[#?][^'"]*)?\1""")
+    hero_re = None
+    if heroes:
+        hero_alternatives = "|".join(re.escape(hero) for hero in heroes)
+        hero_re = re.compile(r"""<img\b[^>]*\bsrc=(['"])(?:\.\./)?(?:""" + hero_alternatives + r""")\1[^>]*>""")
+
+    def relink(match: re.Match[str]) -> str:
+        quote, prefix, page = match.groups()
+        tag = targets[page]
+        target = f"tag/{tag}.html" if tag in live_tags else "index.html"
+        return f"href={quote}{prefix}{target}{quote}"
 
-    posts: list[dict] = []
-    if posts_path.exists():
-        posts = json.loads(posts_path.read_text(encoding="utf-8"))
+    changed = 0
+    for page in [*sorted(docs_dir.glob("*.html")), *sorted((docs_dir / "tag").glob("*.html"))]:
+        text = page.read_text(encoding="utf-8")
+        if not link_re.search(text):
+            continue
+        text = _CARD_RE.sub(lambda card: "" if link_re.search(card.group(0)) else card.group(0), text)
+        text = link_re.sub(relink, text)
+        if hero_re is not None:
+            # Older card markup keeps the image outside a post-card block.
+            text = hero_re.sub("", text)
+        changed += write_if_changed(page, text)
+    return changed
 
-    removed = None
-    kept: list[dict] = []
-    for post in posts:
-        if post.get("slug") == slug and removed is None:
-            removed = post
-        else:
-            kept.append(post)
 
-    if post_path.exists():
-        post_path.unlink()
+def _remove_assets(settings: Settings, removed: list[dict[str, Any]]) -> int:
+    """Remove heroes and pin images of ``removed`` posts that nothing else refers to anymore."""
+    slugs = [re.escape(str(post["slug"])) for post in removed]
+    heroes = {(settings.docs_dir / str(post["hero"])).resolve() for post in removed if post.get("hero")}
+    index = AssetIndex(settings.repo_root, settings.docs_dir, settings.generated_dir).build()
+    count = 0
+    for path in index.orphans():
+        # Pins are "{date}_{slug}.png"; campaign pins are "{slug}-v{n}.jpg".
+        if path.resolve() in heroes or any(re.fullmatch(rf"[\d-]+_{slug}|{slug}-v\d+", path.stem) for slug in slugs):
+            count += remove_file(path)
+    return count
 
-    if delete_hero and removed and removed.get("hero"):
-        hero_path = docs_dir / str(removed["hero"])
-        if hero_path.exists() and hero_path.is_file():
-            hero_path.unlink()
 
-    write_site_state(docs_dir, settings.base_url, settings.site_title, kept)
+def _page(post: dict[str, Any]) -> str:
+    return str(post.get("url") or f"{post['slug']}.html")
 
 
 def main() -> None:
-    parser = argparse.ArgumentParser(description="Delete a post and rebuild site indexes")
-    parser.add_argument("--slug", required=True)
-    parser.add_argument("--delete-hero", action="store_true")
+    parser = argparse.ArgumentParser(description="Delete posts and rebuild site indexes once")
+    parser.add_argument(
+        "--slug",
+        action="append",
+        default=[],
+        help="slug or glob such as 'calorie-*'; repeat or separate with commas",
+    )
+    parser.add_argument("--since", type=date.fromisoformat, default=None, help="only posts dated on or after")
+    parser.add_argument("--until", type=date.fromisoformat, default=None, help="only posts dated on or before")
+    parser.add_argument("--keep-assets", action="store_true", help="keep hero and pin images")
+    parser.add_argument("--dry-run", action="store_true", help="list the selected posts without deleting")
+    parser.add_argument("--delete-hero", action="store_true", help=argparse.SUPPRESS)  # now the default
     args = parser.parse_args()
-    delete_post(args.slug, delete_hero=args.delete_hero)
+    patterns = [part.strip() for value in args.slug for part in value.split(",") if part.strip()]
+    try:
+        result = delete_posts(load_settings(), patterns, args.since, args.until, args.keep_assets, args.dry_run)
+    except ValueError as exc:
+        parser.error(str(exc))
+    verb = "would delete" if args.dry_run else "deleted"
+    print(f"delete_post: {verb} {len(result.removed)} posts: {', '.join(result.removed) or '-'}")
+    if not args.dry_run and result.removed:
+        print(
+            f"delete_post: rewrote {result.pages_rewritten} linking pages, removed {result.assets_removed} images, "
+            f"dropped {result.pins_dropped} queued pins"
+        )
 
 
 if __name__ == "__main__":
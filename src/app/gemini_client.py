@@ -1,83 +1,367 @@
 from __future__ import annotations
 
+import itertools
 import json
 import logging
 import time
-from dataclasses import dataclass
-from typing import Any
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable
 
 import requests
 
+from .hedging import Hedger
+from .http_pool import SESSION
+from .json_stream import ObjectFieldParser, find_repetition
+from .ratelimit import GEMINI_REQUESTS, GEMINI_TOKENS, LIMITER
+
 LOG = logging.getLogger(__name__)
 API_BASE = "https://generativelanguage.googleapis.com/v1beta/models"
 
 
+MAX_CONTINUATIONS = 2
+CONTINUE_PROMPT = (
+    "Your previous reply was cut off by the output limit. Continue exactly where it stopped: "
+    "output only the remaining characters, do not repeat anything already written, "
+    "and do not wrap the output in code fences."
+)
+REPETITION_CHECK_CHARS = 400
+
+# on_field(key, value) runs as soon as a top-level field completes; check_field(key, value)
+# returns a reason string when the value dooms the whole response.
+FieldCallback = Callable[[str, Any], None]
+FieldCheck = Callable[[str, Any], "str | None"]
+
+
+class StreamAborted(RuntimeError):
+    """A streamed response was cut off early because its output could not be used."""
+
+
 @dataclass(frozen=True)
 class GeminiClient:
     api_keys: list[str]
     model: str
     timeout_seconds: int = 45
+    stream: bool = False
+    hedger: Hedger[requests.Response] | None = field(default=None, compare=False)
+    stats: Counter = field(default_factory=Counter, compare=False)
+    _cursor: itertools.count = field(default_factory=itertools.count, compare=False, repr=False)
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """Bump ``stats[name]``; under the hedger's lock when hedging, whose threads share the counter."""
+        if self.hedger is not None:
+            self.hedger.count(self.stats, name, amount)
+        else:
+            self.stats[name] += amount
 
-    def generate_json(self, prompt: str, max_output_tokens: int = 1800) -> dict[str, Any]:
-        text = self.generate_text(prompt, max_output_tokens=max_output_tokens)
+    def generate_json(
+        self,
+        prompt: str,
+        max_output_tokens: int = 1800,
+        on_field: FieldCallback | None = None,
+        check_field: FieldCheck | None = None,
+    ) -> dict[str, Any]:
+        emitted: set[str] = set()
+        if self.stream:
+            watcher = _StreamWatcher(self.count, on_field, check_field)
+            text, finish_reason = self._stream(_user_turn(prompt), max_output_tokens, watcher)
+            emitted = watcher.emitted
+        else:
+            text, finish_reason = self._generate(_user_turn(prompt), max_output_tokens, strip=False)
+        payload = self._complete_json(prompt, text, finish_reason, max_output_tokens)
+        if on_field is not None:
+            for key, value in payload.items():
+                if key not in emitted:
+                    on_field(key, value)
+        return payload
+
+    def _complete_json(self, prompt: str, text: str, finish_reason: str, max_output_tokens: int) -> dict[str, Any]:
+        """Parse ``text``, asking the model to continue it when it was cut off.
+
+        ``text`` and each continuation stay unstripped until the final parse: a cut next to a space
+        inside a string would otherwise stitch "improve your" + " sleep" into "yoursleep".
+        """
+        try:
+            return parse_json_from_text(text)
+        except json.JSONDecodeError as exc:
+            if finish_reason != "MAX_TOKENS" and exc.msg != "Unclosed JSON object":
+                raise
+            self.count("truncated")
+            LOG.warning("Gemini output truncated (finishReason=%s); requesting continuation.", finish_reason)
+
+        for _ in range(MAX_CONTINUATIONS):
+            contents = _user_turn(prompt) + [
+                {"role": "model", "parts": [{"text": text}]},
+                {"role": "user", "parts": [{"text": CONTINUE_PROMPT}]},
+            ]
+            self.count("continuations")
+            continuation, finish_reason = self._generate(
+                contents, max_output_tokens, mime_type="text/plain", strip=False
+            )
+            text = _stitch(text, continuation)
+            try:
+                payload = parse_json_from_text(text)
+            except json.JSONDecodeError:
+                if finish_reason == "MAX_TOKENS":
+                    continue
+                break
+            self.count("continuation_recovered")
+            return payload
+
+        # Last resort: one full regeneration with more room.
+        self.count("regenerations")
+        LOG.warning("Continuation did not produce valid JSON; regenerating the full response.")
+        text, _ = self._generate(_user_turn(prompt), int(max_output_tokens * 1.5))
         return parse_json_from_text(text)
 
+    def _key_order(self) -> list[int]:
+        """1-based key indexes, starting one key later on each call so load spreads across keys."""
+        start = next(self._cursor) % len(self.api_keys)
+        return [(start + offset) % len(self.api_keys) + 1 for offset in range(len(self.api_keys))]
+
     def generate_text(self, prompt: str, max_output_tokens: int = 1800) -> str:
-        payload = {
-            "contents": [{"parts": [{"text": prompt}]}],
-            "generationConfig": {
-                "temperature": 0.6,
-                "maxOutputTokens": max_output_tokens,
-                "responseMimeType": "application/json",
-            },
-        }
+        return self._generate(_user_turn(prompt), max_output_tokens)[0]
+
+    def _generate(
+        self,
+        contents: list[dict[str, Any]],
+        max_output_tokens: int,
+        mime_type: str = "application/json",
+        strip: bool = True,
+    ) -> tuple[str, str]:
+        payload = _request_body(contents, max_output_tokens, mime_type)
         errors: list[str] = []
         for attempt in range(2):
-            for key_idx, api_key in enumerate(self.api_keys, start=1):
+            for key_idx in self._key_order():
                 try:
                     endpoint = f"{API_BASE}/{self.model}:generateContent"
-                    response = requests.post(
-                        endpoint,
-                        params={"key": api_key},
-                        json=payload,
-                        timeout=self.timeout_seconds,
-                    )
+                    self.count("requests")
+                    key_idx, response = self._post(endpoint, payload, key_idx)
                 except requests.RequestException as exc:
                     msg = f"key#{key_idx} network_error={type(exc).__name__}"
                     errors.append(msg)
                     LOG.warning("Gemini request failed: %s", msg)
+                    if self.hedger is not None:
+                        self.hedger.mark_unhealthy(key_idx)
                     continue
 
-                if response.status_code in {429, 500, 502, 503, 504}:
-                    msg = f"key#{key_idx} transient_status={response.status_code}"
-                    errors.append(msg)
-                    LOG.warning("Gemini transient failure; trying next key: %s", msg)
-                    continue
-                if response.status_code >= 400:
-                    msg = f"key#{key_idx} http_error={response.status_code} body={response.text[:160]}"
+                msg = _status_error(key_idx, response)
+                if msg:
                     errors.append(msg)
-                    LOG.warning("Gemini non-retriable failure: %s", msg)
                     continue
 
                 body = response.json()
-                text = _extract_text(body)
-                if text:
-                    return text
+                text = _extract_text(body, strip=strip)
+                if text.strip():
+                    return text, _extract_finish_reason(body)
                 msg = f"key#{key_idx} empty_response"
                 errors.append(msg)
 
             time.sleep(1.2 * (attempt + 1))
         raise RuntimeError(f"Gemini failed after key failover: {'; '.join(errors)}")
 
+    def _post(self, endpoint: str, payload: dict[str, Any], key_idx: int) -> tuple[int, requests.Response]:
+        """POST with key ``key_idx``; in hedging mode a slow call may be answered by another key."""
+
+        def send(idx: int) -> requests.Response:
+            _reserve_quota(idx, payload)
+            return SESSION.post(
+                endpoint,
+                params={"key": self.api_keys[idx - 1]},
+                json=payload,
+                timeout=self.timeout_seconds,
+            )
+
+        if self.hedger is None:
+            return key_idx, send(key_idx)
+        return self.hedger.call(
+            key_idx,
+            send,
+            accept=lambda response: response.status_code < 400,
+            stats=self.stats,
+            discard=lambda response: response.close(),
+        )
+
+    def _stream(
+        self,
+        contents: list[dict[str, Any]],
+        max_output_tokens: int,
+        watcher: _StreamWatcher,
+    ) -> tuple[str, str]:
+        """Like ``_generate`` (unstripped) but over ``streamGenerateContent`` (SSE), feeding chunks to ``watcher``.
+
+        ``StreamAborted`` from the watcher closes the connection and propagates: a doomed output
+        is not a key problem, so there is no failover for it.
+        """
+        payload = _request_body(contents, max_output_tokens, "application/json")
+        errors: list[str] = []
+        for attempt in range(2):
+            for key_idx in self._key_order():
+                watcher.reset()
+                try:
+                    endpoint = f"{API_BASE}/{self.model}:streamGenerateContent"
+                    self.count("requests")
+                    self.count("streamed")
+                    _reserve_quota(key_idx, payload)
+                    with SESSION.post(
+                        endpoint,
+                        params={"key": self.api_keys[key_idx - 1], "alt": "sse"},
+                        json=payload,
+                        timeout=self.timeout_seconds,
+                        stream=True,
+                    ) as response:
+                        msg = _status_error(key_idx, response)
+                        if msg:
+                            errors.append(msg)
+                            continue
+                        finish_reason = ""
+                        for line in response.iter_lines():
+                            if not line.startswith(b"data:"):
+                                continue
+                            chunk = json.loads(line[5:].decode("utf-8"))
+                            finish_reason = _extract_finish_reason(chunk) or finish_reason
+                            piece = _extract_text(chunk, strip=False)
+                            if piece:
+                                watcher.feed(piece)
+                except (requests.RequestException, json.JSONDecodeError, UnicodeDecodeError) as exc:
+                    msg = f"key#{key_idx} stream_error={type(exc).__name__}"
+                    errors.append(msg)
+                    LOG.warning("Gemini stream failed: %s", msg)
+                    continue
+
+                text = watcher.parser.text
+                if text.strip():
+                    return text, finish_reason
+                errors.append(f"key#{key_idx} empty_response")
+
+            time.sleep(1.2 * (attempt + 1))
+        raise RuntimeError(f"Gemini failed after key failover: {'; '.join(errors)}")
+
+
+class _StreamWatcher:
+    """Parses streamed text as it arrives, vets completed fields and watches for degenerate loops."""
+
+    def __init__(
+        self,
+        count: Callable[[str, int], None],
+        on_field: FieldCallback | None,
+        check_field: FieldCheck | None,
+    ) -> None:
+        self.count = count
+        self.on_field = on_field
+        self.check_field = check_field
+        self.reset()
+
+    def reset(self) -> None:
+        self.parser = ObjectFieldParser()
+        self.emitted: set[str] = set()
+        self._started = time.monotonic()
+        self._checked_at = 0
+
+    def feed(self, piece: str) -> None:
+        for key, value in self.parser.feed(piece):
+            if key in self.emitted:
+                self._abort(f"field {key!r} emitted twice")
+            if not self.emitted:
+                self.count("first_field_ms", int((time.monotonic() - self._started) * 1000))
+            self.emitted.add(key)
+            reason = self.check_field(key, value) if self.check_field else None
+            if reason:
+                self._abort(reason)
+            if self.on_field:
+                self.on_field(key, value)
+        text = self.parser.text
+        if len(text) - self._checked_at >= REPETITION_CHECK_CHARS:
+            self._checked_at = len(text)
+            if find_repetition(text):
+                self._abort("output repeats itself")
+
+    def _abort(self, reason: str) -> None:
+        self.count("stream_aborts", 1)
+        LOG.warning("Aborting Gemini stream after %s chars: %s", len(self.parser.text), reason)
+        raise StreamAborted(reason)
+
+
+def _request_body(contents: list[dict[str, Any]], max_output_tokens: int, mime_type: str) -> dict[str, Any]:
+    return {
+        "contents": contents,
+        "generationConfig": {
+            "temperature": 0.6,
+            "maxOutputTokens": max_output_tokens,
+            "responseMimeType": mime_type,
+        },
+    }
+
+
+def _reserve_quota(key_idx: int, payload: dict[str, Any]) -> None:
+    """Wait for this key's request and token budget instead of spending a request on a 429."""
+    estimate = len(json.dumps(payload["contents"])) // 4 + int(payload["generationConfig"]["maxOutputTokens"])
+    LIMITER.acquire(GEMINI_REQUESTS, f"key#{key_idx}")
+    LIMITER.acquire(GEMINI_TOKENS, f"key#{key_idx}", estimate)
+
+
+def _status_error(key_idx: int, response: requests.Response) -> str:
+    if response.status_code == 429:
+        LIMITER.exhaust(GEMINI_REQUESTS, f"key#{key_idx}")
+    if response.status_code in {429, 500, 502, 503, 504}:
+        msg = f"key#{key_idx} transient_status={response.status_code}"
+        LOG.warning("Gemini transient failure; trying next key: %s", msg)
+        return msg
+    if response.status_code >= 400:
+        msg = f"key#{key_idx} http_error={response.status_code} body={response.text[:160]}"
+        LOG.warning("Gemini non-retriable failure: %s", msg)
+        return msg
+    return ""
+
+
+def _user_turn(prompt: str) -> list[dict[str, Any]]:
+    return [{"role": "user", "parts": [{"text": prompt}]}]
+
+
+def _extract_finish_reason(payload: dict[str, Any]) -> str:
+    try:
+        return str(payload["candidates"][0].get("finishReason", ""))
+    except (KeyError, TypeError, IndexError, AttributeError):
+        return ""
+
+
+def _stitch(partial: str, continuation: str) -> str:
+    """Join a truncated output and its continuation, both unstripped so whitespace at the cut survives."""
+    fenced = continuation.lstrip()
+    if fenced.startswith("```"):
+        # Drop the fence lines only; _strip_code_fences would also trim the text at the cut.
+        body = fenced.split("\n", 1)[1] if "\n" in fenced else ""
+        continuation = body.rsplit("```", 1)[0] if "```" in body else body
+    if continuation.lstrip().startswith("{") and _is_complete_json(continuation):
+        # The model started over instead of continuing; the fresh object is the better result.
+        return continuation
+    joined = partial + continuation
+    if _is_complete_json(joined):
+        return joined
+    # The model may have repeated the tail of the partial output; try dropping the overlap.
+    # Short overlaps are ignored since a shared quote or brace is usually legitimate output.
+    for size in range(min(len(partial), len(continuation), 200), 11, -1):
+        if partial.endswith(continuation[:size]) and _is_complete_json(partial + continuation[size:]):
+            return partial + continuation[size:]
+    return joined
+
+
+def _is_complete_json(text: str) -> bool:
+    try:
+        parse_json_from_text(text)
+    except json.JSONDecodeError:
+        return False
+    return True
+
 
-def _extract_text(payload: dict[str, Any]) -> str:
+def _extract_text(payload: dict[str, Any], strip: bool = True) -> str:
     try:
         candidates = payload.get("candidates", [])
         if not candidates:
             return ""
         parts = candidates[0]["content"]["parts"]
         text = "".join(part.get("text", "") for part in parts)
-        return text.strip()
+        return text.strip() if strip else text
     except (KeyError, TypeError, IndexError):
         return ""
 
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Callable, Generic, Iterable, TypeVar
+
+LOG = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+MIN_SAMPLES = 5
+SAMPLE_WINDOW = 50
+KEY_COOLDOWN_SECONDS = 60.0
+
+
+class LatencyTracker:
+    """Sliding window of recent request latencies (seconds) with nearest-rank percentiles."""
+
+    def __init__(self, samples: Iterable[float] = (), window: int = SAMPLE_WINDOW) -> None:
+        self._samples: deque[float] = deque((float(value) for value in samples), maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> float | None:
+        with self._lock:
+            if len(self._samples) < MIN_SAMPLES:
+                return None
+            ordered = sorted(self._samples)
+        rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+        return ordered[rank]
+
+    def samples(self) -> list[float]:
+        with self._lock:
+            return list(self._samples)
+
+
+class Hedger(Generic[T]):
+    """Fires a backup request on another healthy key once the primary outlives a latency percentile.
+
+    Whichever request finishes first with an acceptable result wins. The other is cancelled if it
+    has not started, and otherwise handed to ``discard`` when it lands (closing a response returns
+    its pooled connection instead of holding it until garbage collection). Backups are capped at
+    ``budget`` times the number of primary calls, so hedging never spends more than that fraction
+    of extra quota.
+    """
+
+    def __init__(
+        self,
+        key_count: int,
+        percentile: float,
+        budget: float,
+        default_delay: float,
+        samples: Iterable[float] = (),
+    ) -> None:
+        self.key_count = key_count
+        self.percentile = percentile
+        self.budget = budget
+        self.default_delay = default_delay
+        self.latency = LatencyTracker(samples)
+        self.calls = 0
+        self.hedges = 0
+        self._cooling: dict[int, float] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="gemini-hedge")
+
+    def mark_unhealthy(self, key_idx: int) -> None:
+        with self._lock:
+            self._cooling[key_idx] = time.monotonic() + KEY_COOLDOWN_SECONDS
+
+    def count(self, stats: Counter, name: str, amount: int = 1) -> None:
+        """Bump a shared stats counter; hedged requests update it from several threads."""
+        with self._lock:
+            stats[name] += amount
+
+    def delay(self) -> float:
+        return self.latency.percentile(self.percentile) or self.default_delay
+
+    def call(
+        self,
+        primary_idx: int,
+        send: Callable[[int], T],
+        accept: Callable[[T], bool],
+        stats: Counter,
+        discard: Callable[[T], None] | None = None,
+    ) -> tuple[int, T]:
+        """Run ``send(primary_idx)``, hedging onto another key if it is slow; return ``(key_idx, result)``."""
+        started = time.monotonic()
+        with self._lock:
+            self.calls += 1
+        primary = self._pool.submit(send, primary_idx)
+        try:
+            result = primary.result(timeout=self.delay())
+        except FutureTimeout:
+            pass
+        else:
+            self._observe(primary_idx, result, accept, started)
+            return primary_idx, result
+
+        backup_idx = self._reserve_backup(primary_idx)
+        if backup_idx is None:
+            result = primary.result()
+            self._observe(primary_idx, result, accept, started)
+            return primary_idx, result
+
+        self.count(stats, "hedges")
+        LOG.info("Gemini key#%s exceeded %.1fs; hedging on key#%s.", primary_idx, time.monotonic() - started, backup_idx)
+        backup = self._pool.submit(send, backup_idx)
+        pending: dict[Future[T], int] = {primary: primary_idx, backup: backup_idx}
+        fallback: tuple[int, T] | None = None
+        first_error: BaseException | None = None
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            # Prefer the primary when both land in the same tick.
+            for future in sorted(done, key=lambda item: item is not primary):
+                key_idx = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as exc:  # noqa: BLE001
+                    self.mark_unhealthy(key_idx)
+                    first_error = first_error or exc
+                    continue
+                if not accept(result):
+                    self.mark_unhealthy(key_idx)
+                    if fallback is None:
+                        fallback = (key_idx, result)
+                    elif discard is not None:
+                        discard(result)
+                    continue
+                elapsed = time.monotonic() - started
+                self.latency.observe(elapsed)
+                if future is backup:
+                    self.count(stats, "hedge_wins")
+                    primary.add_done_callback(lambda _: self._credit_savings(stats, started, elapsed))
+                if fallback is not None and discard is not None:
+                    discard(fallback[1])
+                for loser in pending:
+                    if not loser.cancel():
+                        loser.add_done_callback(lambda item: self._discard(item, discard))
+                return key_idx, result
+        if fallback is not None:
+            return fallback
+        assert first_error is not None
+        raise first_error
+
+    def samples(self) -> list[float]:
+        return self.latency.samples()
+
+    def _observe(self, key_idx: int, result: T, accept: Callable[[T], bool], started: float) -> None:
+        if accept(result):
+            self.latency.observe(time.monotonic() - started)
+        else:
+            self.mark_unhealthy(key_idx)
+
+    def _reserve_backup(self, primary_idx: int) -> int | None:
+        with self._lock:
+            if self.hedges + 1 > self.budget * self.calls:
+                return None
+            now = time.monotonic()
+            for offset in range(1, self.key_count):
+                candidate = (primary_idx - 1 + offset) % self.key_count + 1
+                if self._cooling.get(candidate, 0.0) <= now:
+                    self.hedges += 1
+                    return candidate
+        return None
+
+    def _discard(self, future: Future[T], discard: Callable[[T], None] | None) -> None:
+        if discard is None or future.cancelled() or future.exception() is not None:
+            return
+        try:
+            discard(future.result())
+        except Exception:  # noqa: BLE001
+            LOG.debug("Discarding a hedged result failed.", exc_info=True)
+
+    def _credit_savings(self, stats: Counter, started: float, winner_elapsed: float) -> None:
+        saved_ms = int((time.monotonic() - started - winner_elapsed) * 1000)
+        self.count(stats, "hedge_saved_ms", max(0, saved_ms))
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+import requests
+from requests.adapters import HTTPAdapter
+
+POOL_CONNECTIONS = 8
+POOL_MAXSIZE = 16
+
+
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# One keep-alive connection pool per process for Gemini, Pexels and Pinterest; every site in a
+# multi-site run reuses it, so TLS handshakes are paid once per host rather than once per call.
+SESSION = _build_session()
@@ -1,19 +1,76 @@
 from __future__ import annotations
 
+import logging
 import shutil
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 
 import requests
 
+from .http_pool import SESSION
+from .ratelimit import LIMITER, PEXELS_REQUESTS
+
+LOG = logging.getLogger(__name__)
+
+SEARCH_CACHE_SIZE = 256
+
+_SEARCH_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="pexels-search")
+# Pexels searches by (api_key, query), shared by every site in the process. Failed searches are
+# evicted so the next caller retries them.
+_SEARCHES: OrderedDict[tuple[str, str], Future[str]] = OrderedDict()
+_SEARCHES_LOCK = threading.Lock()
+
+
+def prefetch_photo_url(api_key: str, query: str) -> None:
+    """Start the Pexels search for ``query`` in the background; the next fetch for it reuses the result."""
+    if query.strip():
+        _search(api_key, query.strip())
+
+
+def _search(api_key: str, query: str) -> Future[str]:
+    key = (api_key, query)
+    with _SEARCHES_LOCK:
+        pending = _SEARCHES.get(key)
+        if pending is not None:
+            _SEARCHES.move_to_end(key)
+            return pending
+        pending = _SEARCH_POOL.submit(_search_photo_url, api_key, query)
+        _SEARCHES[key] = pending
+        while len(_SEARCHES) > SEARCH_CACHE_SIZE:
+            _SEARCHES.popitem(last=False)
+    pending.add_done_callback(lambda future: _evict_failed(key, future))
+    return pending
+
+
+def _evict_failed(key: tuple[str, str], future: Future[str]) -> None:
+    if future.exception() is None:
+        return
+    with _SEARCHES_LOCK:
+        if _SEARCHES.get(key) is future:
+            del _SEARCHES[key]
+
 
 def _pexels_photo_url(api_key: str, query: str) -> str:
+    try:
+        return _search(api_key, query.strip()).result()
+    except (requests.RequestException, ValueError, KeyError) as exc:
+        LOG.warning("Pexels search for %r failed (%s); retrying.", query, exc)
+    return _search_photo_url(api_key, query)
+
+
+def _search_photo_url(api_key: str, query: str) -> str:
     headers = {"Authorization": api_key}
-    response = requests.get(
+    LIMITER.acquire(PEXELS_REQUESTS)
+    response = SESSION.get(
         "https://api.pexels.com/v1/search",
         headers=headers,
         params={"query": query, "orientation": "landscape", "per_page": 1},
         timeout=40,
     )
+    if response.status_code == 429:
+        LIMITER.exhaust(PEXELS_REQUESTS)
     response.raise_for_status()
     photos = response.json().get("photos", [])
     if not photos:
@@ -24,7 +81,7 @@ def _pexels_photo_url(api_key: str, query: str) -> str:
 def fetch_hero_image(api_key: str, query: str, out_path: Path) -> None:
     url = _pexels_photo_url(api_key, query)
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    content = requests.get(url, timeout=40).content
+    content = SESSION.get(url, timeout=40).content
     out_path.write_bytes(content)
 
 
@@ -44,4 +101,4 @@ def create_pinterest_image(
 
     # Fallback to direct Pexels download when no source image path is provided.
     url = _pexels_photo_url(api_key, query)
-    out_path.write_bytes(requests.get(url, timeout=40).content)
+    out_path.write_bytes(SESSION.get(url, timeout=40).content)
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from typing import Callable
+from urllib.parse import urlparse
+
+import requests
+
+from .config import REPO_ROOT, SITES_CONFIG_PATH, load_site_configs
+from .http_pool import SESSION
+from .output import BuildManifest, write_if_changed
+from .site import public_base_url
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_ENDPOINT = "https://api.indexnow.org/indexnow"
+PENDING_FILE = "indexnow_pending.json"
+MAX_URLS_PER_REQUEST = 10_000
+MAX_ATTEMPTS = 4
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+def load_pending(generated_dir: Path) -> dict[str, str]:
+    """Changed pages not yet accepted by IndexNow: ``{docs-relative path: change kind}``."""
+    path = generated_dir / PENDING_FILE
+    if not path.exists():
+        return {}
+    try:
+        raw = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        LOG.warning("%s is unreadable; starting with no pending IndexNow URLs.", path)
+        return {}
+    return {str(rel): str(kind) for rel, kind in raw.items()}
+
+
+def save_pending(generated_dir: Path, pending: dict[str, str]) -> None:
+    write_if_changed(generated_dir / PENDING_FILE, json.dumps(dict(sorted(pending.items())), indent=2))
+
+
+def queue_changes(generated_dir: Path, manifest: BuildManifest) -> int:
+    """Merge a build's page changes into the pending list; returns how many pages it touched."""
+    changes = manifest.changes()
+    if changes:
+        pending = load_pending(generated_dir)
+        pending.update(changes)
+        save_pending(generated_dir, pending)
+    return len(changes)
+
+
+def page_url(public_base: str, rel: str) -> str:
+    if rel == "index.html":
+        return f"{public_base}/"
+    return f"{public_base}/{rel}"
+
+
+@dataclass
+class SubmitResult:
+    submitted: int
+    failed: int
+    message: str = ""
+
+
+def submit_urls(
+    urls: list[str],
+    key: str,
+    key_location: str,
+    endpoint: str = DEFAULT_ENDPOINT,
+    batch_size: int = MAX_URLS_PER_REQUEST,
+    sleep: Callable[[float], None] = time.sleep,
+) -> SubmitResult:
+    """POST ``urls`` (all on one host) to IndexNow in batches, retrying throttled or failed batches.
+
+    Stops at the first batch that cannot be delivered, so later batches stay pending too.
+    """
+    if not urls:
+        return SubmitResult(submitted=0, failed=0)
+    host = urlparse(urls[0]).netloc
+    submitted = 0
+    for start in range(0, len(urls), batch_size):
+        batch = urls[start : start + batch_size]
+        payload = {"host": host, "key": key, "keyLocation": key_location, "urlList": batch}
+        error = _post_batch(endpoint, payload, sleep)
+        if error:
+            return SubmitResult(submitted=submitted, failed=len(urls) - submitted, message=error)
+        submitted += len(batch)
+    return SubmitResult(submitted=submitted, failed=0)
+
+
+def _post_batch(endpoint: str, payload: dict, sleep: Callable[[float], None]) -> str:
+    error = ""
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            response = SESSION.post(
+                endpoint,
+                json=payload,
+                headers={"Content-Type": "application/json; charset=utf-8"},
+                timeout=30,
+            )
+        except requests.RequestException as exc:
+            error = f"{type(exc).__name__}: {exc}"
+        else:
+            if response.status_code in {200, 202}:
+                return ""
+            error = f"HTTP {response.status_code}: {response.text[:160]}"
+            if response.status_code not in RETRYABLE_STATUSES:
+                # 400/403/422: bad request, key not verified yet, or URLs off-host. Retrying won't help.
+                return error
+        if attempt + 1 < MAX_ATTEMPTS:
+            delay = 2.0**attempt
+            LOG.warning("IndexNow batch failed (%s); retrying in %.0fs.", error, delay)
+            sleep(delay)
+    return error
+
+
+def ensure_key_file(docs_dir: Path, key: str) -> None:
+    """IndexNow verifies ownership by fetching ``{base}/{key}.txt``."""
+    write_if_changed(docs_dir / f"{key}.txt", key)
+
+
+def flush_pending(
+    docs_dir: Path,
+    generated_dir: Path,
+    public_base: str,
+    key: str,
+    endpoint: str = DEFAULT_ENDPOINT,
+    dry_run: bool = False,
+) -> SubmitResult:
+    pending = load_pending(generated_dir)
+    rels = list(pending)
+    urls = [page_url(public_base, rel) for rel in rels]
+    if dry_run or not urls:
+        for url in urls:
+            print(f"indexnow: would submit {url}")
+        return SubmitResult(submitted=0, failed=0)
+    ensure_key_file(docs_dir, key)
+    result = submit_urls(urls, key, f"{public_base}/{key}.txt", endpoint)
+    for rel in rels[: result.submitted]:
+        pending.pop(rel)
+    save_pending(generated_dir, pending)
+    return result
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Local stand-in for the IndexNow endpoint: logs each batch and answers 202."""
+
+    def do_POST(self) -> None:  # noqa: N802
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", "0"))) or b"{}")
+        print(f"indexnow-stub: {body.get('host')} key={body.get('key')} urls={len(body.get('urlList', []))}")
+        for url in body.get("urlList", []):
+            print(f"  {url}")
+        self.send_response(202)
+        self.end_headers()
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        return
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Submit changed pages to IndexNow")
+    parser.add_argument("command", choices=["submit", "status", "stub"])
+    parser.add_argument("--endpoint", default=os.getenv("INDEXNOW_ENDPOINT", DEFAULT_ENDPOINT))
+    parser.add_argument("--dry-run", action="store_true", help="print the URLs instead of submitting them")
+    parser.add_argument("--port", type=int, default=8765, help="port for the local stub endpoint")
+    args = parser.parse_args()
+
+    if args.command == "stub":
+        print(f"indexnow-stub: listening on http://127.0.0.1:{args.port}/indexnow")
+        HTTPServer(("127.0.0.1", args.port), _StubHandler).serve_forever()
+        return
+
+    # Failed pages stay pending and are retried by the next run, so failures are not fatal.
+    targets = [("", REPO_ROOT / "docs", REPO_ROOT / "generated", public_base_url(os.getenv("BASE_URL", "")))]
+    if SITES_CONFIG_PATH.exists():
+        sites = load_site_configs(SITES_CONFIG_PATH)
+        targets = [target for target in targets if target[1] not in {site.docs_dir for site in sites}]
+        targets += [(site.id, site.docs_dir, site.generated_dir, site.base_url) for site in sites]
+
+    key = os.getenv("INDEXNOW_KEY", "").strip()
+    for site_id, docs_dir, generated_dir, public_base in targets:
+        label = site_id or "default"
+        if args.command == "status":
+            print(f"indexnow: {label} has {len(load_pending(generated_dir))} pending pages")
+            continue
+        if not key and not args.dry_run:
+            print(f"indexnow: INDEXNOW_KEY is not set; {label} keeps {len(load_pending(generated_dir))} pages pending")
+            continue
+        result = flush_pending(docs_dir, generated_dir, public_base, key, args.endpoint, dry_run=args.dry_run)
+        print(f"indexnow: {label} submitted {result.submitted}, still pending {result.failed} {result.message}".rstrip())
+
+
+if __name__ == "__main__":
+    main()
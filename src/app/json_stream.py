@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+_SEEK, _KEY, _KEY_STR, _COLON, _VALUE_START, _VALUE, _AFTER, _DONE, _BROKEN = range(9)
+_WHITESPACE = " \t\r\n"
+
+
+class ObjectFieldParser:
+    """Incremental parser for the top-level fields of one streamed JSON object.
+
+    ``feed`` accepts text chunks as they arrive and returns every ``(key, value)`` pair whose
+    value finished in that chunk, so callers can act on early fields before the object closes.
+    Anything before the first ``{`` (code fences, prose) is skipped. Malformed input stops field
+    emission instead of raising; the caller still parses the full text once the stream ends.
+    """
+
+    def __init__(self) -> None:
+        self.text = ""
+        self._pos = 0
+        self._state = _SEEK
+        self._start = 0
+        self._key = ""
+        self._depth = 0
+        self._in_str = False
+        self._esc = False
+        self._scalar = False
+
+    @property
+    def done(self) -> bool:
+        return self._state == _DONE
+
+    @property
+    def broken(self) -> bool:
+        return self._state == _BROKEN
+
+    def feed(self, chunk: str) -> list[tuple[str, Any]]:
+        self.text += chunk
+        fields: list[tuple[str, Any]] = []
+        text = self.text
+        while self._pos < len(text) and self._state not in (_DONE, _BROKEN):
+            ch = text[self._pos]
+            state = self._state
+            if state == _SEEK:
+                if ch == "{":
+                    self._state = _KEY
+            elif state == _KEY:
+                if ch == '"':
+                    self._start, self._esc, self._state = self._pos, False, _KEY_STR
+                elif ch == "}":
+                    self._state = _DONE
+                elif ch not in _WHITESPACE:
+                    self._state = _BROKEN
+            elif state == _KEY_STR:
+                if self._esc:
+                    self._esc = False
+                elif ch == "\\":
+                    self._esc = True
+                elif ch == '"':
+                    self._key = json.loads(text[self._start : self._pos + 1])
+                    self._state = _COLON
+            elif state == _COLON:
+                if ch == ":":
+                    self._state = _VALUE_START
+                elif ch not in _WHITESPACE:
+                    self._state = _BROKEN
+            elif state == _VALUE_START:
+                if ch not in _WHITESPACE:
+                    self._start, self._state = self._pos, _VALUE
+                    self._in_str, self._esc = ch == '"', False
+                    self._depth = 1 if ch in "{[" else 0
+                    self._scalar = ch not in '"{['
+                    if self._scalar:
+                        continue  # re-read this character as part of the scalar
+            elif state == _VALUE:
+                end = self._scan_value(ch)
+                if end is not None:
+                    field = self._finish_value(text[self._start : end])
+                    if field is not None:
+                        fields.append(field)
+                    if end == self._pos:
+                        continue  # the scalar terminator belongs to the next state
+            elif state == _AFTER:
+                if ch == ",":
+                    self._state = _KEY
+                elif ch == "}":
+                    self._state = _DONE
+                elif ch not in _WHITESPACE:
+                    self._state = _BROKEN
+            self._pos += 1
+        return fields
+
+    def _scan_value(self, ch: str) -> int | None:
+        """Advance over one value character; return the value's end offset once it is complete."""
+        if self._scalar:
+            return self._pos if ch in _WHITESPACE or ch in ",}" else None
+        if self._in_str:
+            if self._esc:
+                self._esc = False
+            elif ch == "\\":
+                self._esc = True
+            elif ch == '"':
+                self._in_str = False
+                if self._depth == 0:
+                    return self._pos + 1
+            return None
+        if ch == '"':
+            self._in_str = True
+        elif ch in "{[":
+            self._depth += 1
+        elif ch in "}]":
+            self._depth -= 1
+            if self._depth == 0:
+                return self._pos + 1
+        return None
+
+    def _finish_value(self, raw: str) -> tuple[str, Any] | None:
+        self._state = _AFTER
+        try:
+            return self._key, json.loads(raw, strict=False)
+        except json.JSONDecodeError:
+            self._state = _BROKEN
+            return None
+
+
+def find_repetition(text: str, window: int = 200, min_hits: int = 4) -> bool:
+    """True when the last ``window`` characters already occur ``min_hits`` times in ``text``."""
+    if len(text) < window * min_hits:
+        return False
+    tail = text[-window:]
+    return not tail.isspace() and text.count(tail) >= min_hits
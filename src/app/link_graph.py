@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import posixpath
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from .config import REPO_ROOT
+from .output import write_if_changed
+from .post_index import PostIndex, PostRecord, load_archive
+
+LOG = logging.getLogger(__name__)
+
+CACHE_FILE = "link_graph.json"
+DAMPING = 0.85
+TOLERANCE = 1e-6
+MAX_ITERATIONS = 100
+# How strongly a low rank pulls a post into the placeholders: 0 ignores rank, 1 weighs it fully.
+RANK_BIAS = 0.5
+OTHER_TAG_RELEVANCE = 0.25
+_HREF_RE = re.compile(r"""href\s*=\s*(['"])([^'"]+)\1""", re.IGNORECASE)
+_WORD_RE = re.compile(r"[a-z0-9]{4,}")
+
+
+@dataclass
+class LinkGraph:
+    """Internal links between the pages in ``docs`` and a PageRank-style score for each page.
+
+    Each page's outgoing links are cached by content digest in ``generated/link_graph.json``
+    (mtimes do not survive a checkout), so a refresh only parses pages that changed since. Within
+    one process, pages whose size and mtime are unchanged are not even reread. Cached ranks seed
+    the next iteration, which then converges in a few rounds instead of from scratch.
+    """
+
+    docs_dir: Path
+    generated_dir: Path
+    pages: dict[str, dict[str, Any]] = field(default_factory=dict)
+    ranks: dict[str, float] = field(default_factory=dict)
+    parsed: int = 0
+    cached: int = 0
+    iterations: int = 0
+    _stats: dict[str, tuple[int, int]] = field(default_factory=dict)
+    _stale: bool = True
+
+    @property
+    def cache_path(self) -> Path:
+        return self.generated_dir / CACHE_FILE
+
+    @classmethod
+    def load(cls, docs_dir: Path, generated_dir: Path) -> LinkGraph:
+        graph = cls(docs_dir, generated_dir)
+        if graph.cache_path.exists():
+            try:
+                cached = json.loads(graph.cache_path.read_text(encoding="utf-8"))
+                graph.pages = dict(cached.get("pages", {}))
+                graph.ranks = {str(page): float(rank) for page, rank in cached.get("ranks", {}).items()}
+            except (json.JSONDecodeError, AttributeError, TypeError, ValueError):
+                LOG.warning("%s is unreadable; reparsing every page.", graph.cache_path)
+        return graph
+
+    def refresh(self) -> LinkGraph:
+        """Reparse pages changed since the last refresh, drop deleted ones, and rerank if needed."""
+        seen: set[str] = set()
+        for path in [*sorted(self.docs_dir.glob("*.html")), *sorted(self.docs_dir.glob("tag/*.html"))]:
+            rel = path.relative_to(self.docs_dir).as_posix()
+            seen.add(rel)
+            stat = path.stat()
+            if rel in self.pages and self._stats.get(rel) == (stat.st_size, stat.st_mtime_ns):
+                continue
+            data = path.read_bytes()
+            digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+            entry = self.pages.get(rel)
+            if entry and entry.get("digest") == digest:
+                self.cached += 1
+            else:
+                self.pages[rel] = {"digest": digest, "links": page_links(rel, data.decode("utf-8", "ignore"))}
+                self.parsed += 1
+                self._stale = True
+            self._stats[rel] = (stat.st_size, stat.st_mtime_ns)
+        for rel in set(self.pages) - seen:
+            del self.pages[rel]
+            self._stats.pop(rel, None)
+            self._stale = True
+        if self._stale:
+            self.rank()
+        return self
+
+    def rank(self) -> dict[str, float]:
+        links = {rel: entry["links"] for rel, entry in self.pages.items()}
+        self.ranks, self.iterations = pagerank(links, self.ranks)
+        self._stale = False
+        return self.ranks
+
+    def inbound(self, sources: set[str] | None = None) -> Counter[str]:
+        """Distinct pages linking to each page, counting only links from ``sources`` when given."""
+        counts: Counter[str] = Counter()
+        for rel, entry in self.pages.items():
+            if sources is not None and rel not in sources:
+                continue
+            counts.update(target for target in set(entry["links"]) if target in self.pages and target != rel)
+        return counts
+
+    def placeholder_targets(
+        self,
+        index: PostIndex,
+        tag: str,
+        current_slug: str,
+        title: str,
+        limit: int = 4,
+    ) -> list[PostRecord]:
+        """Posts to fill ``#recent-*`` with: relevant to this post, weighted toward low rank.
+
+        Relevance is 1 for the same tag (``OTHER_TAG_RELEVANCE`` otherwise) plus the overlap of
+        title words; it is divided by the post's rank relative to the average post, raised to
+        ``RANK_BIAS``. Every publish feeds its new links back into the graph, so the next one
+        spreads its links to whichever posts are now the least linked. ``index`` should be the whole
+        archive: the least linked posts are mostly the oldest, which ``posts.json`` no longer holds.
+        """
+        self.refresh()
+        candidates = [post for post in index if post.slug != current_slug and post.url in self.pages]
+        post_ranks = [self.ranks.get(post.url, 0.0) for post in candidates]
+        average = sum(post_ranks) / len(post_ranks) if post_ranks else 0.0
+        words = _title_words(title)
+
+        def score(post: PostRecord) -> float:
+            relevance = 1.0 if post.tag == tag else OTHER_TAG_RELEVANCE
+            other = _title_words(post.title)
+            if words and other:
+                relevance += len(words & other) / len(words | other)
+            relative = self.ranks.get(post.url, 0.0) / average if average else 1.0
+            return relevance / max(relative, 1e-6) ** RANK_BIAS
+
+        ranked = sorted(candidates, key=lambda post: (-score(post), post.slug))
+        return ranked[:limit]
+
+    def save(self) -> bool:
+        ranks = {rel: round(rank, 8) for rel, rank in self.ranks.items()}
+        return write_if_changed(self.cache_path, json.dumps({"pages": self.pages, "ranks": ranks}, indent=2, sort_keys=True))
+
+
+def page_links(rel: str, html: str) -> list[str]:
+    """Pages under ``docs`` that ``html`` (the page at ``rel``) links to, once each, in order."""
+    base = posixpath.dirname(rel)
+    targets: dict[str, None] = {}
+    for _, href in _HREF_RE.findall(html):
+        if href.startswith(("#", "http://", "https://", "mailto:", "tel:", "//", "$")):
+            continue
+        path = href.split("#", 1)[0].split("?", 1)[0]
+        if not path.endswith(".html"):
+            continue
+        target = posixpath.normpath(posixpath.join(base, path))
+        if target != rel and not target.startswith("../"):
+            targets[target] = None
+    return list(targets)
+
+
+def pagerank(
+    links: dict[str, list[str]],
+    start: dict[str, float] | None = None,
+    damping: float = DAMPING,
+    tolerance: float = TOLERANCE,
+    max_iterations: int = MAX_ITERATIONS,
+) -> tuple[dict[str, float], int]:
+    """Power iteration over the sparse graph ``links``; returns ranks (summing to 1) and rounds run.
+
+    Each round pulls rank along incoming edges only, so it costs O(pages + links). Pages without
+    outgoing links spread their rank evenly. ``start`` (the previous ranks) seeds the iteration;
+    pages new since then start at the average.
+    """
+    nodes = sorted(links)
+    count = len(nodes)
+    if not count:
+        return {}, 0
+    position = {node: idx for idx, node in enumerate(nodes)}
+    incoming: list[list[int]] = [[] for _ in nodes]
+    degree = [0] * count
+    for node, targets in links.items():
+        source = position[node]
+        outgoing = {position[target] for target in targets if target in position and target != node}
+        degree[source] = len(outgoing)
+        for target in outgoing:
+            incoming[target].append(source)
+    start = start or {}
+    rank = [start.get(node, 1.0 / count) for node in nodes]
+    total = sum(rank)
+    rank = [value / total for value in rank]
+    dangling_nodes = [idx for idx, out in enumerate(degree) if not out]
+    iterations = 0
+    for iterations in range(1, max_iterations + 1):
+        share = [value / out if out else 0.0 for value, out in zip(rank, degree)]
+        dangling = sum(rank[idx] for idx in dangling_nodes)
+        base = (1.0 - damping) / count + damping * dangling / count
+        updated = [base + damping * sum(map(share.__getitem__, sources)) for sources in incoming]
+        delta = sum(abs(new - old) for new, old in zip(updated, rank))
+        rank = updated
+        if delta < tolerance:
+            break
+    return dict(zip(nodes, rank)), iterations
+
+
+def _title_words(title: str) -> set[str]:
+    return set(_WORD_RE.findall(title.lower()))
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Rank pages by internal links and list the least linked posts")
+    parser.add_argument("--limit", type=int, default=15, help="posts to list at each end")
+    parser.add_argument("--rebuild", action="store_true", help="ignore the cache and reparse every page")
+    parser.add_argument("--docs-dir", type=Path, default=REPO_ROOT / "docs")
+    parser.add_argument("--generated-dir", type=Path, default=REPO_ROOT / "generated")
+    args = parser.parse_args()
+
+    graph = LinkGraph(args.docs_dir, args.generated_dir) if args.rebuild else LinkGraph.load(args.docs_dir, args.generated_dir)
+    graph.refresh()
+    graph.save()
+    posts = PostIndex.from_dicts(load_archive(args.docs_dir))
+    inbound = graph.inbound({post.url for post in posts})
+    ranked = sorted((post for post in posts if post.url in graph.pages), key=lambda post: graph.ranks.get(post.url, 0.0))
+    links = sum(len(entry["links"]) for entry in graph.pages.values())
+    print(
+        f"link_graph: {len(graph.pages)} pages, {links} links; parsed {graph.parsed}, cached {graph.cached}, "
+        f"ranked in {graph.iterations} rounds"
+    )
+    print(f"link_graph: {sum(1 for post in ranked if not inbound[post.url])} posts have no links from other posts")
+    for label, group in (("least linked", ranked[: args.limit]), ("most linked", ranked[::-1][: args.limit])):
+        print(f"link_graph: {label}:")
+        for post in group:
+            print(f"  {graph.ranks[post.url] * len(graph.pages):6.2f}  {inbound[post.url]:3} from posts  {post.url}")
+
+
+if __name__ == "__main__":
+    main()
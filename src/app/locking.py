@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Any, Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows: locks only serialize threads of one process.
+    fcntl = None  # type: ignore[assignment]
+
+LOG = logging.getLogger(__name__)
+
+LOCK_TIMEOUT_SECONDS = 600.0
+_POLL_SECONDS = 0.05
+# Lock files live outside the repo so they are never committed or deployed with docs/.
+LOCK_DIR = Path(tempfile.gettempdir()) / "pin-locks"
+
+_GUARD = threading.Lock()
+_THREAD_LOCKS: dict[str, threading.RLock] = {}
+_DEPTH: dict[str, int] = {}
+_HANDLES: dict[str, IO[bytes]] = {}
+_MISSING = object()
+
+
+@contextmanager
+def file_lock(path: Path, timeout: float = LOCK_TIMEOUT_SECONDS) -> Iterator[None]:
+    """Hold an exclusive cross-process lock for ``path`` around a read-modify-write.
+
+    Reentrant within a thread, so a locked caller can call helpers that lock the same file.
+    Raises ``TimeoutError`` when another process holds it for longer than ``timeout``.
+    """
+    key = str(path.resolve())
+    with _GUARD:
+        rlock = _THREAD_LOCKS.setdefault(key, threading.RLock())
+    if not rlock.acquire(timeout=timeout):
+        raise TimeoutError(f"Timed out waiting for the lock on {path}")
+    try:
+        if not _DEPTH.get(key):
+            _HANDLES[key] = _acquire(key, path, timeout)
+        _DEPTH[key] = _DEPTH.get(key, 0) + 1
+        try:
+            yield
+        finally:
+            _DEPTH[key] -= 1
+            if not _DEPTH[key]:
+                _HANDLES.pop(key).close()  # closing the descriptor releases the flock
+    finally:
+        rlock.release()
+
+
+def _acquire(key: str, path: Path, timeout: float) -> IO[bytes]:
+    LOCK_DIR.mkdir(parents=True, exist_ok=True)
+    name = f"{path.name}-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]}.lock"
+    handle = (LOCK_DIR / name).open("ab")
+    if fcntl is None:
+        return handle
+    deadline = time.monotonic() + timeout
+    waited = False
+    while True:
+        try:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return handle
+        except BlockingIOError:
+            if time.monotonic() >= deadline:
+                handle.close()
+                raise TimeoutError(f"Timed out waiting for the lock on {path}") from None
+            if not waited:
+                LOG.info("Waiting for another process to release %s (pid %s).", path, os.getpid())
+                waited = True
+            time.sleep(_POLL_SECONDS)
+
+
+def file_version(path: Path) -> str:
+    """Content digest of ``path`` ("" when missing), compared before writing back a stale read."""
+    try:
+        return hashlib.blake2b(path.read_bytes(), digest_size=16).hexdigest()
+    except FileNotFoundError:
+        return ""
+
+
+def merge_records(
+    base: list[dict[str, Any]],
+    ours: list[dict[str, Any]],
+    theirs: list[dict[str, Any]],
+    key: str = "slug",
+) -> list[dict[str, Any]]:
+    """Three-way merge of record lists keyed by ``key``, keeping ``theirs`` order.
+
+    Our additions keep their position relative to the records we started from (new posts stay
+    on top), our edits and deletions are applied to ``theirs``, and anything only they added,
+    edited or deleted is kept. A record both sides edited takes our version; a record they
+    deleted stays deleted even if we edited it.
+    """
+    base_by_key = {record.get(key): record for record in base}
+    ours_keys = {record.get(key) for record in ours}
+    deleted = set(base_by_key) - ours_keys
+    edited = {
+        record.get(key): record
+        for record in ours
+        if record.get(key) in base_by_key and record != base_by_key[record.get(key)]
+    }
+    added = [record for record in ours if record.get(key) not in base_by_key]
+    added_keys = {record.get(key) for record in added}
+    first_base = next((idx for idx, record in enumerate(ours) if record.get(key) in base_by_key), len(ours))
+    leading = [record for record in ours[:first_base] if record.get(key) in added_keys]
+    trailing = [record for record in ours[first_base:] if record.get(key) in added_keys]
+    kept = [
+        edited.get(record.get(key), record)
+        for record in theirs
+        if record.get(key) not in deleted and record.get(key) not in added_keys
+    ]
+    return leading + kept + trailing
+
+
+def merge_mapping(base: dict[str, Any], ours: dict[str, Any], theirs: dict[str, Any]) -> dict[str, Any]:
+    """Three-way merge of JSON objects such as ``state.json``, key by key.
+
+    Keys only we changed take our value. When both sides changed a key: counters add both
+    deltas, nested objects merge recursively, rolling windows (``recent_*`` lists) get our new
+    tail appended to theirs, and anything else takes our value.
+    """
+    merged = dict(theirs)
+    for name in ours.keys() | base.keys():
+        before, mine, other = base.get(name, _MISSING), ours.get(name, _MISSING), theirs.get(name, _MISSING)
+        if mine == before:
+            continue
+        if other == before or other is _MISSING:
+            value = mine
+        else:
+            value = _merge_value(before, mine, other)
+        if value is _MISSING:
+            merged.pop(name, None)
+        else:
+            merged[name] = value
+    return merged
+
+
+def _merge_value(before: Any, mine: Any, other: Any) -> Any:
+    if _is_count(mine) and _is_count(other) and (before is _MISSING or _is_count(before)):
+        return other + mine - (0 if before is _MISSING else before)
+    if isinstance(mine, dict) and isinstance(other, dict):
+        return merge_mapping(before if isinstance(before, dict) else {}, mine, other)
+    if isinstance(mine, list) and isinstance(other, list):
+        appended = _appended_tail(before if isinstance(before, list) else [], mine)
+        return (other + appended)[-max(len(mine), len(other)) :]
+    return mine
+
+
+def _is_count(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _appended_tail(before: list[Any], after: list[Any]) -> list[Any]:
+    """Items appended to a window that may also have dropped items from its front."""
+    for new in range(len(after) + 1):
+        kept = len(after) - new
+        if after[:kept] == before[len(before) - kept :]:
+            return after[kept:]
+    return after
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import argparse
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+
+from .config import SITES_CONFIG_PATH, Settings, load_site_settings
+from .pipeline import build_client, record_client_stats
+from .profiling import profiled, span
+from .ratelimit import configure_from_settings
+from .run_daily import DailyRun, save_rate_limiter, should_generate_today, top_up_buffer
+from .state import load_state, save_state
+
+LOG = logging.getLogger(__name__)
+
+
+def main() -> None:
+    """Run the daily pipeline for every site in ``sites.json`` in one process.
+
+    All sites share one Gemini client (key rotation, hedging), the HTTP connection pool, the
+    Pexels search cache and the rate limiter. Slots are taken round-robin across sites, so a
+    slow or rate-limited site delays the others by at most one slot instead of starving them.
+    Client stats and limiter state are recorded with the first site.
+    """
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Run the daily pipeline for several sites")
+    parser.add_argument("--config", type=Path, default=SITES_CONFIG_PATH, help="sites file (default sites.json)")
+    parser.add_argument("--profile", action="store_true", help="write a profile to generated/profiles (or PIN_PROFILE=1)")
+    args = parser.parse_args()
+
+    sites = load_site_settings(args.config)
+    with profiled("multi_site", sites[0].generated_dir / "profiles", args.profile):
+        _run(sites)
+
+
+def _run(sites: list[Settings]) -> None:
+    primary = sites[0]
+    today = datetime.now(timezone.utc).date()
+    configure_from_settings(primary)
+    states = {settings.site_id: load_state(settings.generated_dir / "state.json") for settings in sites}
+    client = build_client(primary, states[primary.site_id])
+
+    runs: list[DailyRun] = []
+    resting: list[Settings] = []
+    for settings in sites:
+        if should_generate_today(settings.posts_per_week):
+            runs.append(DailyRun(settings, states[settings.site_id], client, today))
+        else:
+            resting.append(settings)
+
+    while any(run.pending for run in runs):
+        for run in runs:
+            if run.pending:
+                LOG.info("[%s] next slot", run.settings.site_id)
+                run.run_next_slot()
+    for run in runs:
+        with span(f"finish {run.settings.site_id}"):
+            run.finish(record_stats=False)
+
+    # Buffer top-ups only spend quota left over after every site has published.
+    for settings in resting:
+        LOG.info("[%s] skipping publishing today; topping up the buffer.", settings.site_id)
+        with span(f"top up buffer {settings.site_id}"):
+            top_up_buffer(settings, states[settings.site_id], client, record_stats=False)
+
+    record_client_stats(states[primary.site_id], client)
+    save_state(primary.generated_dir / "state.json", states[primary.site_id])
+    save_rate_limiter()
+    LOG.info(
+        "Multi-site run complete: %s",
+        {run.settings.site_id: run.published_count for run in runs},
+    )
+
+
+if __name__ == "__main__":
+    main()
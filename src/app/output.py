@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import json
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator
+
+# Whitespace inside these elements is significant (or belongs to another language)
+# and is passed through untouched, except JSON-LD which is re-serialized compactly.
+_RAW_BLOCK_RE = re.compile(r"<(pre|textarea|script|style)\b[^>]*>.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_JSONLD_RE = re.compile(
+    r"""^(<script\b[^>]*\btype\s*=\s*(['"])application/ld\+json\2[^>]*>)(.*?)(</script\s*>)$""",
+    re.IGNORECASE | re.DOTALL,
+)
+_COMMENT_RE = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+_WS_RE = re.compile(r"\s+")
+_GAP_RE = re.compile(r">\s+<")
+_TAG_NAME_RE = re.compile(r"<!?/?([a-zA-Z][\w-]*)")
+
+# Whitespace next to these tags never renders, so it can be dropped entirely.
+# Inline elements (a, span, strong, button, img, ...) keep a single space.
+_BLOCK_TAGS = {
+    "html", "head", "body", "meta", "link", "title", "script", "style", "doctype",
+    "main", "header", "footer", "nav", "section", "article", "aside", "div", "p",
+    "ul", "ol", "li", "h1", "h2", "h3", "h4", "h5", "h6", "table", "thead", "tbody",
+    "tr", "td", "th", "form", "figure", "figcaption", "br", "hr", "pre", "blockquote",
+}
+
+
+@dataclass
+class BuildManifest:
+    """Pages (paths relative to ``docs_dir``) that a build added, modified or deleted."""
+
+    docs_dir: Path
+    added: set[str] = field(default_factory=set)
+    modified: set[str] = field(default_factory=set)
+    deleted: set[str] = field(default_factory=set)
+
+    def record(self, path: Path, kind: str) -> None:
+        try:
+            rel = path.resolve().relative_to(self.docs_dir.resolve()).as_posix()
+        except ValueError:
+            return
+        if not rel.endswith(".html"):
+            return
+        # Fold repeated changes to one page into its net change since the build started.
+        if rel in self.added:
+            if kind == "deleted":
+                self.added.discard(rel)
+            return
+        if kind == "added" and rel in self.deleted:
+            kind = "modified"
+        for bucket in (self.added, self.modified, self.deleted):
+            bucket.discard(rel)
+        getattr(self, kind).add(rel)
+
+    def changes(self) -> dict[str, str]:
+        """``{rel_path: "added" | "modified" | "deleted"}`` in path order."""
+        kinds = {rel: kind for kind in ("added", "modified", "deleted") for rel in getattr(self, kind)}
+        return dict(sorted(kinds.items()))
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.modified or self.deleted)
+
+
+_MANIFEST: ContextVar[BuildManifest | None] = ContextVar("build_manifest", default=None)
+
+
+@contextmanager
+def build_manifest(docs_dir: Path) -> Iterator[BuildManifest]:
+    """Record every page written or removed through this module inside the block."""
+    manifest = BuildManifest(docs_dir)
+    token = _MANIFEST.set(manifest)
+    try:
+        yield manifest
+    finally:
+        _MANIFEST.reset(token)
+
+
+def minify_html(html: str) -> str:
+    parts: list[str] = []
+    cursor = 0
+    for match in _RAW_BLOCK_RE.finditer(html):
+        parts.append(_minify_markup(html[cursor : match.start()]))
+        parts.append(_minify_raw_block(match.group(0)))
+        cursor = match.end()
+    parts.append(_minify_markup(html[cursor:]))
+    return _join_blocks(parts).strip() + "\n"
+
+
+def minify_json(payload: object) -> str:
+    return json.dumps(payload, separators=(",", ":"))
+
+
+def write_if_changed(path: Path, text: str) -> bool:
+    """Write ``text`` only when it differs from the file on disk; return True on change."""
+    data = text.encode("utf-8")
+    kind = "modified"
+    try:
+        if path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        kind = "added"
+        path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    manifest = _MANIFEST.get()
+    if manifest is not None:
+        manifest.record(path, kind)
+    return True
+
+
+def remove_file(path: Path) -> bool:
+    """Delete ``path`` if present (recording it in the active manifest); return True if it existed."""
+    if not path.is_file():
+        return False
+    path.unlink()
+    manifest = _MANIFEST.get()
+    if manifest is not None:
+        manifest.record(path, "deleted")
+    return True
+
+
+def write_html(path: Path, html: str) -> bool:
+    return write_if_changed(path, minify_html(html))
+
+
+def _minify_markup(fragment: str) -> str:
+    fragment = _COMMENT_RE.sub("", fragment)
+    fragment = _WS_RE.sub(" ", fragment)
+    return _GAP_RE.sub(_collapse_gap, fragment)
+
+
+def _collapse_gap(match: re.Match[str]) -> str:
+    source = match.string
+    before = source.rfind("<", 0, match.start() + 1)
+    after = match.end() - 1
+    if _is_block_tag(source, before) or _is_block_tag(source, after):
+        return "><"
+    return "> <"
+
+
+def _is_block_tag(source: str, pos: int) -> bool:
+    if pos < 0:
+        return False
+    tag = _TAG_NAME_RE.match(source, pos)
+    return bool(tag) and tag.group(1).lower() in _BLOCK_TAGS
+
+
+def _minify_raw_block(block: str) -> str:
+    match = _JSONLD_RE.match(block)
+    if not match:
+        return block
+    try:
+        payload = json.loads(match.group(3))
+    except json.JSONDecodeError:
+        return block
+    return f"{match.group(1)}{minify_json(payload)}{match.group(4)}"
+
+
+def _join_blocks(parts: list[str]) -> str:
+    # Raw blocks are block-level boundaries, so whitespace touching them is dropped.
+    joined: list[str] = []
+    for idx, part in enumerate(parts):
+        if idx % 2 == 0:
+            if idx > 0 and part.startswith(" "):
+                part = part[1:]
+            if idx < len(parts) - 1 and part.endswith(" "):
+                part = part[:-1]
+        joined.append(part)
+    return "".join(joined)
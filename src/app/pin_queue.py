@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlparse
+
+from .config import load_settings
+from .pinterest_api import PinResult, publish_pin
+from .pinterest_drafts import DraftStore
+from .post_index import load_archive
+from .ratelimit import LIMITER, configure_from_settings
+
+LOG = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 6
+BASE_BACKOFF_SECONDS = 60
+MAX_BACKOFF_SECONDS = 6 * 60 * 60
+PENDING, PUBLISHED, DEAD = "pending", "published", "dead"
+
+
+def idempotency_key(link: str) -> str:
+    return hashlib.sha256(link.strip().encode("utf-8")).hexdigest()[:24]
+
+
+@dataclass
+class PinQueue:
+    path: Path
+    entries: dict[str, dict[str, Any]] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    @classmethod
+    def load(cls, path: Path) -> PinQueue:
+        if not path.exists():
+            return cls(path=path)
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            LOG.warning("Pin queue at %s is unreadable; starting empty.", path)
+            return cls(path=path)
+        entries = raw.get("entries", {}) if isinstance(raw, dict) else {}
+        return cls(path=path, entries={key: entry for key, entry in entries.items() if isinstance(entry, dict)})
+
+    def enqueue(self, title: str, description: str, link: str, image_url: str, alt_text: str) -> bool:
+        """Queue a pin once per link; returns False when the link is already known."""
+        key = idempotency_key(link)
+        with self._lock:
+            if key in self.entries:
+                return False
+            self.entries[key] = {
+                "status": PENDING,
+                "attempts": 0,
+                "next_attempt_at": _iso(_now()),
+                "created_at": _iso(_now()),
+                "last_error": "",
+                "pin_id": "",
+                "payload": {
+                    "title": title,
+                    "description": description,
+                    "link": link,
+                    "image_url": image_url,
+                    "alt_text": alt_text,
+                },
+            }
+        return True
+
+    def due(self, now: datetime | None = None, limit: int | None = None) -> list[str]:
+        now = now or _now()
+        keys = [
+            key
+            for key, entry in self.entries.items()
+            if entry.get("status") == PENDING and _parse_iso(entry.get("next_attempt_at")) <= now
+        ]
+        keys.sort(key=lambda key: (self.entries[key].get("next_attempt_at", ""), key))
+        return keys[:limit] if limit is not None else keys
+
+    def counts(self) -> dict[str, int]:
+        totals = {PENDING: 0, PUBLISHED: 0, DEAD: 0}
+        for entry in self.entries.values():
+            totals[entry.get("status", PENDING)] = totals.get(entry.get("status", PENDING), 0) + 1
+        return totals
+
+    def requeue_dead(self) -> int:
+        revived = 0
+        with self._lock:
+            for entry in self.entries.values():
+                if entry.get("status") == DEAD:
+                    entry.update(status=PENDING, attempts=0, next_attempt_at=_iso(_now()))
+                    revived += 1
+        return revived
+
+    def discard_pending(self, pages: set[str]) -> int:
+        """Drop pending pins whose link points at one of ``pages`` (e.g. deleted posts)."""
+        with self._lock:
+            stale = [
+                key
+                for key, entry in self.entries.items()
+                if entry.get("status") == PENDING
+                and urlparse(str(entry.get("payload", {}).get("link", ""))).path.rsplit("/", 1)[-1] in pages
+            ]
+            for key in stale:
+                del self.entries[key]
+        return len(stale)
+
+    def drain(
+        self,
+        access_token: str,
+        board_id: str,
+        log_path: Path,
+        workers: int = 4,
+        limit: int | None = None,
+    ) -> dict[str, int]:
+        keys = self.due(limit=limit)
+        if not keys:
+            return {"attempted": 0, "published": 0, "retrying": 0, "dead": 0}
+        outcome = {"attempted": 0, "published": 0, "retrying": 0, "dead": 0}
+
+        def send(key: str) -> None:
+            # publish_pin waits on the shared Pinterest write bucket before each request.
+            payload = self.entries[key]["payload"]
+            try:
+                result = publish_pin(
+                    access_token=access_token,
+                    board_id=board_id,
+                    title=payload["title"],
+                    description=payload["description"],
+                    link=payload["link"],
+                    image_url=payload["image_url"],
+                    alt_text=payload["alt_text"],
+                    log_path=log_path,
+                )
+            except Exception as exc:  # noqa: BLE001
+                LOG.exception("Pin %s failed unexpectedly; it stays queued for a retry.", key)
+                result = PinResult(ok=False, status=0, retryable=True, message=f"{type(exc).__name__}: {exc}")
+            # Each outcome is on disk before the next one, so a killed drain never re-posts a published pin.
+            with self._lock:
+                outcome["attempted"] += 1
+                outcome[self._record(key, result)] += 1
+                self._write()
+
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+                for future in [pool.submit(send, key) for key in keys]:
+                    future.result()
+        finally:
+            self.save()
+        LOG.info("Pin queue drain: %s", outcome)
+        return outcome
+
+    def save(self) -> None:
+        with self._lock:
+            self._write()
+
+    def _write(self) -> None:
+        """Replace the queue file atomically; callers hold ``_lock``."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"entries": dict(sorted(self.entries.items()))}
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def _record(self, key: str, result: PinResult) -> str:
+        entry = self.entries[key]
+        entry["attempts"] = int(entry.get("attempts", 0)) + 1
+        if result.ok:
+            entry.update(status=PUBLISHED, pin_id=result.pin_id, last_error="", published_at=_iso(_now()))
+            return "published"
+        entry["last_error"] = f"{result.status}: {result.message}"[:240]
+        if not result.retryable or entry["attempts"] >= MAX_ATTEMPTS:
+            entry["status"] = DEAD
+            return "dead"
+        delay = max(result.retry_after, min(MAX_BACKOFF_SECONDS, BASE_BACKOFF_SECONDS * 2 ** (entry["attempts"] - 1)))
+        entry["next_attempt_at"] = _iso(_now() + timedelta(seconds=delay))
+        return "retrying"
+
+
+def enqueue_draft_packs(queue: PinQueue, pinterest_dir: Path, docs_dir: Path, base_url: str) -> int:
+    """Queue every logged draft whose post still exists, using the post hero as the pin image."""
+    heroes = _hero_urls(docs_dir, base_url)
+    added = 0
+    for item in DraftStore(pinterest_dir).iter_entries():
+        link = str(item.get("link", "")).strip()
+        image_url = heroes.get(link.rsplit("/", 1)[-1])
+        if not link or not image_url:
+            continue
+        added += queue.enqueue(
+            title=str(item.get("title", "")),
+            description=str(item.get("description", "")),
+            link=link,
+            image_url=image_url,
+            alt_text=str(item.get("alt_text", "")),
+        )
+    return added
+
+
+def _hero_urls(docs_dir: Path, base_url: str) -> dict[str, str]:
+    return {
+        str(post.get("url", "")): f"{base_url}/{post['hero']}"
+        for post in load_archive(docs_dir)
+        if post.get("url") and post.get("hero")
+    }
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _iso(value: datetime) -> str:
+    return value.isoformat(timespec="seconds")
+
+
+def _parse_iso(value: object) -> datetime:
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return datetime.min.replace(tzinfo=timezone.utc)
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Manage the persistent Pinterest publish queue")
+    parser.add_argument("command", choices=["drain", "enqueue-drafts", "requeue-dead", "status"])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--limit", type=int, default=None)
+    args = parser.parse_args()
+
+    settings = load_settings()
+    configure_from_settings(settings)
+    generated = settings.generated_dir
+    queue = PinQueue.load(generated / "pinterest" / "queue.json")
+
+    if args.command == "enqueue-drafts":
+        added = enqueue_draft_packs(queue, generated / "pinterest", settings.docs_dir, settings.base_url)
+        queue.save()
+        print(f"pin_queue: enqueued {added} drafts")
+    elif args.command == "requeue-dead":
+        revived = queue.requeue_dead()
+        queue.save()
+        print(f"pin_queue: requeued {revived} dead entries")
+    elif args.command == "drain":
+        if not (settings.pinterest_access_token and settings.pinterest_board_id):
+            raise SystemExit("PINTEREST_ACCESS_TOKEN and PINTEREST_BOARD_ID are required to drain the queue.")
+        outcome = queue.drain(
+            access_token=settings.pinterest_access_token,
+            board_id=settings.pinterest_board_id,
+            log_path=generated / "logs" / "pinterest.log",
+            workers=args.workers or settings.pinterest_queue_workers,
+            limit=args.limit,
+        )
+        LIMITER.save()
+        print(f"pin_queue: {outcome}")
+    print(f"pin_queue: {queue.counts()}")
+
+
+if __name__ == "__main__":
+    main()
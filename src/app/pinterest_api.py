@@ -1,15 +1,31 @@
 from __future__ import annotations
 
 import logging
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 
 import requests
 
+from .http_pool import SESSION
+from .ratelimit import LIMITER, PINTEREST_WRITES
+
 LOG = logging.getLogger(__name__)
+PINS_ENDPOINT = "https://api.pinterest.com/v5/pins"
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
 
 
-def create_pin(
+@dataclass(frozen=True)
+class PinResult:
+    ok: bool
+    status: int
+    retryable: bool
+    pin_id: str = ""
+    message: str = ""
+    retry_after: float = 0.0
+
+
+def publish_pin(
     access_token: str,
     board_id: str,
     title: str,
@@ -18,7 +34,7 @@ def create_pin(
     image_url: str,
     alt_text: str,
     log_path: Path,
-) -> bool:
+) -> PinResult:
     headers = {"Authorization": f"Bearer {access_token}", "Content-Type": "application/json"}
     payload = {
         "board_id": board_id,
@@ -31,19 +47,52 @@ def create_pin(
     stamp = datetime.now(timezone.utc).isoformat()
     log_path.parent.mkdir(parents=True, exist_ok=True)
 
+    LIMITER.acquire(PINTEREST_WRITES)
     try:
-        response = requests.post("https://api.pinterest.com/v5/pins", headers=headers, json=payload, timeout=45)
+        response = SESSION.post(PINS_ENDPOINT, headers=headers, json=payload, timeout=45)
     except requests.RequestException as exc:
         _append(log_path, f"{stamp} PIN EXCEPTION {type(exc).__name__}: {exc}")
-        return False
+        return PinResult(ok=False, status=0, retryable=True, message=f"{type(exc).__name__}: {exc}")
 
     if response.status_code in {200, 201}:
         _append(log_path, f"{stamp} PIN OK {response.text[:240]}")
-        return True
+        try:
+            pin_id = str(response.json().get("id", ""))
+        except ValueError:
+            pin_id = ""
+        return PinResult(ok=True, status=response.status_code, retryable=False, pin_id=pin_id)
 
+    if response.status_code == 429:
+        LIMITER.exhaust(PINTEREST_WRITES)
     _append(log_path, f"{stamp} PIN FAILED {response.status_code}: {response.text[:240]}")
     LOG.warning("Pinterest publish failed (%s); continuing workflow.", response.status_code)
-    return False
+    return PinResult(
+        ok=False,
+        status=response.status_code,
+        retryable=response.status_code in RETRYABLE_STATUSES,
+        message=response.text[:240],
+        retry_after=_retry_after(response),
+    )
+
+
+def create_pin(
+    access_token: str,
+    board_id: str,
+    title: str,
+    description: str,
+    link: str,
+    image_url: str,
+    alt_text: str,
+    log_path: Path,
+) -> bool:
+    return publish_pin(access_token, board_id, title, description, link, image_url, alt_text, log_path).ok
+
+
+def _retry_after(response: requests.Response) -> float:
+    try:
+        return max(0.0, float(response.headers.get("Retry-After", "0")))
+    except ValueError:
+        return 0.0
 
 
 def _append(path: Path, line: str) -> None:
@@ -1,9 +1,183 @@
 from __future__ import annotations
 
+import argparse
 import csv
 import json
+import logging
+import textwrap
+from dataclasses import dataclass, field
 from datetime import date
 from pathlib import Path
+from typing import IO, Any, Iterator
+
+from .locking import file_lock
+
+LOG = logging.getLogger(__name__)
+
+FIELDS = ["title", "description", "link", "image_path", "alt_text"]
+
+
+@dataclass
+class DraftStore:
+    """Append-only draft log (``drafts.jsonl``) with a link index for cross-day dedup.
+
+    Appends and exports hold a file lock on the log, and the link index is reloaded whenever
+    another process has appended since it was read.
+    """
+
+    root: Path
+    _links: set[str] | None = field(default=None, init=False)
+    _links_size: int = field(default=0, init=False)
+
+    @property
+    def log_path(self) -> Path:
+        return self.root / "drafts.jsonl"
+
+    @property
+    def links_path(self) -> Path:
+        return self.root / "draft_links.txt"
+
+    def append(self, run_date: date, item: dict[str, str]) -> bool:
+        entry = {key: str(item.get(key, "")).strip() for key in FIELDS}
+        self.root.mkdir(parents=True, exist_ok=True)
+        with file_lock(self.log_path):
+            links = self._known_links()
+            if not entry["link"] or entry["link"] in links:
+                return False
+            with self.log_path.open("a", encoding="utf-8") as handle:
+                handle.write(json.dumps({"date": run_date.isoformat(), **entry}) + "\n")
+            with self.links_path.open("a", encoding="utf-8") as handle:
+                handle.write(entry["link"] + "\n")
+            links.add(entry["link"])
+            self._links_size = self.links_path.stat().st_size
+        return True
+
+    def iter_entries(self, since: date | None = None, until: date | None = None) -> Iterator[dict[str, str]]:
+        self._known_links()
+        if not self.log_path.exists():
+            return
+        low = since.isoformat() if since else ""
+        high = until.isoformat() if until else "9999-12-31"
+        with self.log_path.open(encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(entry, dict) and low <= str(entry.get("date", "")) <= high:
+                    yield entry
+
+    def export(
+        self,
+        out_dir: Path,
+        since: date | None = None,
+        until: date | None = None,
+        combined: bool = False,
+    ) -> list[Path]:
+        """Stream matching drafts into ``{date}_pins.csv/json`` packs (or one combined pack).
+
+        Only one pack is open at a time: the log is appended in date order, so a pack is closed as
+        soon as the date changes, and reopened for appending if a later entry comes back to it.
+        """
+        out_dir.mkdir(parents=True, exist_ok=True)
+        packs: dict[str, _PackWriter] = {}
+        current: _PackWriter | None = None
+        combined_name = f"{since or 'start'}_{until or 'end'}"
+        with file_lock(self.log_path):
+            try:
+                for entry in self.iter_entries(since, until):
+                    name = combined_name if combined else str(entry["date"])
+                    pack = packs.get(name)
+                    if pack is None:
+                        pack = packs[name] = _PackWriter(out_dir, name)
+                    if pack is not current:
+                        if current is not None:
+                            current.close()
+                        current = pack.open()
+                    pack.write({key: entry.get(key, "") for key in FIELDS})
+            finally:
+                if current is not None:
+                    current.close()
+        return [path for pack in packs.values() for path in (pack.csv_path, pack.json_path)]
+
+    def _known_links(self) -> set[str]:
+        links_size = self.links_path.stat().st_size if self.links_path.exists() else 0
+        if self._links is not None and links_size != self._links_size:
+            self._links = None
+        if self._links is None:
+            if not self.log_path.exists():
+                self._import_legacy_packs()
+            if self.links_path.exists():
+                lines = self.links_path.read_text(encoding="utf-8").splitlines()
+                self._links = {line.strip() for line in lines if line.strip()}
+                self._links_size = links_size
+            else:
+                self._links = set()
+                self._links_size = 0
+        return self._links
+
+    def _import_legacy_packs(self) -> None:
+        self._links = set()
+        imported = 0
+        for pack in sorted(self.root.glob("*_pins.json")):
+            try:
+                run_date = date.fromisoformat(pack.name.split("_", 1)[0])
+                raw = json.loads(pack.read_text(encoding="utf-8"))
+            except (ValueError, json.JSONDecodeError):
+                continue
+            for existing in raw if isinstance(raw, list) else []:
+                if isinstance(existing, dict):
+                    imported += self.append(run_date, existing)
+        if imported:
+            LOG.info("Imported %s legacy draft-pack entries into %s.", imported, self.log_path)
+        self._links = None
+
+
+class _PackWriter:
+    """One ``{name}_pins.csv/json`` pair, kept valid on disk whenever it is closed.
+
+    ``open`` creates the files the first time; after a ``close`` it reopens them for appending,
+    seeking back over the JSON closing bracket.
+    """
+
+    def __init__(self, out_dir: Path, name: str) -> None:
+        self.csv_path = out_dir / f"{name}_pins.csv"
+        self.json_path = out_dir / f"{name}_pins.json"
+        self._csv_handle: IO[str] | None = None
+        self._json_handle: Any = None
+        self._json_end: int | None = None
+        self._count = 0
+
+    def open(self) -> _PackWriter:
+        if self._json_end is None:
+            self._csv_handle = self.csv_path.open("w", newline="", encoding="utf-8")
+            self._csv = csv.DictWriter(self._csv_handle, fieldnames=FIELDS)
+            self._csv.writeheader()
+            self._json_handle = self.json_path.open("w", encoding="utf-8")
+            self._json_handle.write("[")
+        else:
+            self._csv_handle = self.csv_path.open("a", newline="", encoding="utf-8")
+            self._csv = csv.DictWriter(self._csv_handle, fieldnames=FIELDS)
+            self._json_handle = self.json_path.open("r+", encoding="utf-8")
+            self._json_handle.seek(self._json_end)
+            self._json_handle.truncate()
+        return self
+
+    def write(self, item: dict[str, Any]) -> None:
+        self._csv.writerow(item)
+        # Same layout as json.dumps(list, indent=2), written one item at a time.
+        separator = ",\n" if self._count else "\n"
+        self._json_handle.write(separator + textwrap.indent(json.dumps(item, indent=2), "  "))
+        self._count += 1
+
+    def close(self) -> None:
+        if self._json_handle is None or self._csv_handle is None:
+            return
+        self._json_end = self._json_handle.tell()
+        self._json_handle.write("\n]" if self._count else "]")
+        self._json_handle.close()
+        self._csv_handle.close()
+        self._json_handle = self._csv_handle = None
 
 
 def write_draft_pack(
@@ -14,8 +188,7 @@ def write_draft_pack(
     link: str,
     image_path: str,
     alt_text: str,
-) -> tuple[Path, Path]:
-    out_dir.mkdir(parents=True, exist_ok=True)
+) -> bool:
     item = {
         "title": pin_title,
         "description": pin_description,
@@ -23,36 +196,22 @@ def write_draft_pack(
         "image_path": image_path,
         "alt_text": alt_text,
     }
+    return DraftStore(out_dir).append(run_date, item)
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Export Pinterest draft packs from the append-only draft log")
+    parser.add_argument("--since", type=date.fromisoformat, default=None)
+    parser.add_argument("--until", type=date.fromisoformat, default=None)
+    parser.add_argument("--combined", action="store_true", help="write one pack for the whole range")
+    parser.add_argument("--out-dir", type=Path, default=None)
+    args = parser.parse_args()
+
+    pinterest_dir = Path(__file__).resolve().parents[2] / "generated" / "pinterest"
+    written = DraftStore(pinterest_dir).export(args.out_dir or pinterest_dir, args.since, args.until, args.combined)
+    print(f"pinterest_drafts: wrote {len(written)} files")
+
 
-    json_path = out_dir / f"{run_date.isoformat()}_pins.json"
-    payload: list[dict[str, str]] = []
-    if json_path.exists():
-        try:
-            raw = json.loads(json_path.read_text(encoding="utf-8"))
-            if isinstance(raw, list):
-                for existing in raw:
-                    if isinstance(existing, dict):
-                        normalized = {
-                            "title": str(existing.get("title", "")).strip(),
-                            "description": str(existing.get("description", "")).strip(),
-                            "link": str(existing.get("link", "")).strip(),
-                            "image_path": str(existing.get("image_path", "")).strip(),
-                            "alt_text": str(existing.get("alt_text", "")).strip(),
-                        }
-                        if normalized["link"]:
-                            payload.append(normalized)
-        except json.JSONDecodeError:
-            payload = []
-
-    seen_links = {entry["link"] for entry in payload}
-    if link not in seen_links:
-        payload.append(item)
-
-    csv_path = out_dir / f"{run_date.isoformat()}_pins.csv"
-    with csv_path.open("w", newline="", encoding="utf-8") as handle:
-        writer = csv.DictWriter(handle, fieldnames=["title", "description", "link", "image_path", "alt_text"])
-        writer.writeheader()
-        writer.writerows(payload)
-
-    json_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
-    return csv_path, json_path
+if __name__ == "__main__":
+    main()
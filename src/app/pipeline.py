@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import json
+import logging
+import random
+from pathlib import Path
+
+from .config import Settings
+from .content import generate_article
+from .dedupe import NearDuplicateIndex
+from .gemini_client import FieldCallback, GeminiClient
+from .hedging import Hedger
+from .images import prefetch_photo_url
+from .titles import rank_titles
+from .topics import Topic, TopicScheduler
+
+LOG = logging.getLogger(__name__)
+
+
+def choose_mode(state: dict) -> str:
+    runs = int(state.get("runs", 0))
+    offer_runs = int(state.get("offer_runs", 0))
+    if runs == 0:
+        return "info"
+    ratio = offer_runs / max(runs, 1)
+    if ratio < 0.30:
+        return "offer" if random.random() < 0.6 else "info"
+    return "offer" if random.random() < 0.15 else "info"
+
+
+def pick_offer(offers_path: Path, topic_tag: str) -> dict | None:
+    offers = json.loads(offers_path.read_text(encoding="utf-8"))
+    compatible = [item for item in offers if topic_tag in item.get("tags", []) or "us" in item.get("tags", [])]
+    return random.choice(compatible or offers) if offers else None
+
+
+def build_client(settings: Settings, state: dict) -> GeminiClient:
+    hedger = None
+    if settings.gemini_hedge_percentile > 0 and len(settings.gemini_api_keys) > 1:
+        hedger = Hedger(
+            key_count=len(settings.gemini_api_keys),
+            percentile=settings.gemini_hedge_percentile,
+            budget=settings.gemini_hedge_budget,
+            default_delay=15.0,
+            samples=state.get("gemini_latency_seconds", []),
+        )
+    return GeminiClient(
+        api_keys=settings.gemini_api_keys,
+        model=settings.gemini_model,
+        stream=settings.gemini_stream,
+        hedger=hedger,
+    )
+
+
+def build_scheduler(state: dict, topics: list[Topic]) -> TopicScheduler:
+    return TopicScheduler(
+        topics,
+        recent_topics=list(state.get("recent_topics", [])),
+        recent_tags=list(state.get("recent_tags", [])),
+        tag_counts=dict(state.get("tag_counts", {})),
+        topic_rotation=dict(state.get("topic_rotation", {})),
+        topic_last_used=dict(state.get("topic_last_used", {})),
+    )
+
+
+def hero_prefetcher(pexels_api_key: str) -> FieldCallback:
+    """Field callback that starts the Pexels search as soon as ``image_query`` streams in."""
+
+    def on_field(key: str, value: object) -> None:
+        if key == "image_query" and isinstance(value, str):
+            prefetch_photo_url(pexels_api_key, value)
+
+    return on_field
+
+
+def record_client_stats(state: dict, client: GeminiClient) -> None:
+    """Fold this run's Gemini counters (and hedging latencies) into ``state`` and log them."""
+    gemini_stats = dict(state.get("gemini_stats", {}))
+    for key, value in client.stats.items():
+        gemini_stats[key] = int(gemini_stats.get(key, 0)) + value
+    state["gemini_stats"] = dict(sorted(gemini_stats.items()))
+    LOG.info("Gemini stats this run: %s", dict(client.stats))
+    if client.hedger is not None:
+        state["gemini_latency_seconds"] = [round(value, 3) for value in client.hedger.samples()]
+        LOG.info(
+            "Gemini hedging: %s hedges over %s requests (%.0f%%), %s won, %.1fs saved",
+            client.stats["hedges"],
+            client.stats["requests"],
+            100.0 * client.stats["hedges"] / max(client.stats["requests"], 1),
+            client.stats["hedge_wins"],
+            client.stats["hedge_saved_ms"] / 1000,
+        )
+
+
+def generate_unique_article(
+    client: GeminiClient,
+    topic: Topic,
+    titles: list[str],
+    mode: str,
+    offer: dict | None,
+    dup_index: NearDuplicateIndex,
+    on_field: FieldCallback | None = None,
+) -> dict:
+    fresh_titles: list[str] = []
+    for title in rank_titles(titles):
+        match = dup_index.find_title(title)
+        if match is None:
+            fresh_titles.append(title)
+        else:
+            LOG.info("Skipping title %r: near-duplicate of %s (%.2f).", title, match.slug, match.similarity)
+    if not fresh_titles:
+        raise ValueError(f"Every candidate title for {topic.slug} is a near-duplicate of a published post")
+
+    for title in fresh_titles[:2]:
+        post = generate_article(client, topic, title, mode, offer, on_field=on_field)
+        match = dup_index.find_text(post["html"])
+        if match is None:
+            return post
+        LOG.warning("Article for %r is a near-duplicate of %s (%.2f); regenerating.", title, match.slug, match.similarity)
+    raise ValueError(f"Generated articles for {topic.slug} kept matching published posts")
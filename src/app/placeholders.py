@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import argparse
+import base64
+import io
+import logging
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+from PIL import Image, UnidentifiedImageError
+
+from .config import REPO_ROOT
+from .locking import file_lock
+from .output import write_if_changed
+from .post_index import load_archive
+from .site import img_size_attrs, write_site_state
+
+LOG = logging.getLogger(__name__)
+
+PLACEHOLDER_WIDTH = 16
+PLACEHOLDER_QUALITY = 40
+
+
+@dataclass(frozen=True)
+class ImageMeta:
+    """Intrinsic size of a hero plus a tiny inline JPEG shown (scaled up, so blurred) while it loads."""
+
+    width: int
+    height: int
+    placeholder: str
+
+    def as_record(self) -> dict[str, object]:
+        return {"hero_width": self.width, "hero_height": self.height, "hero_placeholder": self.placeholder}
+
+
+def image_meta(path: Path) -> ImageMeta | None:
+    """Read ``path`` locally; ``None`` when it is missing or not an image."""
+    try:
+        with Image.open(path) as image:
+            width, height = image.size
+            # JPEG draft mode decodes at 1/8 scale, so thumbnailing a 2K hero stays cheap.
+            image.draft("RGB", (PLACEHOLDER_WIDTH * 4, PLACEHOLDER_WIDTH * 4))
+            thumb = image.convert("RGB")
+            thumb.thumbnail((PLACEHOLDER_WIDTH, PLACEHOLDER_WIDTH))
+    except (FileNotFoundError, UnidentifiedImageError, OSError) as exc:
+        LOG.warning("No image metadata for %s: %s", path, exc)
+        return None
+    buffer = io.BytesIO()
+    thumb.save(buffer, format="JPEG", quality=PLACEHOLDER_QUALITY, optimize=True)
+    encoded = base64.b64encode(buffer.getvalue()).decode("ascii")
+    return ImageMeta(width=width, height=height, placeholder=f"data:image/jpeg;base64,{encoded}")
+
+
+def backfill(docs_dir: Path, base_url: str, site_title: str) -> int:
+    """Add hero size and placeholder to posts that lack them, patch their pages and re-render cards.
+
+    Returns how many posts were updated.
+    """
+    posts_path = docs_dir / "posts.json"
+    with file_lock(posts_path):
+        posts = load_archive(docs_dir)
+        updated = 0
+        for post in posts:
+            if post.get("hero_placeholder") or not post.get("hero"):
+                continue
+            meta = image_meta(docs_dir / str(post["hero"]))
+            if meta is None:
+                continue
+            post.update(meta.as_record())
+            _patch_hero_tag(docs_dir / str(post.get("url", "")), str(post["hero"]), meta)
+            updated += 1
+        if updated:
+            write_site_state(docs_dir, base_url, site_title, posts)
+    return updated
+
+
+def _patch_hero_tag(page: Path, hero: str, meta: ImageMeta) -> None:
+    """Post pages are not re-rendered from source, so add the attributes to the existing hero tag."""
+    if not page.is_file():
+        return
+    html = page.read_text(encoding="utf-8")
+    hero_tag = re.compile(rf"<img src='{re.escape(hero)}'(?![^>]*\bwidth=)([^>]*?)>")
+    attrs = img_size_attrs(meta.width, meta.height, meta.placeholder)
+    patched = hero_tag.sub(lambda match: f"<img src='{hero}'{match.group(1)}{attrs}>", html, count=1)
+    write_if_changed(page, patched)
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Backfill hero dimensions and inline placeholders")
+    parser.add_argument("--docs-dir", type=Path, default=REPO_ROOT / "docs")
+    parser.add_argument("--base-url", default=os.getenv("BASE_URL", ""))
+    parser.add_argument("--site-title", default=os.getenv("SITE_TITLE") or "Practical US Health Notes")
+    args = parser.parse_args()
+    print(f"placeholders: updated {backfill(args.docs_dir, args.base_url, args.site_title)} posts")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+DEFAULT_TAG = "health"
+# Every published post, newest first. ``posts.json`` holds only its newest HEAD_POSTS entries,
+# derived from it on each build, for consumers that want a small recent list.
+ARCHIVE_FILE = "archive.json"
+HEAD_FILE = "posts.json"
+HEAD_POSTS = 200
+
+
+def load_archive(docs_dir: Path) -> list[dict[str, Any]]:
+    """Every post record in ``docs_dir``, newest first.
+
+    Sites built before the archive existed only have ``posts.json``; the first build writes the
+    archive from it.
+    """
+    for name in (ARCHIVE_FILE, HEAD_FILE):
+        path = docs_dir / name
+        if not path.exists():
+            continue
+        try:
+            records = json.loads(path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            continue
+        if isinstance(records, list):
+            return [record for record in records if isinstance(record, dict)]
+    return []
+
+
+@dataclass(frozen=True, slots=True)
+class PostRecord:
+    """One archive entry. Slotted, so large rebuilds hold no per-record ``__dict__``."""
+
+    slug: str
+    title: str
+    description: str
+    date: str
+    url: str
+    hero: str
+    tag: str
+    # Hero size and inline placeholder (data URI); 0/"" for posts published before they existed.
+    hero_width: int = 0
+    hero_height: int = 0
+    hero_placeholder: str = ""
+    # Keys this class does not know, kept so archive records round-trip unchanged.
+    extra: tuple[tuple[str, Any], ...] = ()
+
+    @classmethod
+    def from_dict(cls, raw: dict[str, Any]) -> PostRecord:
+        slug = str(raw.get("slug", ""))
+        return cls(
+            slug=slug,
+            title=str(raw.get("title", "")),
+            description=str(raw.get("description", "")),
+            date=str(raw.get("date", "")),
+            url=str(raw.get("url", "") or (f"{slug}.html" if slug else "")),
+            hero=str(raw.get("hero", "") or ""),
+            tag=str(raw.get("tag", "") or DEFAULT_TAG),
+            hero_width=_int(raw.get("hero_width")),
+            hero_height=_int(raw.get("hero_height")),
+            hero_placeholder=str(raw.get("hero_placeholder", "") or ""),
+            extra=tuple((key, value) for key, value in raw.items() if key not in _FIELDS + _HERO_FIELDS),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        record: dict[str, Any] = {name: getattr(self, name) for name in _FIELDS}
+        record.update((name, getattr(self, name)) for name in _HERO_FIELDS if getattr(self, name))
+        record.update(self.extra)
+        return record
+
+
+_FIELDS = ("slug", "title", "description", "date", "url", "hero", "tag")
+_HERO_FIELDS = ("hero_width", "hero_height", "hero_placeholder")
+
+
+def _int(value: Any) -> int:
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class PostIndex:
+    """Posts in feed order (newest first, as stored in the archive) with slug and tag lookups.
+
+    Built once per site build; every lookup is a dict hit or a walk over one tag's posts, so
+    the selection helpers in ``site.py`` stay linear in the number of posts.
+    """
+
+    __slots__ = ("posts", "by_slug", "by_tag")
+
+    def __init__(self, posts: Iterable[PostRecord]) -> None:
+        self.posts: list[PostRecord] = []
+        self.by_slug: dict[str, PostRecord] = {}
+        self.by_tag: dict[str, list[PostRecord]] = {}
+        for post in posts:
+            if post.slug in self.by_slug:
+                continue
+            self.posts.append(post)
+            self.by_slug[post.slug] = post
+            self.by_tag.setdefault(post.tag, []).append(post)
+
+    @classmethod
+    def from_dicts(cls, raw_posts: Iterable[dict[str, Any]]) -> PostIndex:
+        return cls(PostRecord.from_dict(raw) for raw in raw_posts if isinstance(raw, dict))
+
+    def __len__(self) -> int:
+        return len(self.posts)
+
+    def __iter__(self) -> Iterator[PostRecord]:
+        return iter(self.posts)
+
+    def get(self, slug: str) -> PostRecord | None:
+        return self.by_slug.get(slug)
+
+    def with_first(self, post: PostRecord) -> PostIndex:
+        """A new index with ``post`` at the top, replacing any post with the same slug."""
+        return PostIndex([post, *(existing for existing in self.posts if existing.slug != post.slug)])
+
+    def tags(self) -> list[str]:
+        """Tags in order of their newest post."""
+        return list(self.by_tag)
+
+    def in_tag(self, tag: str, exclude_slug: str = "", limit: int | None = None) -> list[PostRecord]:
+        posts = (post for post in self.by_tag.get(tag, ()) if post.slug != exclude_slug)
+        return list(islice(posts, limit))
+
+    def outside_tag(self, tag: str, exclude_slug: str = "", limit: int | None = None) -> list[PostRecord]:
+        posts = (post for post in self.posts if post.tag != tag and post.slug != exclude_slug)
+        return list(islice(posts, limit))
+
+    def tag_by_date(self, tag: str) -> list[PostRecord]:
+        """One tag's posts, newest date first; posts sharing a date keep feed order."""
+        return sorted(self.by_tag.get(tag, ()), key=lambda post: post.date, reverse=True)
+
+    def first_per_tag(self) -> list[PostRecord]:
+        return [posts[0] for posts in self.by_tag.values()]
+
+    def head(self, limit: int) -> list[PostRecord]:
+        return self.posts[:limit]
@@ -0,0 +1,312 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from fnmatch import fnmatchcase
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Any, ContextManager, Iterator
+
+LOG = logging.getLogger(__name__)
+
+PROFILE_ENV = "PIN_PROFILE"
+SAMPLE_INTERVAL_SECONDS = 0.01
+# Reports group allocations by line, so one frame per trace is enough; deeper tracebacks made
+# traced rebuilds about four times slower.
+TRACE_FRAMES = 1
+TOP_ALLOCATIONS = 15
+# Span boundaries closer together than this share one allocation snapshot.
+REUSE_SNAPSHOT_SECONDS = 0.002
+# Only spans this many levels below the profiled block (run, slot, checkpoint stage) list their
+# allocating lines; deeper ones such as page writers still get time, net and peak memory. Each
+# snapshot groups the whole live heap, which is what dominated profiled runs.
+SNAPSHOT_DEPTH = 2
+# Allocations made by the profiler itself or by import machinery are noise in every report.
+_IGNORED = (__file__, tracemalloc.__file__, threading.__file__, "<frozen importlib.*", "<unknown>")
+
+# Allocating line -> [bytes, blocks] still held.
+LineTotals = dict[tuple[str, int], list[int]]
+
+_ACTIVE: Profiler | None = None
+
+
+def profiling_enabled(flag: bool = False) -> bool:
+    """``--profile`` on the command line, or ``PIN_PROFILE=1`` in the environment."""
+    return flag or os.getenv(PROFILE_ENV, "0").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def profiled(label: str, out_dir: Path, flag: bool = False) -> ContextManager[None]:
+    """Profile the block into ``out_dir`` when profiling is enabled; otherwise do nothing."""
+    if not profiling_enabled(flag):
+        return nullcontext()
+    return _profile(label, out_dir)
+
+
+@contextmanager
+def span(name: str, **args: Any) -> Iterator[None]:
+    """Time ``name`` (and the memory it allocates) in the active profile; free when none is running."""
+    profiler = _ACTIVE
+    if profiler is None:
+        yield
+        return
+    with profiler.span(name, args):
+        yield
+
+
+@contextmanager
+def _profile(label: str, out_dir: Path) -> Iterator[None]:
+    global _ACTIVE
+    if _ACTIVE is not None:
+        # A profiled entry point called from another one records into the outer profile.
+        with span(label):
+            yield
+        return
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start(TRACE_FRAMES)
+    profiler = Profiler(label)
+    _ACTIVE = profiler
+    sampler = _Sampler(profiler)
+    sampler.start()
+    try:
+        with profiler.span(label, {}):
+            yield
+    finally:
+        sampler.stop()
+        _ACTIVE = None
+        paths = profiler.write(out_dir)
+        if started_tracing:
+            tracemalloc.stop()
+        LOG.info("Profile written: %s", ", ".join(str(path) for path in paths))
+
+
+@dataclass
+class _Span:
+    name: str
+    seconds: float
+    allocated: int
+    peak: int
+    top: list[str]
+
+
+@dataclass
+class Profiler:
+    """Chrome trace events, per-span allocation diffs and CPU samples for one profiled run.
+
+    Spans become complete (``X``) events with the bytes they allocated; traced memory is a
+    counter track; the sampler's stacks go into ``stackFrames``/``samples``, so chrome://tracing
+    and Perfetto show both the stage timeline and where CPU went inside each stage.
+    """
+
+    label: str
+    started: float = field(default_factory=time.perf_counter)
+    events: list[dict[str, Any]] = field(default_factory=list)
+    spans: list[_Span] = field(default_factory=list)
+    # Interned stack frames: (parent id, code, line) -> id, with each id's parent and display name.
+    frame_ids: dict[tuple[int | None, CodeType, int], int] = field(default_factory=dict)
+    frame_parents: list[int | None] = field(default_factory=list)
+    frame_names: list[str] = field(default_factory=list)
+    # (timestamp in us, thread id, leaf frame id) per sample.
+    samples: list[tuple[float, int, int]] = field(default_factory=list)
+    # Peak seen so far by each open span; a nested span resets the tracemalloc peak, so it hands
+    # its own peak up to the enclosing span when it ends.
+    _peaks: list[int] = field(default_factory=list)
+    _last_totals: tuple[float, LineTotals] | None = None
+    _ignored: dict[str, bool] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def now_us(self) -> float:
+        return (time.perf_counter() - self.started) * 1_000_000
+
+    @contextmanager
+    def span(self, name: str, args: dict[str, Any]) -> Iterator[None]:
+        # Snapshots are taken outside the timed region so their cost does not count against the span.
+        detailed = len(self._peaks) <= SNAPSHOT_DEPTH
+        before = self._line_totals() if detailed else {}
+        if self._peaks:
+            self._peaks[-1] = max(self._peaks[-1], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        self._peaks.append(0)
+        start_memory = tracemalloc.get_traced_memory()[0]
+        self._memory_counter()
+        start = self.now_us()
+        try:
+            yield
+        finally:
+            end = self.now_us()
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(self._peaks.pop(), peak)
+            if self._peaks:
+                self._peaks[-1] = max(self._peaks[-1], peak)
+            top = _grown(before, self._line_totals()) if detailed else []
+            allocated = current - start_memory
+            self._memory_counter()
+            with self._lock:
+                self.events.append(
+                    {
+                        "name": name,
+                        "cat": "stage",
+                        "ph": "X",
+                        "ts": round(start, 1),
+                        "dur": round(end - start, 1),
+                        "pid": os.getpid(),
+                        "tid": threading.get_ident(),
+                        "args": {**args, "allocated_kb": round(allocated / 1024, 1), "peak_kb": round(peak / 1024, 1)},
+                    }
+                )
+                self.spans.append(_Span(name, (end - start) / 1_000_000, allocated, peak, top))
+
+    def _line_totals(self) -> LineTotals:
+        """Traced memory held per allocating line.
+
+        Ignored files are dropped after grouping, from a per-filename cache: ``filter_traces``
+        matches every live trace against every pattern and made each span cost seconds on a full
+        pipeline heap. Span boundaries that follow each other directly share one grouping.
+        """
+        if self._last_totals and time.perf_counter() - self._last_totals[0] < REUSE_SNAPSHOT_SECONDS:
+            return self._last_totals[1]
+        totals: LineTotals = {}
+        for stat in tracemalloc.take_snapshot().statistics("lineno"):
+            frame = stat.traceback[0]
+            ignored = self._ignored.get(frame.filename)
+            if ignored is None:
+                ignored = self._ignored[frame.filename] = any(
+                    fnmatchcase(frame.filename, pattern) for pattern in _IGNORED
+                )
+            if not ignored:
+                totals[(frame.filename, frame.lineno)] = [stat.size, stat.count]
+        self._last_totals = (time.perf_counter(), totals)
+        return totals
+
+    def _memory_counter(self) -> None:
+        current, _ = tracemalloc.get_traced_memory()
+        with self._lock:
+            self.events.append(
+                {
+                    "name": "traced memory",
+                    "ph": "C",
+                    "ts": round(self.now_us(), 1),
+                    "pid": os.getpid(),
+                    "args": {"MB": round(current / 1_000_000, 2)},
+                }
+            )
+
+    def add_sample(self, tid: int, frame: FrameType | None) -> None:
+        stack: list[tuple[CodeType, int]] = []
+        while frame is not None:
+            code = frame.f_code
+            if code.co_filename == __file__:
+                return  # the profiler taking its own snapshots
+            stack.append((code, frame.f_lineno))
+            frame = frame.f_back
+        ts = self.now_us()
+        with self._lock:
+            parent: int | None = None
+            for code, line in reversed(stack):
+                key = (parent, code, line)
+                frame_id = self.frame_ids.get(key)
+                if frame_id is None:
+                    frame_id = self.frame_ids[key] = len(self.frame_names)
+                    self.frame_parents.append(parent)
+                    self.frame_names.append(f"{code.co_name} ({Path(code.co_filename).name}:{line})")
+                parent = frame_id
+            if parent is not None:
+                self.samples.append((ts, tid, parent))
+
+    def folded_stacks(self) -> Counter[str]:
+        """Sample counts per ``outer;...;inner`` stack, the input flamegraph tools and speedscope read."""
+        stacks: Counter[str] = Counter()
+        for leaf, count in Counter(frame_id for _, _, frame_id in self.samples).items():
+            names = []
+            frame_id: int | None = leaf
+            while frame_id is not None:
+                names.append(self.frame_names[frame_id])
+                frame_id = self.frame_parents[frame_id]
+            stacks[";".join(reversed(names))] += count
+        return stacks
+
+    def write(self, out_dir: Path) -> list[Path]:
+        """Write ``{label}-{stamp}.trace.json``, ``.alloc.txt`` and ``.folded`` (flamegraph input)."""
+        out_dir.mkdir(parents=True, exist_ok=True)
+        stem = f"{self.label}-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}"
+        pid = os.getpid()
+        stack_frames = {
+            str(frame_id): {"name": name, **({"parent": str(parent)} if parent is not None else {})}
+            for frame_id, (name, parent) in enumerate(zip(self.frame_names, self.frame_parents))
+        }
+        trace = {
+            "traceEvents": sorted(self.events, key=lambda event: event["ts"]),
+            "stackFrames": stack_frames,
+            "samples": [
+                {"ts": round(ts, 1), "pid": pid, "tid": tid, "sf": str(frame_id), "weight": 1}
+                for ts, tid, frame_id in self.samples
+            ],
+            "displayTimeUnit": "ms",
+        }
+        trace_path = out_dir / f"{stem}.trace.json"
+        trace_path.write_text(json.dumps(trace), encoding="utf-8")
+        alloc_path = out_dir / f"{stem}.alloc.txt"
+        alloc_path.write_text(self.allocation_report(), encoding="utf-8")
+        folded_path = out_dir / f"{stem}.folded"
+        folded = self.folded_stacks().most_common()
+        folded_path.write_text("".join(f"{stack} {count}\n" for stack, count in folded), encoding="utf-8")
+        return [trace_path, alloc_path, folded_path]
+
+    def allocation_report(self) -> str:
+        """Spans by wall time with the lines that allocated the most inside each, then CPU hot spots."""
+        lines = [f"Profile {self.label}: {len(self.spans)} spans, {len(self.samples)} CPU samples", ""]
+        for item in sorted(self.spans, key=lambda item: item.seconds, reverse=True):
+            lines.append(
+                f"{item.name}: {item.seconds:.3f}s, net {item.allocated / 1024:,.1f} KiB, peak {item.peak / 1024:,.1f} KiB"
+            )
+            lines.extend(f"    {line}" for line in item.top)
+            lines.append("")
+        leaves = Counter(self.frame_names[frame_id] for _, _, frame_id in self.samples)
+        if leaves:
+            lines.append("CPU samples by function (self):")
+            total = sum(leaves.values())
+            lines.extend(f"    {count / total:6.1%}  {name}" for name, count in leaves.most_common(TOP_ALLOCATIONS))
+        return "\n".join(lines) + "\n"
+
+
+def _grown(before: LineTotals, after: LineTotals) -> list[str]:
+    """Lines holding more memory than before, largest growth first."""
+    growth = []
+    for line, (size, count) in after.items():
+        old_size, old_count = before.get(line, (0, 0))
+        if size > old_size:
+            growth.append((size - old_size, count - old_count, size, line))
+    growth.sort(reverse=True)
+    return [
+        f"{filename}:{lineno}: +{size_diff / 1024:,.1f} KiB ({count_diff:+} blocks), {size / 1024:,.1f} KiB held"
+        for size_diff, count_diff, size, (filename, lineno) in growth[:TOP_ALLOCATIONS]
+    ]
+
+
+class _Sampler(threading.Thread):
+    """Samples the Python stack of every other thread each ``SAMPLE_INTERVAL_SECONDS``."""
+
+    def __init__(self, profiler: Profiler) -> None:
+        super().__init__(name="profile-sampler", daemon=True)
+        self.profiler = profiler
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop_event.wait(SAMPLE_INTERVAL_SECONDS):
+            for tid, frame in sys._current_frames().items():
+                if tid != own:
+                    self.profiler.add_sample(tid, frame)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
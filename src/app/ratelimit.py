@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .config import Settings
+
+LOG = logging.getLogger(__name__)
+
+GEMINI_REQUESTS = "gemini.requests"
+GEMINI_TOKENS = "gemini.tokens"
+PEXELS_REQUESTS = "pexels.requests"
+PINTEREST_WRITES = "pinterest.writes"
+
+
+@dataclass
+class TokenBucket:
+    """Blocking token bucket: ``rate`` tokens per second, bursts up to ``capacity``."""
+
+    rate: float
+    capacity: float
+    _tokens: float = field(init=False)
+    _updated: float = field(init=False)
+    _lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+
+    def __post_init__(self) -> None:
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block until ``tokens`` are available and take them; returns the seconds spent waiting."""
+        tokens = min(tokens, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def exhaust(self) -> None:
+        """Empty the bucket, e.g. after the provider answered 429 despite our accounting."""
+        with self._lock:
+            self._refill()
+            self._tokens = 0.0
+
+    def snapshot(self) -> dict[str, float]:
+        with self._lock:
+            self._refill()
+            return {"tokens": round(self._tokens, 3), "saved_at": round(time.time(), 3)}
+
+    def restore(self, snapshot: dict[str, float]) -> None:
+        idle = max(0.0, time.time() - float(snapshot.get("saved_at", 0.0)))
+        with self._lock:
+            self._tokens = min(self.capacity, float(snapshot.get("tokens", self.capacity)) + idle * self.rate)
+            self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+@dataclass(frozen=True)
+class Limit:
+    rate: float
+    capacity: float
+
+    @classmethod
+    def per_minute(cls, count: float) -> Limit:
+        return cls(rate=count / 60.0, capacity=max(1.0, count))
+
+    @classmethod
+    def per_hour(cls, count: float) -> Limit:
+        return cls(rate=count / 3600.0, capacity=max(1.0, count))
+
+
+class RateLimiter:
+    """Process-wide registry of token buckets, one per limit name and (optionally) per API key.
+
+    Unconfigured limit names are unlimited, so modules can call ``acquire`` unconditionally.
+    Buckets are keyed by caller-supplied labels such as ``key#2``; raw credentials never reach
+    the persisted snapshot.
+    """
+
+    def __init__(self) -> None:
+        self._limits: dict[str, Limit] = {}
+        self._buckets: dict[str, TokenBucket] = {}
+        self._restored: dict[str, dict[str, float]] = {}
+        self._lock = threading.Lock()
+        self.path: Path | None = None
+        self.waited: dict[str, float] = {}
+
+    def configure(self, limits: dict[str, Limit], path: Path | None = None) -> None:
+        with self._lock:
+            self._limits = dict(limits)
+            self._buckets = {}
+            self._restored = {}
+            self.path = path
+            if path is not None and path.exists():
+                try:
+                    raw = json.loads(path.read_text(encoding="utf-8"))
+                except json.JSONDecodeError:
+                    LOG.warning("Rate limiter state at %s is unreadable; starting with full buckets.", path)
+                    raw = {}
+                self._restored = {name: value for name, value in raw.items() if isinstance(value, dict)}
+
+    def acquire(self, name: str, key: str = "", tokens: float = 1.0) -> None:
+        bucket = self._bucket(name, key)
+        if bucket is None:
+            return
+        waited = bucket.acquire(tokens)
+        if waited:
+            with self._lock:
+                self.waited[name] = self.waited.get(name, 0.0) + waited
+            LOG.debug("Rate limiter held %s%s for %.1fs", name, f":{key}" if key else "", waited)
+
+    def exhaust(self, name: str, key: str = "") -> None:
+        bucket = self._bucket(name, key)
+        if bucket is not None:
+            bucket.exhaust()
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            snapshot = dict(self._restored)
+            snapshot.update({name: bucket.snapshot() for name, bucket in self._buckets.items()})
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(dict(sorted(snapshot.items())), indent=2), encoding="utf-8")
+
+    def _bucket(self, name: str, key: str) -> TokenBucket | None:
+        bucket_name = f"{name}:{key}" if key else name
+        with self._lock:
+            bucket = self._buckets.get(bucket_name)
+            if bucket is None:
+                limit = self._limits.get(name)
+                if limit is None:
+                    return None
+                bucket = TokenBucket(rate=limit.rate, capacity=limit.capacity)
+                if bucket_name in self._restored:
+                    bucket.restore(self._restored[bucket_name])
+                self._buckets[bucket_name] = bucket
+            return bucket
+
+
+LIMITER = RateLimiter()
+
+
+def configure_from_settings(settings: Settings) -> RateLimiter:
+    """Point the shared limiter at the provider limits in ``settings``."""
+    limits = {
+        GEMINI_REQUESTS: Limit.per_minute(settings.gemini_rpm_per_key),
+        GEMINI_TOKENS: Limit.per_minute(settings.gemini_tpm_per_key),
+        PEXELS_REQUESTS: Limit.per_hour(settings.pexels_requests_per_hour),
+        PINTEREST_WRITES: Limit.per_minute(settings.pinterest_pins_per_minute),
+    }
+    path = settings.generated_dir / "ratelimit.json" if settings.rate_limit_persist else None
+    LIMITER.configure({name: limit for name, limit in limits.items() if limit.rate > 0}, path)
+    return LIMITER
@@ -1,26 +1,18 @@
 from __future__ import annotations
 
-import json
+import argparse
 import re
 from pathlib import Path
-from typing import Any
 
 from . import site as site_mod
+from .locking import file_lock
+from .post_index import load_archive
+from .profiling import profiled
 
 
 HREF_RE = re.compile(r"""href\s*=\s*(['"])([^'"]+)\1""", re.IGNORECASE)
 
 
-def _load_posts(posts_path: Path) -> list[dict[str, Any]]:
-    if not posts_path.exists():
-        return []
-    try:
-        data = json.loads(posts_path.read_text(encoding="utf-8"))
-        return data if isinstance(data, list) else []
-    except json.JSONDecodeError:
-        return []
-
-
 def _existing_html_set(docs_dir: Path) -> set[str]:
     return {p.name for p in docs_dir.glob("*.html")}
 
@@ -69,13 +61,22 @@ def _rewrite_broken_local_html_links(file_path: Path, existing: set[str]) -> boo
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Drop missing posts, fix broken links and rebuild the site")
+    parser.add_argument("--profile", action="store_true", help="write a profile to generated/profiles (or PIN_PROFILE=1)")
+    args = parser.parse_args()
     docs_dir = Path("docs")
     posts_path = docs_dir / "posts.json"
-    posts = _load_posts(posts_path)
+    # Held from read to rebuild, so a publish or delete running meanwhile is not overwritten.
+    with profiled("repair_site", Path("generated") / "profiles", args.profile), file_lock(posts_path):
+        _repair(docs_dir)
+
+
+def _repair(docs_dir: Path) -> None:
+    posts = load_archive(docs_dir)
 
     existing = _existing_html_set(docs_dir)
 
-    # 1) Drop posts.json entries whose html file doesn't exist
+    # 1) Drop archive entries whose html file doesn't exist (written back by write_site_state below)
     filtered = []
     for p in posts:
         slug = (p.get("slug") or "").strip()
@@ -85,9 +86,6 @@ def main() -> None:
         if url in existing:
             filtered.append(p)
 
-    if filtered != posts:
-        posts_path.write_text(json.dumps(filtered[:200], indent=2), encoding="utf-8")
-
     # 2) Rewrite broken local links inside all docs/*.html
     changed_files = 0
     for html_file in docs_dir.glob("*.html"):
@@ -101,7 +99,7 @@ def main() -> None:
             if _rewrite_broken_local_html_links(html_file, existing):
                 changed_files += 1
 
-    # 4) Rebuild index/tag/sitemap/robots from cleaned posts.json
+    # 4) Rebuild the archive, posts.json, index/tag/sitemap/robots from the cleaned records
     base_url = (Path(".") / ".base_url.tmp").read_text().strip() if (Path(".") / ".base_url.tmp").exists() else ""
     # Prefer env if running in Actions
     import os
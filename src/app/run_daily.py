@@ -1,115 +1,291 @@
 from __future__ import annotations
 
-import json
+import argparse
 import logging
-import random
-from datetime import datetime, timezone
+from contextlib import AbstractContextManager, nullcontext
+from datetime import date, datetime, timezone
 
-from .config import load_settings
-from .content import generate_article, normalize_tag
-from .gemini_client import GeminiClient
+from .buffer import BufferedPost, ContentBuffer, claim_images, fill_buffer
+from .checkpoint import DONE, MAX_SLOT_ATTEMPTS, SlotCheckpoint, purge_checkpoints
+from .config import Settings, load_settings
+from .content import normalize_tag
+from .dedupe import NearDuplicateIndex
+from .gemini_client import FieldCallback, GeminiClient
 from .images import create_pinterest_image, fetch_hero_image
-from .pinterest_api import create_pin
-from .pinterest_drafts import write_draft_pack
-from .site import publish_post
+from .indexnow import queue_changes
+from .link_graph import LinkGraph
+from .output import build_manifest
+from .pin_queue import PinQueue
+from .pinterest_drafts import DraftStore, write_draft_pack
+from .pipeline import (
+    build_client,
+    build_scheduler,
+    choose_mode,
+    generate_unique_article,
+    hero_prefetcher,
+    pick_offer,
+    record_client_stats,
+)
+from .placeholders import image_meta
+from .profiling import profiled, span
+from .ratelimit import LIMITER, configure_from_settings
+from .site import publish_post, site_base_url
+from .slug_index import SlugIndex
 from .state import load_state, save_state
-from .titles import generate_titles, pick_best_title
-from .topics import pick_topic
+from .titles import generate_titles
+from .topics import Topic, load_topics
 
 LOG = logging.getLogger(__name__)
 
+SLOTS_PER_RUN = 2
+
 
 def _setup_logging() -> None:
     logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s - %(message)s")
 
 
-def _choose_mode(state: dict) -> str:
-    runs = int(state.get("runs", 0))
-    offer_runs = int(state.get("offer_runs", 0))
-    if runs == 0:
-        return "info"
-    ratio = offer_runs / max(runs, 1)
-    if ratio < 0.30:
-        return "offer" if random.random() < 0.6 else "info"
-    return "offer" if random.random() < 0.15 else "info"
+def should_generate_today(posts_per_week: int) -> bool:
+    if posts_per_week >= 7:
+        return True
+    return datetime.now(timezone.utc).weekday() < posts_per_week
 
 
-def _pick_offer(repo_root, topic_tag: str) -> dict | None:
-    offers = json.loads((repo_root / "offers.json").read_text(encoding="utf-8"))
-    compatible = [item for item in offers if topic_tag in item.get("tags", []) or "us" in item.get("tags", [])]
-    return random.choice(compatible or offers) if offers else None
+def _new_article(
+    client: GeminiClient,
+    topic: Topic,
+    titles: list[str],
+    mode: str,
+    offer: dict | None,
+    dup_index: NearDuplicateIndex,
+    slug_index: SlugIndex,
+    run_date: date,
+    slot: int,
+    on_field: FieldCallback | None = None,
+    buffered: BufferedPost | None = None,
+) -> dict:
+    if buffered is not None:
+        post = dict(buffered.post)
+    else:
+        post = generate_unique_article(client, topic, titles, mode, offer, dup_index, on_field=on_field)
+    post["tag"] = normalize_tag(post.get("tag", "")) or normalize_tag(topic.tag) or "health"
+    post["slug"] = slug_index.allocate(post["slug"], run_date, slot)
+    return post
 
 
-def _should_generate_today(posts_per_week: int) -> bool:
-    if posts_per_week >= 7:
-        return True
-    return datetime.now(timezone.utc).weekday() < posts_per_week
+def _hero_rel(post: dict, run_date: date) -> str:
+    return f"assets/{run_date.isoformat()}_{post['slug']}.jpg"
 
 
-def main() -> None:
-    _setup_logging()
-    settings = load_settings()
-    if not _should_generate_today(settings.posts_per_week):
-        LOG.info("Skipping generation today to maintain %s posts/week.", settings.posts_per_week)
-        return
+def _pin_rel(settings: Settings, post: dict, run_date: date) -> str:
+    """Pin image path relative to the repo root, as recorded in draft packs."""
+    pinterest_dir = (settings.generated_dir / "pinterest").relative_to(settings.repo_root)
+    return f"{pinterest_dir.as_posix()}/{run_date.isoformat()}_{post['slug']}.png"
 
-    today = datetime.now(timezone.utc).date()
-    state_path = settings.repo_root / "generated" / "state.json"
-    state = load_state(state_path)
-
-    client = GeminiClient(api_keys=settings.gemini_api_keys, model=settings.gemini_model)
-    recent_topics = list(state.get("recent_topics", []))
-    recent_tags = list(state.get("recent_tags", []))
-    recent_slugs = list(state.get("recent_slugs", []))
-    tag_counts = dict(state.get("tag_counts", {}))
-    topic_rotation = dict(state.get("topic_rotation", {}))
-    daily_slugs: set[str] = set()
-    daily_topics: set[str] = set()
-    published_count = 0
-
-    for slot in range(2):
-        mode = _choose_mode(state)
-        topic = pick_topic(
-            recent_topics=recent_topics,
-            recent_tags=recent_tags,
-            tag_counts=tag_counts,
-            excluded_slugs=daily_topics,
-            topic_rotation=topic_rotation,
+
+def _fetch_hero(settings: Settings, post: dict, run_date: date) -> str:
+    hero_rel = _hero_rel(post, run_date)
+    # Buffered posts arrive with their hero already moved into place.
+    if not (settings.docs_dir / hero_rel).is_file():
+        fetch_hero_image(settings.pexels_api_key, post["image_query"], settings.docs_dir / hero_rel)
+    return hero_rel
+
+
+def _render_pin(settings: Settings, post: dict, hero_rel: str, run_date: date) -> str:
+    pin_rel = _pin_rel(settings, post, run_date)
+    if not (settings.repo_root / pin_rel).is_file():
+        create_pinterest_image(
+            settings.pexels_api_key,
+            post["image_query"],
+            post["pin_title"],
+            settings.repo_root / pin_rel,
+            source_image_path=settings.docs_dir / hero_rel,
         )
-        offer = _pick_offer(settings.repo_root, topic.tag) if mode == "offer" else None
+    return pin_rel
 
-        try:
-            titles = generate_titles(client, topic)
-            chosen_title = pick_best_title(titles)
-            post = generate_article(client, topic, chosen_title, mode, offer)
-            post["tag"] = normalize_tag(post.get("tag", "")) or normalize_tag(topic.tag) or "health"
-
-            if post["slug"] in set(recent_slugs[-40:]) or post["slug"] in daily_slugs:
-                post["slug"] = f"{post['slug']}-{today.strftime('%m%d')}-{slot + 1}"
-
-            hero_rel = f"assets/{today.isoformat()}_{post['slug']}.jpg"
-            fetch_hero_image(settings.pexels_api_key, post["image_query"], settings.repo_root / "docs" / hero_rel)
-
-            pin_rel = f"generated/pinterest/{today.isoformat()}_{post['slug']}.png"
-            create_pinterest_image(
-                settings.pexels_api_key,
-                post["image_query"],
-                post["pin_title"],
-                settings.repo_root / pin_rel,
-                source_image_path=settings.repo_root / "docs" / hero_rel,
+
+def _publish(
+    settings: Settings,
+    post: dict,
+    hero_rel: str,
+    run_date: date,
+    slug_index: SlugIndex,
+    link_graph: LinkGraph | None = None,
+) -> dict:
+    hero_meta = image_meta(settings.docs_dir / hero_rel)
+    with build_manifest(settings.docs_dir) as manifest:
+        record = publish_post(
+            docs_dir=settings.docs_dir,
+            base_url=settings.base_url,
+            site_title=settings.site_title,
+            post=post,
+            hero_path_rel=hero_rel,
+            run_date=run_date,
+            slug_index=slug_index,
+            hero_meta=hero_meta.as_record() if hero_meta else None,
+            link_graph=link_graph,
+        )
+    LOG.info("Queued %s changed pages for IndexNow.", queue_changes(settings.generated_dir, manifest))
+    return record
+
+
+def top_up_buffer(settings: Settings, state: dict, client: GeminiClient, record_stats: bool = True) -> None:
+    """Skip-day work: fill the site's content buffer instead of publishing."""
+    content_buffer = ContentBuffer(settings.generated_dir / "buffer", max_age_days=settings.buffer_max_age_days)
+    added = fill_buffer(settings, state, client, content_buffer, settings.buffer_target)
+    LOG.info("Buffered %s new posts (%s ready).", added, len(content_buffer))
+    if record_stats:
+        record_client_stats(state, client)
+    save_state(settings.generated_dir / "state.json", state)
+
+
+class DailyRun:
+    """One site's publishing run for ``run_date``: ``SLOTS_PER_RUN`` checkpointed slots.
+
+    ``main`` runs the slots back to back; ``multi_site`` interleaves the slots of several
+    sites on one shared client. Call ``run_next_slot`` while ``pending``, then ``finish``.
+    """
+
+    def __init__(self, settings: Settings, state: dict, client: GeminiClient, run_date: date) -> None:
+        self.settings = settings
+        self.state = state
+        self.client = client
+        self.today = run_date
+        self.state_path = settings.generated_dir / "state.json"
+        self.content_buffer = ContentBuffer(settings.generated_dir / "buffer", max_age_days=settings.buffer_max_age_days)
+        self.published_count = 0
+
+        checkpoint_root = settings.generated_dir / "checkpoints"
+        purged = purge_checkpoints(checkpoint_root, run_date, settings.docs_dir, settings.repo_root)
+        if purged:
+            LOG.info("Removed %s stale checkpoint run(s).", purged)
+        self.checkpoints = [SlotCheckpoint.load(checkpoint_root, run_date, slot) for slot in range(SLOTS_PER_RUN)]
+        self.idle = all(checkpoint.finished for checkpoint in self.checkpoints)
+        self.resumed = any(checkpoint.exists for checkpoint in self.checkpoints)
+        self._pending = [slot for slot, checkpoint in enumerate(self.checkpoints) if not checkpoint.finished]
+        if self.idle:
+            return
+
+        self.slug_index = SlugIndex.load(settings.generated_dir / "slug_index.json", settings.docs_dir)
+        self.pin_queue = PinQueue.load(settings.generated_dir / "pinterest" / "queue.json")
+        self.publish_pins = bool(
+            settings.pinterest_enable_publish and settings.pinterest_access_token and settings.pinterest_board_id
+        )
+        self.dup_index = NearDuplicateIndex.load(settings.generated_dir / "near_duplicates.json", settings.docs_dir)
+        self.link_graph = LinkGraph.load(settings.docs_dir, settings.generated_dir)
+        self.recent_topics = list(state.get("recent_topics", []))
+        self.recent_tags = list(state.get("recent_tags", []))
+        self.recent_slugs = list(state.get("recent_slugs", []))
+        self.tag_counts = dict(state.get("tag_counts", {}))
+        self.topic_rotation = dict(state.get("topic_rotation", {}))
+        self.topics = load_topics(settings.topics_path)
+        self.topics_by_slug = {topic.slug: topic for topic in self.topics}
+        self.scheduler = build_scheduler(state, self.topics)
+        self.daily_topics: set[str] = set()
+        self.prefetch_hero_search = hero_prefetcher(settings.pexels_api_key)
+
+        # Slugs and topics claimed by checkpointed slots stay reserved so no other slot reuses them.
+        for checkpoint in self.checkpoints:
+            if checkpoint.get("plan"):
+                self.daily_topics.add(checkpoint.get("plan")["topic"])
+            if checkpoint.get("article"):
+                self.slug_index.add(checkpoint.get("article")["slug"])
+
+    @property
+    def pending(self) -> bool:
+        return bool(self._pending)
+
+    def site_context(self) -> AbstractContextManager[None]:
+        """Pages of a sites.json site render under its own base URL."""
+        return site_base_url(self.settings.base_url) if self.settings.site_id else nullcontext()
+
+    def persist_progress(self) -> None:
+        self.state["recent_topics"] = self.recent_topics[-30:]
+        self.state["recent_tags"] = self.recent_tags[-30:]
+        self.state["recent_slugs"] = self.recent_slugs[-80:]
+        self.state["tag_counts"] = self.tag_counts
+        self.state["topic_rotation"] = self.topic_rotation
+        self.state["topic_last_used"] = self.scheduler.last_used
+        save_state(self.state_path, self.state)
+
+    def run_next_slot(self) -> None:
+        slot = self._pending.pop(0)
+        checkpoint = self.checkpoints[slot]
+        if checkpoint.attempts >= MAX_SLOT_ATTEMPTS:
+            LOG.warning("Slot %s already failed %s times today; leaving it alone.", slot + 1, checkpoint.attempts)
+            return
+        with self.site_context(), span(f"slot {slot + 1}", site=self.settings.site_id or "default"):
+            self._run_slot(slot, checkpoint)
+
+    def _run_slot(self, slot: int, checkpoint: SlotCheckpoint) -> None:
+        settings, state, today = self.settings, self.state, self.today
+        docs_dir = settings.docs_dir
+        checkpoint.begin_attempt()
+        plan = checkpoint.get("plan")
+        topic = self.topics_by_slug.get(plan["topic"]) if plan else None
+        if plan and topic is not None:
+            mode, offer = plan["mode"], plan["offer"]
+            buffered = self.content_buffer.get(plan["buffer"]) if plan.get("buffer") else None
+            LOG.info("Resuming slot %s (%s, attempt %s).", slot + 1, topic.slug, checkpoint.attempts)
+        else:
+            buffered = self.content_buffer.take(self.daily_topics, self.dup_index, self.topics)
+            if buffered is not None:
+                topic, mode, offer = self.topics_by_slug[buffered.topic], buffered.mode, buffered.offer
+                LOG.info("Slot %s publishes buffered post %s (%s).", slot + 1, buffered.id, topic.slug)
+            else:
+                mode = choose_mode(state)
+                topic = self.scheduler.pick(excluded_slugs=self.daily_topics)
+                offer = pick_offer(settings.offers_path, topic.tag) if mode == "offer" else None
+            checkpoint.stages.clear()
+            checkpoint.record(
+                "plan",
+                {"mode": mode, "topic": topic.slug, "offer": offer, "buffer": buffered.id if buffered else None},
             )
+        self.daily_topics.add(topic.slug)
 
-            record = publish_post(
-                docs_dir=settings.repo_root / "docs",
-                base_url=settings.base_url,
-                site_title=settings.site_title,
-                post=post,
-                hero_path_rel=hero_rel,
-                run_date=today,
+        try:
+            titles = checkpoint.stage(
+                "titles", lambda: buffered.titles if buffered else generate_titles(self.client, topic)
+            )
+            post = checkpoint.stage(
+                "article",
+                lambda: _new_article(
+                    self.client,
+                    topic,
+                    titles,
+                    mode,
+                    offer,
+                    self.dup_index,
+                    self.slug_index,
+                    today,
+                    slot,
+                    on_field=self.prefetch_hero_search,
+                    buffered=buffered,
+                ),
             )
+            self.slug_index.add(post["slug"])
+            if buffered is not None:
+                claim_images(
+                    self.content_buffer,
+                    buffered.id,
+                    docs_dir / _hero_rel(post, today),
+                    settings.repo_root / _pin_rel(settings, post, today),
+                )
+            hero_rel = checkpoint.stage(
+                "hero", lambda: _fetch_hero(settings, post, today), valid=lambda rel: (docs_dir / rel).is_file()
+            )
+            pin_rel = checkpoint.stage(
+                "pin",
+                lambda: _render_pin(settings, post, hero_rel, today),
+                valid=lambda rel: (settings.repo_root / rel).is_file(),
+            )
+            record = checkpoint.stage(
+                "published", lambda: _publish(settings, post, hero_rel, today, self.slug_index, self.link_graph)
+            )
+            self.dup_index.add(post["slug"], post["title"], post["html"])
+            self.dup_index.save()
             post_link = f"{settings.base_url}/{record['url']}"
             write_draft_pack(
-                out_dir=settings.repo_root / "generated" / "pinterest",
+                out_dir=settings.generated_dir / "pinterest",
                 run_date=today,
                 pin_title=post["pin_title"],
                 pin_description=post["pin_description"],
@@ -118,41 +294,104 @@ def main() -> None:
                 alt_text=post["alt_text"],
             )
 
-            if settings.pinterest_enable_publish and settings.pinterest_access_token and settings.pinterest_board_id:
-                create_pin(
-                    access_token=settings.pinterest_access_token,
-                    board_id=settings.pinterest_board_id,
+            if self.publish_pins:
+                self.pin_queue.enqueue(
                     title=post["pin_title"],
                     description=post["pin_description"],
                     link=post_link,
                     image_url=f"{settings.base_url}/{hero_rel}",
                     alt_text=post["alt_text"],
-                    log_path=settings.repo_root / "generated" / "logs" / "pinterest.log",
                 )
+                self.pin_queue.save()
 
-            daily_slugs.add(post["slug"])
-            daily_topics.add(topic.slug)
-            published_count += 1
-            recent_topics.append(topic.slug)
-            recent_tags.append(post["tag"])
-            recent_slugs.append(post["slug"])
-            tag_counts[post["tag"]] = int(tag_counts.get(post["tag"], 0)) + 1
-            topic_rotation[topic.tag] = int(topic_rotation.get(topic.tag, 0)) + 1
-
-            state["offer_runs"] = int(state.get("offer_runs", 0)) + (1 if mode == "offer" else 0)
+            self.published_count += 1
+            # A rerun after a crash between these updates and the "done" checkpoint must not count twice.
+            if post["slug"] not in self.recent_slugs:
+                self.recent_topics.append(topic.slug)
+                self.recent_tags.append(post["tag"])
+                self.recent_slugs.append(post["slug"])
+                self.tag_counts[post["tag"]] = int(self.tag_counts.get(post["tag"], 0)) + 1
+                self.topic_rotation[topic.tag] = int(self.topic_rotation.get(topic.tag, 0)) + 1
+                self.scheduler.record(topic, post["tag"])
+                state["offer_runs"] = int(state.get("offer_runs", 0)) + (1 if mode == "offer" else 0)
+            self.persist_progress()
+            checkpoint.record(DONE, record["url"])
+            if buffered is not None:
+                self.content_buffer.remove(buffered.id)
             LOG.info("Published %s (%s) tag=%s", record["url"], mode, post["tag"])
         except Exception:  # noqa: BLE001
-            LOG.exception("Failed to generate/publish slot %s; continuing to next slot.", slot + 1)
-
-    state["runs"] = int(state.get("runs", 0)) + 1
-    state["recent_topics"] = recent_topics[-30:]
-    state["recent_tags"] = recent_tags[-30:]
-    state["recent_slugs"] = recent_slugs[-80:]
-    state["tag_counts"] = tag_counts
-    state["topic_rotation"] = topic_rotation
-    state["last_run"] = today.isoformat()
-    save_state(state_path, state)
-    LOG.info("Run complete. Published %s/2 posts.", published_count)
+            LOG.exception("Failed to generate/publish slot %s; its finished stages are checkpointed.", slot + 1)
+
+    def finish(self, record_stats: bool = True) -> None:
+        """Export drafts, drain the pin queue and fold the run into ``state``."""
+        settings, today = self.settings, self.today
+        if self.idle:
+            LOG.info("All %s slots for %s are already published; nothing to resume.", SLOTS_PER_RUN, today)
+            return
+        if self.published_count:
+            pinterest_dir = settings.generated_dir / "pinterest"
+            with span("export drafts"):
+                DraftStore(pinterest_dir).export(pinterest_dir, since=today, until=today)
+
+        if self.publish_pins:
+            try:
+                with span("drain pin queue"):
+                    self.pin_queue.drain(
+                        access_token=settings.pinterest_access_token,
+                        board_id=settings.pinterest_board_id,
+                        log_path=settings.generated_dir / "logs" / "pinterest.log",
+                        workers=settings.pinterest_queue_workers,
+                    )
+            except Exception:  # noqa: BLE001
+                LOG.exception("Pinterest queue drain failed; pending pins stay queued for the next run.")
+
+        if not self.resumed:
+            self.state["runs"] = int(self.state.get("runs", 0)) + 1
+        self.state["last_run"] = today.isoformat()
+        if record_stats:
+            record_client_stats(self.state, self.client)
+        self.persist_progress()
+        LOG.info("Run complete. Published %s/%s posts.", self.published_count, SLOTS_PER_RUN)
+
+
+def save_rate_limiter() -> None:
+    LIMITER.save()
+    if LIMITER.waited:
+        LOG.info("Rate limiter waits this run (seconds): %s", {name: round(value, 1) for name, value in LIMITER.waited.items()})
+
+
+def main() -> None:
+    _setup_logging()
+    parser = argparse.ArgumentParser(description="Publish today's posts")
+    parser.add_argument("--profile", action="store_true", help="write a profile to generated/profiles (or PIN_PROFILE=1)")
+    args = parser.parse_args()
+    settings = load_settings()
+    with profiled("run_daily", settings.generated_dir / "profiles", args.profile):
+        _run(settings)
+
+
+def _run(settings: Settings) -> None:
+    today = datetime.now(timezone.utc).date()
+    with span("setup"):
+        configure_from_settings(settings)
+        state = load_state(settings.generated_dir / "state.json")
+        client = build_client(settings, state)
+
+    if not should_generate_today(settings.posts_per_week):
+        LOG.info("Skipping publishing today to maintain %s posts/week; topping up the buffer.", settings.posts_per_week)
+        with span("top up buffer"):
+            top_up_buffer(settings, state, client)
+        save_rate_limiter()
+        return
+
+    with span("load run"):
+        run = DailyRun(settings, state, client, today)
+    while run.pending:
+        run.run_next_slot()
+    with span("finish"):
+        run.finish()
+    if not run.idle:
+        save_rate_limiter()
 
 
 if __name__ == "__main__":
@@ -2,13 +2,43 @@
 from __future__ import annotations
 
 import json
+import logging
 import re
-from collections import Counter, defaultdict
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import date
 from html import escape
+from itertools import islice
 from pathlib import Path
+from typing import Any, Iterator
+
+from .link_graph import LinkGraph
+from .locking import file_lock, file_version, merge_records
+from .output import minify_json, remove_file, write_html, write_if_changed
+from .post_index import ARCHIVE_FILE, HEAD_FILE, HEAD_POSTS, PostIndex, PostRecord, load_archive
+from .profiling import span
+from .slug_index import SlugIndex
+
+LOG = logging.getLogger(__name__)
 
 PUBLIC_BASE_URL = "https://rodrigosimoes97.github.io/Pin"
+# Listing pages render this many cards; the rest load from JSON chunks of FEED_CHUNK_SIZE cards.
+FIRST_SCREEN_CARDS = 12
+TAG_START_HERE_CARDS = 4
+FEED_CHUNK_SIZE = 24
+# Set while rendering a sites.json site, whose own base_url replaces PUBLIC_BASE_URL.
+_SITE_BASE_URL: ContextVar[str] = ContextVar("site_base_url", default="")
+
+
+@contextmanager
+def site_base_url(base_url: str) -> Iterator[None]:
+    """Render canonical URLs, sitemaps and feeds under ``base_url`` inside this block."""
+    token = _SITE_BASE_URL.set(base_url.rstrip("/"))
+    try:
+        yield
+    finally:
+        _SITE_BASE_URL.reset(token)
 
 
 def publish_post(
@@ -18,22 +48,41 @@ def publish_post(
     post: dict[str, object],
     hero_path_rel: str,
     run_date: date,
-) -> dict[str, str]:
+    slug_index: SlugIndex | None = None,
+    hero_meta: dict[str, Any] | None = None,
+    link_graph: LinkGraph | None = None,
+) -> dict[str, Any]:
+    """Write the post page and rebuild the site; ``hero_meta`` is ``ImageMeta.as_record()`` output.
+
+    With a ``link_graph``, the in-article ``#recent-*`` links go to relevant posts the rest of the
+    site links to least, instead of the newest ones in the tag; the graph is updated afterwards.
+
+    The page renders from an unlocked read of the archive; if another process rewrote it in the
+    meantime, the new record is merged into its version instead of overwriting it.
+    """
     docs_dir.mkdir(parents=True, exist_ok=True)
-    posts = _load_posts(docs_dir / "posts.json")
+    posts_path = docs_dir / HEAD_FILE
+    archive_path = docs_dir / ARCHIVE_FILE
+    base_version = file_version(archive_path)
+    base_posts = load_archive(docs_dir)
+    index = PostIndex.from_dicts(base_posts)
 
     tag = post.get("tag", "health")
-    related = _pick_related(posts, tag, post.get("slug", ""))
-    same_tag_more = _pick_more_in_tag(posts, tag, post.get("slug", ""), 2)
-    next_post = _pick_next_post(posts, tag, post.get("slug", ""))
+    related = _pick_related(index, tag, post.get("slug", ""))
+    same_tag_more = _pick_more_in_tag(index, tag, post.get("slug", ""), 2)
+    next_post = _pick_next_post(index, tag, post.get("slug", ""))
     article_html, toc_items = _inject_h2_ids_and_collect_toc(_normalize_article_headings(post["html"]))
-    article_html = _inject_internal_links(article_html, related, tag)
+    link_targets = related
+    if link_graph is not None:
+        link_targets = link_graph.placeholder_targets(index, tag, post.get("slug", ""), str(post.get("title", "")))
+    article_html = _inject_internal_links(article_html, link_targets, tag)
 
     page_html = _render_post_html(
         base_url=base_url,
         site_title=site_title,
         post=post,
         hero_path_rel=hero_path_rel,
+        hero_meta=hero_meta or {},
         article_html=article_html,
         toc_items=toc_items,
         run_date=run_date,
@@ -41,7 +90,10 @@ def publish_post(
         same_tag_more=same_tag_more,
         next_post=next_post,
     )
-    (docs_dir / f"{post['slug']}.html").write_text(page_html, encoding="utf-8")
+    write_html(docs_dir / f"{post['slug']}.html", page_html)
+    if slug_index is not None:
+        slug_index.add(str(post["slug"]))
+        slug_index.save()
 
     record = {
         "slug": post["slug"],
@@ -51,34 +103,68 @@ def publish_post(
         "url": f"{post['slug']}.html",
         "hero": hero_path_rel,
         "tag": tag,
+        **(hero_meta or {}),
     }
-    posts = [record] + [existing for existing in posts if existing.get("slug") != post["slug"]]
-    write_site_state(docs_dir, base_url, site_title, posts)
+    # posts.json stays the lock for both files, so older callers still serialize against this one.
+    with file_lock(posts_path):
+        if file_version(archive_path) == base_version:
+            _write_site(docs_dir, base_url, site_title, index.with_first(PostRecord.from_dict(record)))
+        else:
+            LOG.info("The archive changed while %s was rendering; merging.", post["slug"])
+            ours = [record, *(existing for existing in base_posts if existing.get("slug") != record["slug"])]
+            merged = merge_records(base_posts, ours, load_archive(docs_dir))
+            _write_site(docs_dir, base_url, site_title, PostIndex.from_dicts(merged))
+    if link_graph is not None:
+        with span("link graph"):
+            link_graph.refresh().save()
     return record
 
 
 def write_site_state(docs_dir: Path, base_url: str, site_title: str, posts: list[dict[str, str]]) -> None:
-    docs_dir.mkdir(parents=True, exist_ok=True)
-    (docs_dir / "posts.json").write_text(json.dumps(posts[:200], indent=2), encoding="utf-8")
-    _write_index(docs_dir, base_url, site_title, posts)
-    _write_about_page(docs_dir, base_url, site_title)
-    tag_pages = _write_tag_pages(docs_dir, base_url, site_title, posts)
-    _write_sitemap(docs_dir, base_url, posts, tag_pages)
-    _write_robots(docs_dir, base_url)
+    """Rebuild the archive, ``posts.json`` and the listing pages from ``posts``, the full archive.
+
+    Callers that read the archive (``load_archive``) to compute ``posts`` should hold
+    ``file_lock`` on ``posts.json`` across the read and this call (the lock is reentrant).
+    """
+    with file_lock(docs_dir / "posts.json"), span("write_site_state", posts=len(posts)):
+        _write_site(docs_dir, base_url, site_title, PostIndex.from_dicts(posts))
 
 
-def _effective_base_url(base_url: str) -> str:
+def _write_site(docs_dir: Path, base_url: str, site_title: str, index: PostIndex) -> None:
+    docs_dir.mkdir(parents=True, exist_ok=True)
+    # Feeds, tag pages and the sitemap cover the whole archive; only posts.json is capped, so the
+    # oldest posts stay reachable and a new post never shifts older feed chunks.
+    with span("posts.json", posts=len(index)):
+        records = [post.to_dict() for post in index]
+        write_if_changed(docs_dir / ARCHIVE_FILE, json.dumps(records, indent=2))
+        write_if_changed(docs_dir / HEAD_FILE, json.dumps(records[:HEAD_POSTS], indent=2))
+    with span("card feeds"):
+        _write_card_feeds(docs_dir, index)
+    with span("index page"):
+        _write_index(docs_dir, base_url, site_title, index)
+    with span("about page"):
+        _write_about_page(docs_dir, base_url, site_title)
+    with span("tag pages"):
+        tag_pages = _write_tag_pages(docs_dir, base_url, site_title, index)
+    with span("sitemap"):
+        _write_sitemap(docs_dir, base_url, list(index), tag_pages)
+    with span("robots.txt"):
+        _write_robots(docs_dir, base_url)
+
+
+def public_base_url(base_url: str) -> str:
+    """Base URL pages are published under (canonical links, sitemap, IndexNow submissions)."""
+    if _SITE_BASE_URL.get():
+        return _SITE_BASE_URL.get()
     return PUBLIC_BASE_URL.rstrip("/") if "rodrigosimoes97.github.io/Pin" in PUBLIC_BASE_URL else base_url.rstrip("/")
 
 
-def _load_posts(path: Path) -> list[dict[str, str]]:
-    if not path.exists():
-        return []
-    try:
-        payload = json.loads(path.read_text(encoding="utf-8"))
-    except json.JSONDecodeError:
-        return []
-    return payload if isinstance(payload, list) else []
+def img_size_attrs(width: int, height: int, placeholder: str) -> str:
+    """``width``/``height`` reserve the layout box; the placeholder paints it until the image arrives."""
+    attrs = f" width='{width}' height='{height}'" if width and height else ""
+    if placeholder.startswith("data:image/"):
+        attrs += f" style='background:#0f1a2a url({placeholder}) center/cover no-repeat'"
+    return attrs
 
 
 def _inject_h2_ids_and_collect_toc(html: str) -> tuple[str, list[tuple[str, str]]]:
@@ -99,12 +185,12 @@ def _inject_h2_ids_and_collect_toc(html: str) -> tuple[str, list[tuple[str, str]
     return pattern.sub(replace, html), toc_items[:6]
 
 
-def _inject_internal_links(html: str, related: list[dict[str, str]], tag: str) -> str:
+def _inject_internal_links(html: str, related: list[PostRecord], tag: str) -> str:
     targets = {
-        "#recent-1": related[0]["url"] if len(related) > 0 else "index.html",
-        "#recent-2": related[1]["url"] if len(related) > 1 else "index.html",
-        "#recent-3": related[2]["url"] if len(related) > 2 else "index.html",
-        "#recent-4": related[0]["url"] if len(related) > 0 else "index.html",
+        "#recent-1": related[0].url if len(related) > 0 else "index.html",
+        "#recent-2": related[1].url if len(related) > 1 else "index.html",
+        "#recent-3": related[2].url if len(related) > 2 else "index.html",
+        "#recent-4": related[3 if len(related) > 3 else 0].url if related else "index.html",
         "#recent-5": f"tag/{tag}.html",
     }
     for placeholder, target in targets.items():
@@ -113,27 +199,26 @@ def _inject_internal_links(html: str, related: list[dict[str, str]], tag: str) -
     return html
 
 
-def _pick_related(posts: list[dict[str, str]], tag: str, current_slug: str) -> list[dict[str, str]]:
-    same_tag = [post for post in posts if post.get("slug") != current_slug and post.get("tag") == tag]
+def _pick_related(index: PostIndex, tag: str, current_slug: str) -> list[PostRecord]:
+    same_tag = index.in_tag(tag, exclude_slug=current_slug, limit=3)
     if len(same_tag) >= 3:
-        return same_tag[:3]
-    fallback = [post for post in posts if post.get("slug") != current_slug and post not in same_tag]
-    return (same_tag + fallback)[:3]
+        return same_tag
+    return same_tag + index.outside_tag(tag, exclude_slug=current_slug, limit=3 - len(same_tag))
 
 
-def _pick_next_post(posts: list[dict[str, str]], tag: str, current_slug: str) -> dict[str, str] | None:
-    same_tag = [post for post in posts if post.get("slug") != current_slug and post.get("tag") == tag]
+def _pick_next_post(index: PostIndex, tag: str, current_slug: str) -> PostRecord | None:
+    same_tag = index.in_tag(tag, exclude_slug=current_slug, limit=1)
     if same_tag:
         return same_tag[0]
-    fallback = [post for post in posts if post.get("slug") != current_slug]
+    fallback = index.outside_tag(tag, exclude_slug=current_slug, limit=1)
     return fallback[0] if fallback else None
 
 
-def _pick_more_in_tag(posts: list[dict[str, str]], tag: str, current_slug: str, limit: int) -> list[dict[str, str]]:
-    return [post for post in posts if post.get("slug") != current_slug and post.get("tag") == tag][:limit]
+def _pick_more_in_tag(index: PostIndex, tag: str, current_slug: str, limit: int) -> list[PostRecord]:
+    return index.in_tag(tag, exclude_slug=current_slug, limit=limit)
 
 
-def _append_related_posts_cards(html: str, related: list[dict[str, str]]) -> str:
+def _append_related_posts_cards(html: str, related: list[PostRecord]) -> str:
     if not related:
         return html
     cards = "".join(_render_post_card(item, Path("."), "") for item in related)
@@ -196,18 +281,24 @@ def _render_post_html(
     site_title: str,
     post: dict[str, object],
     hero_path_rel: str,
+    hero_meta: dict[str, Any],
     article_html: str,
     toc_items: list[tuple[str, str]],
     run_date: date,
-    related: list[dict[str, str]],
-    same_tag_more: list[dict[str, str]],
-    next_post: dict[str, str] | None,
+    related: list[PostRecord],
+    same_tag_more: list[PostRecord],
+    next_post: PostRecord | None,
 ) -> str:
-    public_base = _effective_base_url(base_url)
+    public_base = public_base_url(base_url)
     canonical = f"{public_base}/{post['slug']}.html"
     tag = post.get("tag", "health")
     tag_url = f"{public_base}/tag/{tag}.html"
     og_image = f"{public_base}/{hero_path_rel}"
+    hero_attrs = img_size_attrs(
+        int(hero_meta.get("hero_width", 0)),
+        int(hero_meta.get("hero_height", 0)),
+        str(hero_meta.get("hero_placeholder", "")),
+    )
     description = _truncate_meta_description(str(post["meta_description"]))
     published_date = _iso_date_or_fallback(post.get("datePublished") or post.get("date"), run_date.isoformat())
     modified_date = _iso_date_or_fallback(post.get("dateModified") or post.get("date_modified"), published_date)
@@ -282,7 +373,7 @@ def _render_post_html(
         next_block = (
             "<section class='next-article'>"
             "<h2>Next article</h2>"
-            f"<a class='next-link' href='{escape(next_post['url'])}'>{escape(next_post['title'])} →</a>"
+            f"<a class='next-link' href='{escape(next_post.url)}'>{escape(next_post.title)} →</a>"
             "</section>"
         )
 
@@ -347,7 +438,7 @@ def _render_post_html(
 <div class='quick-answer'><strong>Quick answer:</strong> {escape(quick_answer)}</div>
 <div class='takeaways'><h2>Key takeaways</h2><ul>{takeaway_items}</ul></div>
 <p class='meta'>{published_date} · {reading_time} min read · <a class='tag-pill' href='tag/{escape(tag)}.html'>{escape(tag)}</a>{f" · Updated: {modified_date}" if modified_date != published_date else ""}</p>
-<img src='{escape(hero_path_rel)}' alt='{escape(post['alt_text'])}' fetchpriority='high' loading='eager'>
+<img src='{escape(hero_path_rel)}' alt='{escape(post['alt_text'])}' fetchpriority='high' loading='eager'{hero_attrs}>
 {toc_block}
 {article_html}
 {recipe_back_to_top}
@@ -371,17 +462,19 @@ def _tag_intro(tag: str) -> str:
     return f"Explore practical {readable} guides, checklists, and step-by-step posts for daily use."
 
 
-def _write_index(docs_dir: Path, base_url: str, site_title: str, posts: list[dict[str, str]]) -> None:
-    public_base = _effective_base_url(base_url)
-    top_tags = [tag for tag, _ in Counter((p.get("tag") or "health") for p in posts).most_common(10)]
+def _write_index(docs_dir: Path, base_url: str, site_title: str, index: PostIndex) -> None:
+    public_base = public_base_url(base_url)
+    top_tags = [tag for tag, _ in Counter({tag: len(posts) for tag, posts in index.by_tag.items()}).most_common(10)]
     chips = "".join(f"<a class='tag-pill' href='tag/{escape(tag)}.html'>{escape(tag)}</a>" for tag in top_tags)
     filter_chips = "".join(
         f"<button type='button' class='filter-chip' data-filter-tag='{escape(tag)}'>{escape(tag)}</button>" for tag in top_tags
     )
-    latest_url = escape(posts[0]["url"]) if posts else "#posts"
-    latest_cards = "".join(_render_post_card(post, docs_dir, "") for post in posts[:12])
-    start_here_cards = "".join(_render_post_card(post, docs_dir, "") for post in _start_here_posts(posts, 6))
-    continue_cards = "".join(_render_post_card(post, docs_dir, "") for post in _continue_reading_posts(posts, 3))
+    latest_url = escape(index.posts[0].url) if index.posts else "#posts"
+    latest_cards = "".join(_render_post_card(post, docs_dir, "") for post in index.head(FIRST_SCREEN_CARDS))
+    start_here_cards = "".join(_render_post_card(post, docs_dir, "") for post in _start_here_posts(index, 6))
+    continue_cards = "".join(_render_post_card(post, docs_dir, "") for post in _continue_reading_posts(index, 3))
+    latest_date = _latest_post_date(index.posts)
+    copyright_line = f"© {latest_date[:4]} {escape(site_title)}" if latest_date else f"© {escape(site_title)}"
     html = f"""<!doctype html>
 <html lang='en'>
 <head>
@@ -393,7 +486,7 @@ def _write_index(docs_dir: Path, base_url: str, site_title: str, posts: list[dic
   "@type": "WebSite",
   "name": "Practical Habits to Feel Better Daily",
   "alternateName": "Practical Habits",
-  "url": "https://rodrigosimoes97.github.io/Pin/"
+  "url": "{public_base}/"
 }}
 </script>
 <!-- Google tag (gtag.js) -->
@@ -449,7 +542,8 @@ def _write_index(docs_dir: Path, base_url: str, site_title: str, posts: list[dic
 
 <section id='posts'>
 <h2 class='section-title'>Latest</h2>
-<div class='post-grid' id='post-grid'>{latest_cards}</div>
+<div class='post-grid' id='post-grid'{_feed_attrs("feeds/all/", len(index), FIRST_SCREEN_CARDS, "")}>{latest_cards}</div>
+{_load_more_button("post-grid", len(index), FIRST_SCREEN_CARDS)}
 </section>
 
 <section id='continue'>
@@ -466,20 +560,21 @@ def _write_index(docs_dir: Path, base_url: str, site_title: str, posts: list[dic
 <div class='container'>
 <div class='footer-links'><a href='index.html'>Home</a><a href='about.html'>About</a><a href='sitemap.xml'>Sitemap</a><a href='#top'>Top</a></div>
 <p>Educational only — not medical advice.</p>
-<p>© {date.today().year} {escape(site_title)}</p>
+<p>{copyright_line}</p>
 </div>
 </footer>
 <button type='button' class='back-to-top' aria-label='Back to top'>↑</button>
 <script>{_back_to_top_js()}</script>
+<script>{_card_feed_js()}</script>
 <script>
 (() => {{
   const input = document.getElementById('search-input');
-  const cards = Array.from(document.querySelectorAll('#post-grid .post-card'));
+  const grid = document.getElementById('post-grid');
   const chips = Array.from(document.querySelectorAll('.filter-chip'));
   let selectedTag = 'all';
   const apply = () => {{
     const q = (input?.value || '').toLowerCase().trim();
-    cards.forEach((card) => {{
+    grid?.querySelectorAll('.post-card').forEach((card) => {{
       const text = [card.dataset.title, card.dataset.excerpt, card.dataset.tag].join(' ').toLowerCase();
       const tagOk = selectedTag === 'all' || (card.dataset.tag || '') === selectedTag;
       const queryOk = !q || text.includes(q);
@@ -487,6 +582,7 @@ def _write_index(docs_dir: Path, base_url: str, site_title: str, posts: list[dic
     }});
   }};
   input?.addEventListener('input', apply);
+  grid?.addEventListener('cards-loaded', apply);
   chips.forEach((chip) => chip.addEventListener('click', () => {{
     selectedTag = chip.dataset.filterTag || 'all';
     chips.forEach((c) => c.classList.toggle('active', c === chip));
@@ -496,19 +592,20 @@ def _write_index(docs_dir: Path, base_url: str, site_title: str, posts: list[dic
 </script>
 </body>
 </html>"""
-    (docs_dir / "index.html").write_text(html, encoding="utf-8")
+    write_html(docs_dir / "index.html", html)
 
 
-def _render_post_card(post: dict[str, str], docs_dir: Path, link_prefix: str) -> str:
-    hero = (post.get("hero") or "").strip()
-    title = escape(post["title"])
-    tag = escape(post.get("tag", "health"))
+def _render_post_card(post: PostRecord, docs_dir: Path, link_prefix: str) -> str:
+    hero = post.hero.strip()
+    title = escape(post.title)
+    tag = escape(post.tag)
     excerpt = escape(_post_excerpt(post, docs_dir))
     reading = _reading_time_minutes_for_post(post, docs_dir)
-    link = f"{link_prefix}{escape(post['url'])}"
+    link = f"{link_prefix}{escape(post.url)}"
     tag_link = f"{link_prefix}tag/{tag}.html"
     media = (
-        f"<img src='{escape(hero)}' alt='{title}' loading='lazy'>"
+        f"<img src='{link_prefix}{escape(hero)}' alt='{title}' loading='lazy' decoding='async'"
+        f"{img_size_attrs(post.hero_width, post.hero_height, post.hero_placeholder)}>"
         if hero
         else "<div class='placeholder' aria-hidden='true'>✦</div>"
     )
@@ -517,7 +614,7 @@ def _render_post_card(post: dict[str, str], docs_dir: Path, link_prefix: str) ->
         f"<a class='card-link' href='{link}'>"
         f"<span class='card-media'>{media}</span>"
         f"<h3>{title}</h3>"
-        f"<p class='meta'>{escape(post['date'])} · "
+        f"<p class='meta'>{escape(post.date)} · "
         f"{reading} min read · <span class='tag-pill'>{tag}</span></p>"
         f"<p class='excerpt'>{excerpt}</p>"
         "<span class='read-more'>Read more →</span>"
@@ -527,12 +624,76 @@ def _render_post_card(post: dict[str, str], docs_dir: Path, link_prefix: str) ->
     )
 
 
-def _post_excerpt(post: dict[str, str], docs_dir: Path) -> str:
-    description = (post.get("description") or "").strip()
+def _card_data(post: PostRecord, docs_dir: Path) -> dict[str, Any]:
+    """What ``_card_feed_js`` needs to render the same card as ``_render_post_card``."""
+    card: dict[str, Any] = {
+        "url": post.url,
+        "title": post.title,
+        "excerpt": _post_excerpt(post, docs_dir),
+        "date": post.date,
+        "tag": post.tag,
+        "minutes": _reading_time_minutes_for_post(post, docs_dir),
+    }
+    if post.hero.strip():
+        card["hero"] = post.hero.strip()
+    if post.hero_width and post.hero_height:
+        card["width"], card["height"] = post.hero_width, post.hero_height
+    if post.hero_placeholder.startswith("data:image/"):
+        card["placeholder"] = post.hero_placeholder
+    return card
+
+
+def _write_card_feeds(docs_dir: Path, index: PostIndex) -> None:
+    """Write the home feed to ``feeds/all/`` and each tag's feed to ``feeds/tag/{tag}/``."""
+    cards = {post.slug: _card_data(post, docs_dir) for post in index}
+    feeds_dir = docs_dir / "feeds"
+    _write_feed(feeds_dir / "all", [cards[post.slug] for post in index])
+    tag_root = feeds_dir / "tag"
+    for tag in index.tags():
+        _write_feed(tag_root / tag, [cards[post.slug] for post in index.tag_by_date(tag)])
+    live = set(index.tags())
+    for stale in sorted(tag_root.iterdir()) if tag_root.is_dir() else []:
+        if stale.is_dir() and stale.name not in live:
+            _write_feed(stale, [])
+
+
+def _write_feed(feed_dir: Path, cards: list[dict[str, Any]]) -> None:
+    """Split ``cards`` (newest first) into ``{n}.json`` chunks numbered from the oldest card.
+
+    Chunk ``n`` always holds cards ``n * FEED_CHUNK_SIZE`` onwards counted from the oldest, so a
+    new post only rewrites the newest chunk and every older chunk stays byte-identical.
+    """
+    oldest_first = cards[::-1]
+    count = -(-len(oldest_first) // FEED_CHUNK_SIZE)
+    for number in range(count):
+        chunk = oldest_first[number * FEED_CHUNK_SIZE : (number + 1) * FEED_CHUNK_SIZE]
+        write_if_changed(feed_dir / f"{number}.json", minify_json(chunk))
+    for path in feed_dir.glob("*.json") if feed_dir.is_dir() else []:
+        if not path.stem.isdigit() or int(path.stem) >= count:
+            remove_file(path)
+    if feed_dir.is_dir() and not any(feed_dir.iterdir()):
+        feed_dir.rmdir()
+
+
+def _feed_attrs(feed: str, total: int, shown: int, link_prefix: str) -> str:
+    """Where ``_card_feed_js`` finds the cards past the ``shown`` newest of ``total``."""
+    return (
+        f" data-feed='{escape(feed)}' data-total='{total}' data-shown='{shown}'"
+        f" data-chunk-size='{FEED_CHUNK_SIZE}' data-prefix='{link_prefix}'"
+    )
+
+
+def _load_more_button(grid_id: str, total: int, shown: int) -> str:
+    if total <= shown:
+        return ""
+    return f"<button type='button' class='btn-secondary load-more' data-load-more='{grid_id}'>Load more posts</button>"
+
+
+def _post_excerpt(post: PostRecord, docs_dir: Path) -> str:
+    description = post.description.strip()
     if description:
         return description[:140].rstrip()
-    url = post.get("url", "")
-    target = docs_dir / url
+    target = docs_dir / post.url
     if target.exists():
         html = target.read_text(encoding="utf-8")
         text = re.sub(r"<[^>]+>", " ", html)
@@ -548,44 +709,26 @@ def _reading_time_minutes_from_html(html: str) -> int:
     return max(1, round(words / 200))
 
 
-def _reading_time_minutes_for_post(post: dict[str, str], docs_dir: Path) -> int:
-    html_value = (post.get("html") or "").strip()
+def _reading_time_minutes_for_post(post: PostRecord, docs_dir: Path) -> int:
+    html_value = str(dict(post.extra).get("html") or "").strip()
     if html_value:
         return _reading_time_minutes_from_html(html_value)
-    target = docs_dir / post.get("url", "")
+    target = docs_dir / post.url
     if target.exists():
         return _reading_time_minutes_from_html(target.read_text(encoding="utf-8"))
     return 1
 
 
-def _start_here_posts(posts: list[dict[str, str]], limit: int) -> list[dict[str, str]]:
-    per_tag: dict[str, dict[str, str]] = {}
-    for post in posts:
-        tag = post.get("tag", "health")
-        if tag not in per_tag:
-            per_tag[tag] = post
-    return list(per_tag.values())[:limit]
+def _start_here_posts(index: PostIndex, limit: int) -> list[PostRecord]:
+    return index.first_per_tag()[:limit]
 
 
-def _continue_reading_posts(posts: list[dict[str, str]], limit: int) -> list[dict[str, str]]:
-    picks: list[dict[str, str]] = []
-    seen_tags: set[str] = set()
-    for post in posts:
-        tag = post.get("tag", "health")
-        if tag in seen_tags:
-            continue
-        picks.append(post)
-        seen_tags.add(tag)
-        if len(picks) >= limit:
-            break
+def _continue_reading_posts(index: PostIndex, limit: int) -> list[PostRecord]:
+    picks = index.first_per_tag()[:limit]
     if len(picks) < limit:
-        for post in posts:
-            if post in picks:
-                continue
-            picks.append(post)
-            if len(picks) >= limit:
-                break
-    return picks[:limit]
+        picked = {post.slug for post in picks}
+        picks.extend(islice((post for post in index if post.slug not in picked), limit - len(picks)))
+    return picks
 
 
 def _build_key_takeaways(article_html: str, quick_answer: str) -> list[str]:
@@ -684,8 +827,67 @@ def _back_to_top_js() -> str:
 })();"""
 
 
+def _card_feed_js() -> str:
+    """Append older cards from the grid's JSON feed on "Load more", or as the button scrolls into view."""
+    return """(() => {
+  const esc = (value) => String(value ?? '').replace(/[&<>'"]/g, (ch) => ({ '&': '&amp;', '<': '&lt;', '>': '&gt;', "'": '&#x27;', '"': '&quot;' })[ch]);
+  document.querySelectorAll('[data-feed]').forEach((grid) => {
+    const button = document.querySelector(`[data-load-more='${grid.id}']`);
+    if (!button) return;
+    const size = Number(grid.dataset.chunkSize);
+    const prefix = grid.dataset.prefix || '';
+    // Position of the next card to show, counted from the oldest (chunk numbering starts there).
+    let next = Number(grid.dataset.total) - Number(grid.dataset.shown) - 1;
+    let busy = false;
+    const card = (item) => {
+      const title = esc(item.title);
+      const tag = esc(item.tag);
+      // Split so link checkers reading this script as markup do not see an href to check.
+      const tagPage = `${prefix}tag/${tag}` + '.html';
+      let media = "<div class='placeholder' aria-hidden='true'>✦</div>";
+      if (item.hero) {
+        const dims = item.width && item.height ? ` width='${item.width}' height='${item.height}'` : '';
+        const placeholder = item.placeholder ? ` style='background:#0f1a2a url(${esc(item.placeholder)}) center/cover no-repeat'` : '';
+        media = `<img src='${prefix}${esc(item.hero)}' alt='${title}' loading='lazy' decoding='async'${dims}${placeholder}>`;
+      }
+      return `<article class='post-card' data-title='${title}' data-excerpt='${esc(item.excerpt)}' data-tag='${tag}'>`
+        + `<a class='card-link' href='${prefix}${esc(item.url)}'><span class='card-media'>${media}</span><h3>${title}</h3>`
+        + `<p class='meta'>${esc(item.date)} · ${Number(item.minutes) || 1} min read · <span class='tag-pill'>${tag}</span></p>`
+        + `<p class='excerpt'>${esc(item.excerpt)}</p><span class='read-more'>Read more →</span></a>`
+        + `<p><a class='card-tag-link' href='${tagPage}'>Explore ${tag}</a></p></article>`;
+    };
+    const load = async () => {
+      if (busy || next < 0) return;
+      busy = true;
+      button.disabled = true;
+      try {
+        const chunk = Math.floor(next / size);
+        const response = await fetch(`${grid.dataset.feed}${chunk}.json`);
+        if (!response.ok) throw new Error(`HTTP ${response.status}`);
+        const items = await response.json();
+        grid.insertAdjacentHTML('beforeend', items.slice(0, next - chunk * size + 1).reverse().map(card).join(''));
+        next = chunk * size - 1;
+        grid.dispatchEvent(new CustomEvent('cards-loaded'));
+      } catch (error) {
+        button.textContent = 'Could not load more posts. Try again';
+      } finally {
+        busy = false;
+        button.disabled = false;
+        button.hidden = next < 0;
+      }
+    };
+    button.addEventListener('click', load);
+    if ('IntersectionObserver' in window) {
+      new IntersectionObserver((entries) => {
+        if (entries.some((entry) => entry.isIntersecting)) load();
+      }, { rootMargin: '400px' }).observe(button);
+    }
+  });
+})();"""
+
+
 def _write_about_page(docs_dir: Path, base_url: str, site_title: str) -> None:
-    public_base = _effective_base_url(base_url)
+    public_base = public_base_url(base_url)
     html = f"""<!doctype html>
 <html lang='en'>
 <head>
@@ -729,31 +931,29 @@ def _write_about_page(docs_dir: Path, base_url: str, site_title: str) -> None:
 <script>{_back_to_top_js()}</script>
 </body>
 </html>"""
-    (docs_dir / "about.html").write_text(html, encoding="utf-8")
+    write_html(docs_dir / "about.html", html)
 
 
-def _write_tag_pages(docs_dir: Path, base_url: str, site_title: str, posts: list[dict[str, str]]) -> list[str]:
-    public_base = _effective_base_url(base_url)
+def _write_tag_pages(docs_dir: Path, base_url: str, site_title: str, index: PostIndex) -> list[str]:
+    public_base = public_base_url(base_url)
     tag_dir = docs_dir / "tag"
     tag_dir.mkdir(parents=True, exist_ok=True)
-    grouped: dict[str, list[dict[str, str]]] = defaultdict(list)
-    for post in posts:
-        grouped[post.get("tag", "health")].append(post)
+    all_pills = {
+        tag: f"<a class='tag-pill' href='{escape(tag)}.html'>{escape(tag)}</a>" for tag in index.tags()
+    }
 
     urls: list[str] = []
-    for tag, group in grouped.items():
+    for tag in index.tags():
         file_name = f"{tag}.html"
         urls.append(f"tag/{file_name}")
-        unique_posts = sorted(group[:], key=lambda item: item.get("date", ""), reverse=True)
-        start_here = unique_posts[:4]
-        latest = unique_posts[4:]
-        tag_pills = "".join(
-            f"<a class='tag-pill' href='{escape(other)}.html'>{escape(other)}</a>"
-            for other in grouped.keys()
-            if other != tag
-        )
+        unique_posts = index.tag_by_date(tag)
+        start_here = unique_posts[:TAG_START_HERE_CARDS]
+        latest = unique_posts[TAG_START_HERE_CARDS:FIRST_SCREEN_CARDS]
+        tag_pills = "".join(pill for other, pill in all_pills.items() if other != tag)
         start_cards = "".join(_render_post_card(item, docs_dir, "../") for item in start_here)
         latest_cards = "".join(_render_post_card(item, docs_dir, "../") for item in latest)
+        feed = f"../feeds/tag/{tag}/"
+        shown = len(start_here) + len(latest)
 
         page = f"""<!doctype html>
 <html lang='en'>
@@ -777,64 +977,46 @@ def _write_tag_pages(docs_dir: Path, base_url: str, site_title: str, posts: list
 <h2>Start here in {escape(tag)}</h2>
 <div class='post-grid'>{start_cards}</div>
 <h2>Latest in {escape(tag)}</h2>
-<div class='post-grid'>{latest_cards}</div>
+<div class='post-grid' id='tag-grid'{_feed_attrs(feed, len(unique_posts), shown, "../")}>{latest_cards}</div>
+{_load_more_button("tag-grid", len(unique_posts), shown)}
 <h2>Explore other topics</h2>
 <div class='tag-row'>{tag_pills}</div>
 </main>
 <button type='button' class='back-to-top' aria-label='Back to top'>↑</button>
 <script>{_back_to_top_js()}</script>
+<script>{_card_feed_js()}</script>
 </body>
 </html>"""
-        (tag_dir / file_name).write_text(page, encoding="utf-8")
+        write_html(tag_dir / file_name, page)
 
     return urls
 
 
-def _write_sitemap(docs_dir: Path, base_url: str, posts: list[dict[str, str]], tag_pages: list[str]) -> None:
-    public_base = _effective_base_url(base_url)
-    known_dates = [str(post.get("date", "")).strip() for post in posts[:200] if re.fullmatch(r"\d{4}-\d{2}-\d{2}", str(post.get("date", "")).strip())]
-    default_lastmod = max(known_dates, default=date.today().isoformat())
-    post_lastmods = {
-        post.get("url", ""): _iso_date_or_fallback(post.get("date"), default_lastmod)
-        for post in posts[:200]
-        if post.get("url")
-    }
+def _write_sitemap(docs_dir: Path, base_url: str, posts: list[PostRecord], tag_pages: list[str]) -> None:
+    public_base = public_base_url(base_url)
+    # Derived from the posts only (never the wall clock) so identical inputs give identical bytes.
+    default_lastmod = _latest_post_date(posts)
+    post_lastmods = {post.url: _iso_date_or_fallback(post.date, default_lastmod) for post in posts if post.url}
     newest_post_lastmod = max(post_lastmods.values(), default=default_lastmod)
     tag_lastmods: dict[str, str] = {}
-    for post in posts[:200]:
-        tag = post.get("tag", "health")
-        lastmod = _iso_date_or_fallback(post.get("date"), default_lastmod)
-        tag_lastmods[tag] = max(tag_lastmods.get(tag, "0000-00-00"), lastmod)
+    for post in posts:
+        lastmod = _iso_date_or_fallback(post.date, default_lastmod)
+        tag_lastmods[post.tag] = max(tag_lastmods.get(post.tag, ""), lastmod)
 
     rows = [
-        "  <url>",
-        f"    <loc>{public_base}/</loc>",
-        f"    <lastmod>{newest_post_lastmod}</lastmod>",
-        "  </url>",
-        "  <url>",
-        f"    <loc>{public_base}/about.html</loc>",
-        f"    <lastmod>{newest_post_lastmod}</lastmod>",
-        "  </url>",
+        *_sitemap_url(f"{public_base}/", newest_post_lastmod),
+        *_sitemap_url(f"{public_base}/about.html", newest_post_lastmod),
     ]
-    for post in posts[:200]:
+    for post in posts:
         rows.extend(
-            [
-                "  <url>",
-                f"    <loc>{public_base}/{escape(post['url'])}</loc>",
-                f"    <lastmod>{escape(post_lastmods.get(post.get('url', ''), default_lastmod))}</lastmod>",
-                "  </url>",
-            ]
+            _sitemap_url(
+                f"{public_base}/{escape(post.url)}",
+                escape(post_lastmods.get(post.url, default_lastmod)),
+            )
         )
     for tag_page in sorted(set(tag_pages)):
         tag_name = Path(tag_page).stem
-        rows.extend(
-            [
-                "  <url>",
-                f"    <loc>{public_base}/{escape(tag_page)}</loc>",
-                f"    <lastmod>{tag_lastmods.get(tag_name, newest_post_lastmod)}</lastmod>",
-                "  </url>",
-            ]
-        )
+        rows.extend(_sitemap_url(f"{public_base}/{escape(tag_page)}", tag_lastmods.get(tag_name, newest_post_lastmod)))
     xml = "\n".join(
        [
             '<?xml version="1.0" encoding="UTF-8"?>',
@@ -843,15 +1025,25 @@ def _write_sitemap(docs_dir: Path, base_url: str, posts: list[dict[str, str]], t
             '</urlset>',
         ]
     )
-    (docs_dir / "sitemap.xml").write_text(xml, encoding="utf-8")
+    write_if_changed(docs_dir / "sitemap.xml", xml)
+
+
+def _sitemap_url(loc: str, lastmod: str) -> list[str]:
+    rows = ["  <url>", f"    <loc>{loc}</loc>"]
+    if lastmod:
+        rows.append(f"    <lastmod>{lastmod}</lastmod>")
+    rows.append("  </url>")
+    return rows
+
+
+def _latest_post_date(posts: list[PostRecord]) -> str:
+    known_dates = [post.date.strip() for post in posts]
+    return max((value for value in known_dates if re.fullmatch(r"\d{4}-\d{2}-\d{2}", value)), default="")
 
 
 def _write_robots(docs_dir: Path, base_url: str) -> None:
-    public_base = _effective_base_url(base_url)
-    (docs_dir / "robots.txt").write_text(
-        f"User-agent: *\nAllow: /\nSitemap: {public_base}/sitemap.xml\n",
-        encoding="utf-8",
-    )
+    public_base = public_base_url(base_url)
+    write_if_changed(docs_dir / "robots.txt", f"User-agent: *\nAllow: /\nSitemap: {public_base}/sitemap.xml\n")
 
 
 def _slugify(value: str) -> str:
@@ -886,6 +1078,8 @@ def _base_css() -> str:
         ".btn-primary{display:inline-block;margin-top:8px;background:#1d4ed8;border:1px solid #3765e6;color:#f8fbff;padding:9px 14px;border-radius:10px;font-weight:600;transition:transform .16s ease,background .16s ease;}"
         ".btn-primary:hover{text-decoration:none;background:#2a5ce8;transform:translateY(-1px);}"
         ".btn-secondary{display:inline-block;margin-top:8px;background:#101a29;border:1px solid #355176;color:#dce9f9;padding:9px 14px;border-radius:10px;font-weight:600;}"
+        ".load-more{display:block;margin:18px auto 0;cursor:pointer;}"
+        ".load-more[hidden]{display:none;}"
         ".search-input{width:min(560px,100%);padding:10px 12px;border-radius:10px;background:#0c1624;border:1px solid #2a3d53;color:#e6edf6;}"
         ".filter-chip{background:#101a29;border:1px solid #355176;color:#cfe3fb;padding:6px 10px;border-radius:999px;cursor:pointer;}"
         ".filter-chip.active{background:#1d4ed8;border-color:#4a78ff;}"
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+
+from .post_index import load_archive
+
+LOG = logging.getLogger(__name__)
+
+# Pages the site writes itself; a post with one of these slugs would overwrite them.
+RESERVED_SLUGS = {"index", "about", "404"}
+
+
+@dataclass
+class SlugIndex:
+    path: Path
+    slugs: set[str] = field(default_factory=set)
+    suffixes: dict[str, int] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path, docs_dir: Path) -> SlugIndex:
+        if path.exists():
+            try:
+                raw = json.loads(path.read_text(encoding="utf-8"))
+                return cls(
+                    path=path,
+                    slugs={str(slug) for slug in raw.get("slugs", [])},
+                    suffixes={str(key): int(value) for key, value in raw.get("suffixes", {}).items()},
+                )
+            except (json.JSONDecodeError, AttributeError, TypeError, ValueError):
+                LOG.warning("Slug index at %s is unreadable; rebuilding from %s.", path, docs_dir)
+        index = cls.rebuild(path, docs_dir)
+        index.save()
+        return index
+
+    @classmethod
+    def rebuild(cls, path: Path, docs_dir: Path) -> SlugIndex:
+        slugs = {html_file.stem for html_file in docs_dir.glob("*.html")}
+        slugs.update(str(post.get("slug", "")).strip() for post in load_archive(docs_dir))
+        slugs.discard("")
+        return cls(path=path, slugs=slugs)
+
+    def __contains__(self, slug: object) -> bool:
+        return slug in self.slugs or slug in RESERVED_SLUGS
+
+    def __len__(self) -> int:
+        return len(self.slugs)
+
+    def add(self, slug: str) -> None:
+        self.slugs.add(slug)
+
+    def discard(self, slug: str) -> None:
+        self.slugs.discard(slug)
+
+    def allocate(self, slug: str, run_date: date, slot: int) -> str:
+        """Return ``slug`` or, if taken, the first free ``{slug}-{mmdd}-{n}`` variant."""
+        if slug not in self:
+            return slug
+        base = f"{slug}-{run_date.strftime('%m%d')}"
+        counter = max(slot + 1, self.suffixes.get(base, 0) + 1)
+        while f"{base}-{counter}" in self:
+            counter += 1
+        self.suffixes[base] = counter
+        return f"{base}-{counter}"
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"slugs": sorted(self.slugs), "suffixes": dict(sorted(self.suffixes.items()))}
+        self.path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild the persistent slug index from docs/")
+    parser.parse_args()
+    repo_root = Path(__file__).resolve().parents[2]
+    index = SlugIndex.rebuild(repo_root / "generated" / "slug_index.json", repo_root / "docs")
+    index.save()
+    print(f"slug_index: {len(index)} slugs")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import copy
 import json
+import logging
 from pathlib import Path
 from typing import Any
 
+from .locking import file_lock, merge_mapping
+
+LOG = logging.getLogger(__name__)
 
 DEFAULT_STATE = {
     "runs": 0,
@@ -11,21 +16,45 @@ DEFAULT_STATE = {
     "recent_topics": [],
     "recent_slugs": [],
     "last_run": None,
+    # Bumped on every save; a save that finds a different version on disk merges instead of overwriting.
+    "version": 0,
 }
 
+# What each state file looked like when this process last read or wrote it (the merge base).
+_BASES: dict[str, dict[str, Any]] = {}
+
 
 def load_state(path: Path) -> dict[str, Any]:
-    if not path.exists():
-        return DEFAULT_STATE.copy()
-    try:
-        data = json.loads(path.read_text(encoding="utf-8"))
-    except json.JSONDecodeError:
-        return DEFAULT_STATE.copy()
     merged = DEFAULT_STATE.copy()
-    merged.update(data)
+    merged.update(_read(path) or {})
+    _BASES[str(path.resolve())] = copy.deepcopy(merged)
     return merged
 
 
 def save_state(path: Path, state: dict[str, Any]) -> None:
+    """Write ``state``, merging in whatever another process saved since it was loaded.
+
+    ``state`` is updated in place with the merged result, so the caller keeps working on it.
+    """
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(state, indent=2), encoding="utf-8")
+    key = str(path.resolve())
+    with file_lock(path):
+        current = _read(path)
+        if current is not None and current.get("version", 0) != state.get("version", 0):
+            LOG.info("%s was saved by another process; merging.", path)
+            merged = merge_mapping(_BASES.get(key, DEFAULT_STATE), state, {**DEFAULT_STATE, **current})
+            state.clear()
+            state.update(merged)
+        state["version"] = int((current or {}).get("version", 0)) + 1
+        path.write_text(json.dumps(state, indent=2), encoding="utf-8")
+        _BASES[key] = copy.deepcopy(state)
+
+
+def _read(path: Path) -> dict[str, Any] | None:
+    if not path.exists():
+        return None
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) else None
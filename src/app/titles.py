@@ -32,8 +32,8 @@ def generate_titles(client: GeminiClient, topic: Topic) -> list[str]:
     return clean[:10]
 
 
-def pick_best_title(titles: list[str]) -> str:
-    preferred = sorted(
+def rank_titles(titles: list[str]) -> list[str]:
+    return sorted(
         titles,
         key=lambda t: (
             -int("?" in t),
@@ -41,4 +41,7 @@ def pick_best_title(titles: list[str]) -> str:
             len(t),
         ),
     )
-    return preferred[0]
+
+
+def pick_best_title(titles: list[str]) -> str:
+    return rank_titles(titles)[0]
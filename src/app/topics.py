@@ -1,6 +1,11 @@
 from __future__ import annotations
 
+import heapq
+import json
 from dataclasses import dataclass
+from pathlib import Path
+
+CATALOG_PATH = Path(__file__).resolve().parents[2] / "topics.json"
 
 
 @dataclass(frozen=True)
@@ -11,54 +16,138 @@ class Topic:
     tag: str
 
 
-TOPICS: list[Topic] = [
-    Topic("healthy-recipes", "Healthy Recipes", "quick meals for busy weekdays", "recipes"),
-    Topic("home-workouts", "Home Workouts", "no-equipment movement plans", "home-workouts"),
-    Topic("healthy-habits", "Healthy Habits", "small behavior changes that stick", "healthy-habits"),
-    Topic("stress-reset", "Stress Support", "daily routines to lower stress load", "stress"),
-    Topic("gut-health", "Gut Health", "fiber, fermented foods, and meal timing", "gut"),
-    Topic("sleep-improvement", "Sleep Improvement", "bedtime routines and wind-down habits", "sleep"),
-    Topic("weight-loss-lifestyle", "Weight Loss Lifestyle", "sustainable calorie-aware choices", "weight"),
-    Topic("anti-inflammatory-foods", "Anti-Inflammatory Foods", "everyday ingredients to reduce inflammation load", "anti-inflammatory"),
-    Topic("mental-wellness-basics", "Mental Wellness Basics", "stress reset and emotional resilience", "mental-wellness"),
-    Topic("longevity-daily-routines", "Daily Routines for Longevity", "evidence-aligned daily rhythm", "longevity"),
-]
+def load_topics(path: Path = CATALOG_PATH) -> list[Topic]:
+    raw = json.loads(path.read_text(encoding="utf-8"))
+    topics: list[Topic] = []
+    seen: set[str] = set()
+    for item in raw:
+        topic = Topic(
+            slug=str(item["slug"]).strip(),
+            name=str(item["name"]).strip(),
+            angle=str(item["angle"]).strip(),
+            tag=str(item["tag"]).strip(),
+        )
+        if not (topic.slug and topic.name and topic.tag):
+            raise ValueError(f"Incomplete topic entry in {path.name}: {item}")
+        if topic.slug in seen:
+            raise ValueError(f"Duplicate topic slug in {path.name}: {topic.slug}")
+        seen.add(topic.slug)
+        topics.append(topic)
+    if not topics:
+        raise ValueError(f"Topic catalog {path} is empty")
+    return topics
+
+
+TOPICS: list[Topic] = load_topics()
 
 PRIORITY_TAGS = ["sleep", "gut", "stress", "healthy-habits", "longevity", "recipes"]
 
 
+class TopicScheduler:
+    """Priority-queue topic picker.
+
+    Tags are ordered by (published count, priority rank) so underrepresented tags come first,
+    and topics within a tag by (last use, rotation position) so the least recently used wins.
+    Counts only grow, so stale heap entries are skipped lazily and every pick is O(log n).
+    """
+
+    def __init__(
+        self,
+        topics: list[Topic],
+        recent_topics: list[str] | None = None,
+        recent_tags: list[str] | None = None,
+        tag_counts: dict[str, int] | None = None,
+        topic_rotation: dict[str, int] | None = None,
+        topic_last_used: dict[str, int] | None = None,
+    ) -> None:
+        recent_topics = recent_topics or []
+        topic_rotation = topic_rotation or {}
+        self.tag_counts = {tag: int(count) for tag, count in (tag_counts or {}).items()}
+        self.recent_tags = list(recent_tags or [])[-2:]
+        self.last_used = {slug: int(seq) for slug, seq in (topic_last_used or {}).items()}
+        if not self.last_used:
+            self.last_used = {slug: seq for seq, slug in enumerate(recent_topics)}
+        self._clock = max(self.last_used.values(), default=-1) + 1
+
+        by_tag: dict[str, list[Topic]] = {}
+        for topic in topics:
+            by_tag.setdefault(topic.tag, []).append(topic)
+        ordered_tags = [tag for tag in PRIORITY_TAGS if tag in by_tag] + sorted(
+            tag for tag in by_tag if tag not in PRIORITY_TAGS
+        )
+        self._tag_rank = {tag: rank for rank, tag in enumerate(ordered_tags)}
+        self._tag_heap = [(self.tag_counts.get(tag, 0), rank, tag) for tag, rank in self._tag_rank.items()]
+        heapq.heapify(self._tag_heap)
+
+        self._topic_heaps: dict[str, list[tuple[int, int, str, Topic]]] = {}
+        for tag, group in by_tag.items():
+            group.sort(key=lambda item: item.slug)
+            offset = int(topic_rotation.get(tag, 0))
+            heap = [
+                (self.last_used.get(topic.slug, -1), (idx - offset) % len(group), topic.slug, topic)
+                for idx, topic in enumerate(group)
+            ]
+            heapq.heapify(heap)
+            self._topic_heaps[tag] = heap
+
+    def pick(self, excluded_slugs: set[str] | None = None) -> Topic:
+        return self._pick_topic(self._pick_tag(), excluded_slugs or set())
+
+    def record(self, topic: Topic, published_tag: str | None = None) -> None:
+        tag = published_tag or topic.tag
+        self.tag_counts[tag] = self.tag_counts.get(tag, 0) + 1
+        if tag in self._tag_rank:
+            heapq.heappush(self._tag_heap, (self.tag_counts[tag], self._tag_rank[tag], tag))
+        self.recent_tags = (self.recent_tags + [tag])[-2:]
+
+        self.last_used[topic.slug] = self._clock
+        self._clock += 1
+        heap = self._topic_heaps[topic.tag]
+        heapq.heappush(heap, (self.last_used[topic.slug], 0, topic.slug, topic))
+
+    def _pick_tag(self) -> str:
+        blocked = self.recent_tags[-1] if len(self.recent_tags) == 2 and self.recent_tags[0] == self.recent_tags[1] else None
+        held: list[tuple[int, int, str]] = []
+        chosen: str | None = None
+        while self._tag_heap:
+            entry = heapq.heappop(self._tag_heap)
+            count, _, tag = entry
+            if count != self.tag_counts.get(tag, 0):
+                continue
+            held.append(entry)
+            if tag != blocked:
+                chosen = tag
+                break
+        for entry in held:
+            heapq.heappush(self._tag_heap, entry)
+        # Only the blocked tag exists: repeating it beats publishing nothing.
+        return chosen or held[0][2]
+
+    def _pick_topic(self, tag: str, excluded_slugs: set[str]) -> Topic:
+        heap = self._topic_heaps[tag]
+        held: list[tuple[int, int, str, Topic]] = []
+        chosen: Topic | None = None
+        while heap:
+            entry = heapq.heappop(heap)
+            last_used, _, slug, topic = entry
+            if last_used != self.last_used.get(slug, -1):
+                continue
+            held.append(entry)
+            if slug not in excluded_slugs:
+                chosen = topic
+                break
+        for entry in held:
+            heapq.heappush(heap, entry)
+        return chosen or held[0][3]
+
+
 def pick_topic(
     recent_topics: list[str],
     recent_tags: list[str] | None = None,
     tag_counts: dict[str, int] | None = None,
     excluded_slugs: set[str] | None = None,
     topic_rotation: dict[str, int] | None = None,
+    topic_last_used: dict[str, int] | None = None,
 ) -> Topic:
-    recent_tags = recent_tags or []
-    tag_counts = tag_counts or {}
-    excluded_slugs = excluded_slugs or set()
-    topic_rotation = topic_rotation or {}
-
-    by_tag: dict[str, list[Topic]] = {}
-    for topic in TOPICS:
-        by_tag.setdefault(topic.tag, []).append(topic)
-
-    eligible_tags = [tag for tag in PRIORITY_TAGS if tag in by_tag]
-    remaining = sorted(tag for tag in by_tag if tag not in PRIORITY_TAGS)
-    ordered_tags = eligible_tags + remaining
-
-    if len(recent_tags) >= 2 and recent_tags[-1] == recent_tags[-2]:
-        ordered_tags = [tag for tag in ordered_tags if tag != recent_tags[-1]] or ordered_tags
-
-    min_count = min((tag_counts.get(tag, 0) for tag in ordered_tags), default=0)
-    underrepresented = [tag for tag in ordered_tags if tag_counts.get(tag, 0) == min_count]
-    candidate_tags = underrepresented or ordered_tags
-    chosen_tag = candidate_tags[0]
-
-    recent_window = set(recent_topics[-12:])
-    topics_for_tag = sorted(by_tag[chosen_tag], key=lambda item: item.slug)
-    fresh_topics = [item for item in topics_for_tag if item.slug not in recent_window and item.slug not in excluded_slugs]
-    available = fresh_topics or [item for item in topics_for_tag if item.slug not in excluded_slugs] or topics_for_tag
-
-    rotation_index = int(topic_rotation.get(chosen_tag, 0)) % len(available)
-    return available[rotation_index]
+    scheduler = TopicScheduler(TOPICS, recent_topics, recent_tags, tag_counts, topic_rotation, topic_last_used)
+    return scheduler.pick(excluded_slugs)
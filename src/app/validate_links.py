@@ -2,6 +2,10 @@ from __future__ import annotations
 
 import re
 from pathlib import Path
+from urllib.parse import urlparse
+
+from .config import REPO_ROOT, SITES_CONFIG_PATH, load_site_configs
+from .site import PUBLIC_BASE_URL
 
 HREF_RE = re.compile(r'href=["\']([^"\']+)["\']', re.IGNORECASE)
 
@@ -12,7 +16,13 @@ def _iter_html_files(docs_dir: Path) -> list[Path]:
     return files
 
 
-def validate_links(docs_dir: Path) -> list[str]:
+def base_path(base_url: str) -> str:
+    """URL path a site is served under, e.g. ``/Pin/`` for ``https://user.github.io/Pin``."""
+    path = urlparse(base_url).path.strip("/")
+    return f"/{path}/" if path else "/"
+
+
+def validate_links(docs_dir: Path, site_path: str = base_path(PUBLIC_BASE_URL)) -> list[str]:
     errors: list[str] = []
     docs_root = docs_dir.resolve()
 
@@ -25,13 +35,8 @@ def validate_links(docs_dir: Path) -> list[str]:
                 continue
 
             # Normalize GitHub Pages base path
-            if href.startswith("/Pin/"):
-                href = href[len("/Pin/"):]  # "/Pin/tag/x.html" -> "tag/x.html"
-
-            if href.startswith('/'):
-                target = (docs_root / href.lstrip('/')).resolve()
-            else:
-                target = (html_file.parent / href).resolve()
+            if site_path != "/" and href.startswith(site_path):
+                href = href[len(site_path):]  # "/Pin/tag/x.html" -> "tag/x.html"
 
             if href.startswith('/'):
                 target = (docs_root / href.lstrip('/')).resolve()
@@ -47,8 +52,11 @@ def validate_links(docs_dir: Path) -> list[str]:
 
 
 def main() -> None:
-    docs_dir = Path(__file__).resolve().parents[2] / "docs"
-    errors = validate_links(docs_dir)
+    errors = validate_links(REPO_ROOT / "docs")
+    if SITES_CONFIG_PATH.exists():
+        for site in load_site_configs(SITES_CONFIG_PATH):
+            if site.docs_dir.exists() and site.docs_dir != REPO_ROOT / "docs":
+                errors.extend(validate_links(site.docs_dir, base_path(site.base_url)))
     if errors:
         for err in errors:
             print(err)
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any, Callable
+
+EDUCATIONAL_LINE = "Educational only — not medical advice."
+DISCLOSURE_LINE = "Disclosure: This page may contain affiliate links."
+PLACEHOLDERS = [f"#recent-{idx}" for idx in range(1, 6)]
+MIN_H2_SECTIONS = 3
+
+# Declarative article schema; compiled once into a flat list of checks below. Pin title and
+# description are not part of it: content.py always builds them from the title and meta description.
+ARTICLE_SCHEMA: dict[str, dict[str, Any]] = {
+    "title": {"kind": "text", "max_length": 120},
+    "slug": {"kind": "text", "max_length": 120},
+    "meta_description": {"kind": "text", "max_length": 320},
+    "html": {"kind": "text", "min_length": 400},
+    "image_query": {"kind": "text", "max_length": 120},
+    "alt_text": {"kind": "text", "max_length": 300},
+    "faq": {"kind": "faq", "min_items": 2, "fatal": False},
+    "recipe": {"kind": "recipe", "only_for_tag": "recipes"},
+}
+# Fields a compact follow-up request can regenerate without touching the article body.
+REPAIRABLE_FIELDS = {key for key in ARTICLE_SCHEMA if key != "html"}
+
+_H2_RE = re.compile(r"<h2\b", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class Defect:
+    field: str
+    message: str
+    fatal: bool = True
+
+    def __str__(self) -> str:
+        return f"{self.field}: {self.message}"
+
+
+class ArticleValidationError(ValueError):
+    def __init__(self, defects: list[Defect]) -> None:
+        self.defects = defects
+        super().__init__("Invalid article: " + "; ".join(str(defect) for defect in defects))
+
+
+Check = Callable[[dict[str, Any], str, str], list[Defect]]
+
+
+def validate_article(payload: dict[str, Any], mode: str, tag: str) -> list[Defect]:
+    """Run every schema and structure check and return all defects (empty when valid)."""
+    defects: list[Defect] = []
+    for check in _CHECKS:
+        defects.extend(check(payload, mode, tag))
+    return defects
+
+
+def stream_defect(key: str, value: Any, mode: str) -> str | None:
+    """Reason to abort a streamed article at ``key``: a fatal defect no repair request can fix."""
+    if key not in ARTICLE_SCHEMA:
+        return None
+    for check in _CHECKS:
+        for defect in check({key: value}, mode, ""):
+            if defect.field == key and defect.fatal and key not in REPAIRABLE_FIELDS:
+                return str(defect)
+    return None
+
+
+def apply_local_fixes(payload: dict[str, Any], defects: list[Defect], mode: str) -> list[Defect]:
+    """Fix boilerplate defects in place (placeholders, required sentences); return the rest."""
+    remaining: list[Defect] = []
+    html = payload.get("html") if isinstance(payload.get("html"), str) else None
+    for defect in defects:
+        if html is None or defect.field != "html.boilerplate":
+            remaining.append(defect)
+            continue
+        if defect.message.startswith("missing placeholders"):
+            missing = defect.message.split(": ", 1)[1].split(", ")
+            links = " · ".join(f'<a href="{href}">Related guide</a>' for href in missing)
+            html += f"\n<p>Keep reading: {links}</p>"
+        elif defect.message == "missing educational disclaimer":
+            html += f"\n<p>{EDUCATIONAL_LINE}</p>"
+        elif defect.message == "missing affiliate disclosure" and mode == "offer":
+            html += f"\n<p>{DISCLOSURE_LINE}</p>"
+        else:
+            remaining.append(defect)
+    if html is not None:
+        payload["html"] = html
+    return remaining
+
+
+def _compile(schema: dict[str, dict[str, Any]]) -> list[Check]:
+    checks: list[Check] = []
+    for key, rule in schema.items():
+        kind = rule["kind"]
+        if kind == "text":
+            checks.append(_text_check(key, rule.get("min_length", 1), rule.get("max_length"), rule.get("fatal", True)))
+        elif kind == "faq":
+            checks.append(_faq_check(key, rule["min_items"], rule.get("fatal", True)))
+        elif kind == "recipe":
+            checks.append(_recipe_check(key, rule["only_for_tag"]))
+        else:
+            raise ValueError(f"Unknown schema kind for {key}: {kind}")
+    checks.append(_structure_check)
+    return checks
+
+
+def _text_check(key: str, min_length: int, max_length: int | None, fatal: bool) -> Check:
+    def check(payload: dict[str, Any], mode: str, tag: str) -> list[Defect]:
+        value = payload.get(key)
+        if not isinstance(value, str) or not value.strip():
+            return [Defect(key, "missing or not a string", fatal)]
+        if len(value.strip()) < min_length:
+            return [Defect(key, f"shorter than {min_length} characters", fatal)]
+        if max_length is not None and len(value.strip()) > max_length:
+            return [Defect(key, f"longer than {max_length} characters", fatal)]
+        return []
+
+    return check
+
+
+def _faq_check(key: str, min_items: int, fatal: bool) -> Check:
+    def check(payload: dict[str, Any], mode: str, tag: str) -> list[Defect]:
+        raw = payload.get(key)
+        if not isinstance(raw, list):
+            return [Defect(key, "missing or not a list", fatal)]
+        valid = [
+            item
+            for item in raw
+            if isinstance(item, dict) and str(item.get("question", "")).strip() and str(item.get("answer", "")).strip()
+        ]
+        if len(valid) < min_items:
+            return [Defect(key, f"needs at least {min_items} question/answer items, got {len(valid)}", fatal)]
+        return []
+
+    return check
+
+
+def _recipe_check(key: str, only_for_tag: str) -> Check:
+    def check(payload: dict[str, Any], mode: str, tag: str) -> list[Defect]:
+        if tag != only_for_tag:
+            return []
+        raw = payload.get(key)
+        if not isinstance(raw, dict):
+            return [Defect(key, "missing or not an object")]
+        defects: list[Defect] = []
+        for minutes in ("prep_time_minutes", "cook_time_minutes", "total_time_minutes"):
+            try:
+                valid = int(raw.get(minutes)) > 0
+            except (TypeError, ValueError):
+                valid = False
+            if not valid:
+                defects.append(Defect(key, f"{minutes} must be a positive integer"))
+        if not str(raw.get("servings", "")).strip():
+            defects.append(Defect(key, "servings is empty"))
+        for items in ("ingredients", "instructions"):
+            values = raw.get(items)
+            if not isinstance(values, list) or not any(str(item).strip() for item in values):
+                defects.append(Defect(key, f"{items} must be a non-empty list"))
+        if raw.get("tips") is not None and not isinstance(raw.get("tips"), list):
+            defects.append(Defect(key, "tips must be a list"))
+        return defects
+
+    return check
+
+
+def _structure_check(payload: dict[str, Any], mode: str, tag: str) -> list[Defect]:
+    html = payload.get("html")
+    if not isinstance(html, str) or not html.strip():
+        return []
+    defects: list[Defect] = []
+    missing = [href for href in PLACEHOLDERS if f'"{href}"' not in html and f"'{href}'" not in html]
+    if missing:
+        defects.append(Defect("html.boilerplate", f"missing placeholders: {', '.join(missing)}"))
+    if EDUCATIONAL_LINE not in html:
+        defects.append(Defect("html.boilerplate", "missing educational disclaimer"))
+    if mode == "offer" and DISCLOSURE_LINE not in html:
+        defects.append(Defect("html.boilerplate", "missing affiliate disclosure"))
+    h2_count = len(_H2_RE.findall(html))
+    if h2_count < MIN_H2_SECTIONS:
+        defects.append(Defect("html", f"needs at least {MIN_H2_SECTIONS} <h2> sections, got {h2_count}"))
+    if tag == "recipes":
+        anchors = [anchor for anchor in ("recipe", "ingredients", "instructions") if f'id="{anchor}"' not in html]
+        if anchors:
+            defects.append(Defect("html", f"recipe anchors missing: {', '.join(anchors)}", fatal=False))
+    return defects
+
+
+_CHECKS = _compile(ARTICLE_SCHEMA)
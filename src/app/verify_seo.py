@@ -1,12 +1,15 @@
 from __future__ import annotations
 
+import json
 import re
 import tempfile
 import xml.etree.ElementTree as ET
 from datetime import date, timedelta
 from pathlib import Path
 
-from .site import publish_post
+from .link_graph import LinkGraph
+from .post_index import load_archive
+from .site import publish_post, write_site_state
 
 
 def _assert(condition: bool, message: str) -> None:
@@ -14,36 +17,41 @@ def _assert(condition: bool, message: str) -> None:
         raise AssertionError(message)
 
 
+def _post(i: int) -> dict[str, str]:
+    return {
+        "slug": f"sleep-post-{i}",
+        "title": f"Sleep Post {i}",
+        "meta_description": "Practical sleep guidance for better nightly recovery.",
+        "html": (
+            "<p>Short answer sentence one. Sentence two.</p>"
+            "<h2>Step One</h2><p>Do this.</p>"
+            "<h2>FAQ</h2><h3>What helps sleep?</h3><p>A routine helps.</p>"
+            "<p><a href='#recent-1'>A</a> <a href='#recent-2'>B</a> <a href='#recent-3'>C</a> "
+            "<a href='#recent-4'>D</a> <a href='#recent-5'>E</a></p>"
+        ),
+        "image_query": "sleep bedroom",
+        "pin_title": "Pin",
+        "pin_description": "Pin desc",
+        "alt_text": "Sleep image",
+        "tag": "sleep",
+    }
+
+
 def run_checks() -> None:
-    with tempfile.TemporaryDirectory() as td:
+    base_url = "https://rodrigosimoes97.github.io/Pin"
+    with tempfile.TemporaryDirectory() as td, tempfile.TemporaryDirectory() as gd:
         docs = Path(td)
-        base_url = "https://rodrigosimoes97.github.io/Pin"
+        link_graph = LinkGraph.load(docs, Path(gd))
 
         for i in range(10):
-            post = {
-                "slug": f"sleep-post-{i}",
-                "title": f"Sleep Post {i}",
-                "meta_description": "Practical sleep guidance for better nightly recovery.",
-                "html": (
-                    "<p>Short answer sentence one. Sentence two.</p>"
-                    "<h2>Step One</h2><p>Do this.</p>"
-                    "<h2>FAQ</h2><h3>What helps sleep?</h3><p>A routine helps.</p>"
-                    "<p><a href='#recent-1'>A</a> <a href='#recent-2'>B</a> <a href='#recent-3'>C</a> "
-                    "<a href='#recent-4'>D</a> <a href='#recent-5'>E</a></p>"
-                ),
-                "image_query": "sleep bedroom",
-                "pin_title": "Pin",
-                "pin_description": "Pin desc",
-                "alt_text": "Sleep image",
-                "tag": "sleep",
-            }
             publish_post(
                 docs_dir=docs,
                 base_url=base_url,
                 site_title="Practical US Health Notes",
-                post=post,
+                post=_post(i),
                 hero_path_rel=f"assets/sleep-{i}.jpg",
                 run_date=date(2026, 1, 1) + timedelta(days=i),
+                link_graph=link_graph,
             )
 
         sitemap = docs / "sitemap.xml"
@@ -67,17 +75,75 @@ def run_checks() -> None:
             "name='twitter:title'",
             "name='twitter:description'",
             "name='twitter:image'",
-            '"@type": "Article"',
-            '"@type": "FAQPage"',
-            '"@type": "BreadcrumbList"',
+            '"@type":"Article"',
+            '"@type":"FAQPage"',
+            '"@type":"BreadcrumbList"',
         ]
         for needle in checks:
             _assert(needle in post_html, f"missing post SEO marker: {needle}")
+        placeholder_links = re.findall(r"href='(sleep-post-\d+\.html)'>[A-D]</a>", post_html)
+        _assert(len(placeholder_links) == 4 and "#recent-" not in post_html, "in-article placeholders not filled")
+        _assert(all((docs / link).exists() for link in placeholder_links), "in-article links must reach live posts")
+        _assert(abs(sum(link_graph.ranks.values()) - 1) < 1e-6, "link graph ranks must sum to 1")
+        _assert(link_graph.pages["sleep-post-9.html"]["links"], "link graph missed the newest post's links")
 
         tag_html = (docs / "tag" / "sleep.html").read_text(encoding="utf-8")
         _assert("Explore practical sleep guides" in tag_html, "tag intro missing")
         links = re.findall(r"href='../[^']+\.html'", tag_html)
         _assert(len(links) >= 8, "tag page should contain at least 8 post links when available")
+        _assert("\n\n" not in post_html and "  <" not in post_html, "post page should be minified")
+        feed = json.loads((docs / "feeds" / "tag" / "sleep" / "0.json").read_text(encoding="utf-8"))
+        expected = [f"sleep-post-{i}.html" for i in range(10)]
+        _assert([card["url"] for card in feed] == expected, "tag feed must list posts oldest first")
+
+        before = {path: path.read_bytes() for path in docs.rglob("*") if path.is_file()}
+        posts = load_archive(docs)
+        write_site_state(docs, base_url, "Practical US Health Notes", posts)
+        after = {path: path.read_bytes() for path in docs.rglob("*") if path.is_file()}
+        _assert(before == after, "rebuilding unchanged posts must produce byte-identical output")
+
+    with tempfile.TemporaryDirectory() as td, tempfile.TemporaryDirectory() as gd:
+        docs = Path(td)
+        link_graph = LinkGraph.load(docs, Path(gd))
+        total = 250
+        start = date(2025, 1, 1)
+        archive = [
+            {
+                "slug": f"sleep-post-{i}",
+                "title": f"Sleep Post {i}",
+                "description": "Practical sleep guidance.",
+                "date": (start + timedelta(days=i)).isoformat(),
+                "url": f"sleep-post-{i}.html",
+                "hero": f"assets/sleep-{i}.jpg",
+                "tag": "sleep",
+            }
+            for i in reversed(range(total))
+        ]
+        for record in archive:
+            (docs / record["url"]).write_text(f"<p>{record['title']}</p>", encoding="utf-8")
+        write_site_state(docs, base_url, "Practical US Health Notes", archive)
+        before = {path: path.read_bytes() for path in (docs / "feeds").rglob("*.json")}
+        publish_post(
+            docs_dir=docs,
+            base_url=base_url,
+            site_title="Practical US Health Notes",
+            post=_post(total),
+            hero_path_rel=f"assets/sleep-{total}.jpg",
+            run_date=start + timedelta(days=total),
+            link_graph=link_graph,
+        )
+        after = {path: path.read_bytes() for path in (docs / "feeds").rglob("*.json")}
+        newest = {docs / "feeds" / "all" / "10.json", docs / "feeds" / "tag" / "sleep" / "10.json"}
+        changed = {path for path in before.keys() | after.keys() if before.get(path) != after.get(path)}
+        _assert(changed == newest, "a publish past 200 posts must rewrite only the newest feed chunks")
+        _assert(len(load_archive(docs)) == total + 1, "the archive must keep every post")
+        head = json.loads((docs / "posts.json").read_text(encoding="utf-8"))
+        _assert(len(head) == 200 and head[0]["slug"] == f"sleep-post-{total}", "posts.json must hold the newest 200")
+        head_urls = {record["url"] for record in head}
+        post_html = (docs / f"sleep-post-{total}.html").read_text(encoding="utf-8")
+        placeholder_links = re.findall(r"href='(sleep-post-\d+\.html)'>[A-D]</a>", post_html)
+        _assert(set(placeholder_links) - head_urls, "in-article links must reach posts older than posts.json")
+        _assert("sleep-post-0.html" in (docs / "sitemap.xml").read_text(encoding="utf-8"), "sitemap must keep the oldest post")
 
     print("SEO verification passed")
 